@@ -2,26 +2,59 @@
 Actformer — A Novel Neural Architecture That Learns Actions, Not Tokens.
 
 Version 2.0 | Abhishek Shah Research Initiative
+
+Public names are resolved lazily on first access, so ``import actformers``
+does not import torch; only the names that need it (embeddings, memory,
+engine) pull it in.
 """
 
 __version__ = "2.0.0"
 
-from actformers.core.action_space import (
-    ActionType,
-    ActionToken,
-    FactorizedActionEmbedding,
-    ActionSpace,
-    MacroAction,
-    make_add,
-    make_load,
-    make_halt,
-    make_output,
-    make_nop,
-)
-from actformers.core.working_memory import MemoryState, WorkingMemory
-from actformers.core.primitives import DifferentiablePrimitives
-from actformers.core.execution_engine import ActionExecutionEngine
-from actformers.data.trace_generator import ActionTraceGenerator
+import importlib
+from typing import TYPE_CHECKING
+
+# name -> defining module
+_LAZY_ATTRS = {
+    "ActionType": "actformers.core.actions",
+    "ActionToken": "actformers.core.actions",
+    "make_add": "actformers.core.actions",
+    "make_load": "actformers.core.actions",
+    "make_halt": "actformers.core.actions",
+    "make_output": "actformers.core.actions",
+    "make_nop": "actformers.core.actions",
+    "FactorizedActionEmbedding": "actformers.core.action_space",
+    "ActionSpace": "actformers.core.action_space",
+    "MacroAction": "actformers.core.action_space",
+    "MemoryState": "actformers.core.working_memory",
+    "WorkingMemory": "actformers.core.working_memory",
+    "DifferentiablePrimitives": "actformers.core.primitives",
+    "ActionExecutionEngine": "actformers.core.execution_engine",
+    "ActionTraceGenerator": "actformers.data.trace_generator",
+}
+
+if TYPE_CHECKING:
+    from actformers.core.actions import (
+        ActionType, ActionToken, make_add, make_load, make_halt, make_output, make_nop,
+    )
+    from actformers.core.action_space import FactorizedActionEmbedding, ActionSpace, MacroAction
+    from actformers.core.working_memory import MemoryState, WorkingMemory
+    from actformers.core.primitives import DifferentiablePrimitives
+    from actformers.core.execution_engine import ActionExecutionEngine
+    from actformers.data.trace_generator import ActionTraceGenerator
+
+
+def __getattr__(name: str):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value  # cache: later lookups bypass __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
 
 __all__ = [
     "ActionType",
@@ -39,4 +72,4 @@ __all__ = [
     "make_halt",
     "make_output",
     "make_nop",
-]
\ No newline at end of file
+]
@@ -1,4 +1,6 @@
 from .macro_library import MacroLibrary
 from .discovery import CompositionDiscovery
+from .tokenizer import MacroTokenizer
+from .parallel_probe import ParallelProbeEvaluator
 
-__all__ = ["MacroLibrary", "CompositionDiscovery"]
\ No newline at end of file
+__all__ = ["MacroLibrary", "CompositionDiscovery", "MacroTokenizer", "ParallelProbeEvaluator"]
@@ -2,21 +2,27 @@
 Composition Discovery — the evolutionary loop for discovering macro actions.
 
 Process:
-  1. Mine co-occurring action subsequences from recent rollout history.
+  1. Mine maximal repeated action subsequences from recent rollout history
+     (suffix automaton, linear in buffer size).
   2. Merge candidate pairs into macro proposals.
-  3. Probe-evaluate each candidate on a held-out set.
+  3. Probe-evaluate each candidate on a held-out set (optionally in
+     parallel across a process pool).
   4. Adopt if success improvement > threshold; reject otherwise.
 """
 
 from __future__ import annotations
 
-from collections import Counter
-from typing import Dict, List, Optional, Tuple
+import copy
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
 
 import torch
 
 from actformers.core.action_space import ActionToken, ActionSpace, ActionType
 from actformers.composition.macro_library import MacroLibrary
+from actformers.composition.ngram_stats import StreamingNGramCounter
+from actformers.composition.parallel_probe import ParallelProbeEvaluator
+from actformers.composition.suffix_automaton import mine_maximal_repeats
 
 __all__ = ["CompositionDiscovery"]
 
@@ -38,6 +44,9 @@ class CompositionDiscovery:
         adoption_threshold: float = 0.02,
         min_subsequence_length: int = 3,
         max_subsequence_length: int = 15,
+        max_buffer_size: int = 10000,
+        streaming_stats: bool = False,
+        sketch_width: Optional[int] = None,
     ):
         self.macro_library = macro_library
         self.action_space = action_space
@@ -46,48 +55,76 @@ class CompositionDiscovery:
         self.min_seq_len = min_subsequence_length
         self.max_seq_len = max_subsequence_length
 
-        # Rollout buffer
-        self.rollout_buffer: List[List[int]] = []
-        self.max_buffer_size = 10000
+        # Rollout ring buffer (oldest rollout evicted first, O(1))
+        self.max_buffer_size = max_buffer_size
+        self.rollout_buffer: Deque[List[int]] = deque(maxlen=max_buffer_size)
+
+        # Optional incrementally maintained n-gram counts
+        self.ngram_stats: Optional[StreamingNGramCounter] = None
+        if streaming_stats:
+            self.ngram_stats = StreamingNGramCounter(
+                min_len=min_subsequence_length,
+                max_len=max_subsequence_length,
+                min_frequency=min_frequency,
+                sketch_width=sketch_width,
+            )
 
     def add_rollout(self, action_history: List[int]) -> None:
-        """Add a completed rollout's action history to the buffer."""
-        self.rollout_buffer.append(list(action_history))
-        if len(self.rollout_buffer) > self.max_buffer_size:
-            self.rollout_buffer.pop(0)
+        """
+        Add a completed rollout's action history to the buffer.
+
+        When the buffer is full the oldest rollout is evicted; with
+        streaming statistics enabled its n-grams are un-counted.
+        """
+        rollout = list(action_history)
+        if self.ngram_stats is not None:
+            if len(self.rollout_buffer) == self.max_buffer_size:
+                self.ngram_stats.remove(self.rollout_buffer[0])
+            self.ngram_stats.add(rollout)
+        self.rollout_buffer.append(rollout)
+
+    def state_dict(self) -> Dict:
+        """Rollout buffer and n-gram statistics (the library saves itself)."""
+        return {
+            'rollout_buffer': [list(r) for r in self.rollout_buffer],
+            'ngram_stats': copy.deepcopy(self.ngram_stats),
+        }
 
-    def mine_candidates(self) -> List[List[int]]:
+    def load_state_dict(self, state: Dict) -> None:
+        self.rollout_buffer = deque(
+            (list(r) for r in state['rollout_buffer']), maxlen=self.max_buffer_size,
+        )
+        self.ngram_stats = copy.deepcopy(state['ngram_stats'])
+
+    def mine_candidates(self, top_k: int = 20) -> List[List[int]]:
         """
         Mine frequent subsequences from the rollout buffer.
 
+        Builds a suffix automaton over the concatenated buffer and returns
+        the most frequent *maximal repeats* — subsequences that cannot be
+        extended without losing occurrences.  This runs in time linear in
+        the buffer size instead of enumerating every n-gram length.
+
+        With streaming statistics enabled, the incrementally maintained
+        heavy-hitter table is queried instead (no pass over the buffer).
+
         Returns:
             List of candidate sub-sequences (as flat action index lists).
         """
         if len(self.rollout_buffer) < self.min_frequency:
             return []
 
-        # Count n-gram frequencies
-        ngram_counts: Counter = Counter()
-        for seq in self.rollout_buffer:
-            for n in range(self.min_seq_len, self.max_seq_len + 1):
-                for i in range(len(seq) - n + 1):
-                    ngram = tuple(seq[i:i+n])
-                    ngram_counts[ngram] += 1
-
-        # Filter by minimum frequency
-        candidates = [
-            list(ngram)
-            for ngram, count in ngram_counts.items()
-            if count >= self.min_frequency
-        ]
-
-        # Sort by frequency (most frequent first)
-        candidates.sort(
-            key=lambda c: ngram_counts[tuple(c)],
-            reverse=True,
-        )
+        if self.ngram_stats is not None:
+            return [ngram for ngram, _count in self.ngram_stats.top_k(top_k)]
 
-        return candidates[:20]  # Top 20 candidates
+        repeats = mine_maximal_repeats(
+            self.rollout_buffer,
+            min_len=self.min_seq_len,
+            max_len=self.max_seq_len,
+            min_count=self.min_frequency,
+            top_k=top_k,
+        )
+        return [ngram for ngram, _count in repeats]
 
     def propose_macro(
         self,
@@ -124,6 +161,14 @@ class CompositionDiscovery:
         except Exception:
             return None
 
+    def _should_adopt(self, result: Optional[Tuple[float, float]]) -> bool:
+        """Adoption rule shared by serial and parallel probing."""
+        if result is None:
+            return True  # On error, adopt conservatively
+        baseline_acc, macro_acc = result
+        improvement = macro_acc - baseline_acc
+        return improvement > self.adoption_threshold
+
     def probe_evaluate(
         self,
         macro_name: str,
@@ -144,19 +189,23 @@ class CompositionDiscovery:
             return True  # No eval function → adopt conservatively
 
         try:
-            baseline_acc, macro_acc = eval_fn(macro_name)
-            improvement = macro_acc - baseline_acc
-            return improvement > self.adoption_threshold
+            return self._should_adopt(eval_fn(macro_name))
         except Exception:
-            return True  # On error, adopt conservatively
+            return self._should_adopt(None)
 
     def discovery_step(
         self,
         eval_fn=None,
+        probe_evaluator: Optional[ParallelProbeEvaluator] = None,
     ) -> Dict:
         """
         Run one discovery cycle: mine → propose → probe → adopt/reject.
 
+        With a ``probe_evaluator``, all proposed candidates are registered
+        first and probed concurrently across its process pool; the results
+        are then merged into adopt/reject decisions.  Otherwise candidates
+        are probed one by one with ``eval_fn``.
+
         Returns:
             Dict with discovery results.
         """
@@ -164,18 +213,39 @@ class CompositionDiscovery:
         adopted = []
         rejected = []
 
-        for candidate in candidates:
-            name = self.propose_macro(candidate)
-            if name is not None:
-                # Only adopt if probe passes (or no eval_fn for conservative adoption)
-                if self.probe_evaluate(name, eval_fn):
+        if probe_evaluator is not None:
+            proposed: Dict[str, List[int]] = {}
+            for candidate in candidates:
+                name = self.propose_macro(candidate)
+                if name is None:
+                    rejected.append(candidate)
+                else:
+                    proposed[name] = candidate
+
+            results = probe_evaluator.evaluate({
+                name: self.macro_library.get(name).sub_actions
+                for name in proposed
+                if self.macro_library.get(name) is not None
+            })
+            for name, candidate in proposed.items():
+                if name in results and self._should_adopt(results[name]):
                     adopted.append(name)
                 else:
-                    # Remove macro that failed probe
                     self.macro_library.remove(name)
                     rejected.append(candidate)
-            else:
-                rejected.append(candidate)
+        else:
+            for candidate in candidates:
+                name = self.propose_macro(candidate)
+                if name is not None:
+                    # Only adopt if probe passes (or no eval_fn for conservative adoption)
+                    if self.probe_evaluate(name, eval_fn):
+                        adopted.append(name)
+                    else:
+                        # Remove macro that failed probe
+                        self.macro_library.remove(name)
+                        rejected.append(candidate)
+                else:
+                    rejected.append(candidate)
 
         return {
             'candidates_mined': len(candidates),
@@ -183,4 +253,4 @@ class CompositionDiscovery:
             'rejected_count': len(rejected),
             'buffer_size': len(self.rollout_buffer),
             'total_macros': self.macro_library.get_all_macros().__len__(),
-        }
\ No newline at end of file
+        }
@@ -47,6 +47,7 @@ class MacroLibrary(nn.Module):
         self,
         name: str,
         sub_actions: List[ActionToken],
+        macro_id: Optional[int] = None,
     ) -> MacroAction:
         """
         Register a new macro action.
@@ -54,6 +55,7 @@ class MacroLibrary(nn.Module):
         Args:
             name: Unique name for the macro.
             sub_actions: List of primitive ActionTokens.
+            macro_id: Explicit CALL_TOOL id (default: lowest free id).
 
         Returns:
             The registered MacroAction.
@@ -62,20 +64,17 @@ class MacroLibrary(nn.Module):
             # Prune lowest-scoring macro
             self._prune_worst()
 
-        macro = MacroAction(
-            name=name,
-            sub_actions=list(sub_actions),
-            macro_id=len(self.macros),
-        )
+        macro = MacroAction(name=name, sub_actions=list(sub_actions))
         macro.initialize_embedding(self.action_embed)
         self.macros[name] = macro
-        self.action_space.register_macro(macro)
+        self.action_space.register_macro(macro, macro_id=macro_id)
         return macro
 
     def remove(self, name: str) -> None:
-        """Remove a macro by name."""
+        """Remove a macro by name (also frees its id in the action space)."""
         if name in self.macros:
             del self.macros[name]
+            self.action_space.remove_macro(name)
 
     def get(self, name: str) -> Optional[MacroAction]:
         """Get a macro by name."""
@@ -112,6 +111,36 @@ class MacroLibrary(nn.Module):
             reverse=True,
         )
 
+    # ------------------------------------------------------------------
+    # Checkpointing (carried in state_dict() as extra state)
+    # ------------------------------------------------------------------
+
+    def get_extra_state(self) -> Dict[str, object]:
+        return {
+            'macros': [
+                {
+                    'name': m.name,
+                    'sub_actions': [t.packed for t in m.sub_actions],
+                    'embedding': m.embedding.detach().clone() if m.embedding is not None else None,
+                    'usage_count': m.usage_count,
+                    'composition_score': m.composition_score,
+                    'macro_id': m.macro_id,
+                }
+                for m in self.macros.values()
+            ],
+        }
+
+    def set_extra_state(self, state: Dict[str, object]) -> None:
+        for name in list(self.macros):
+            self.remove(name)
+        for entry in state['macros']:
+            tokens = [ActionToken.from_packed(p) for p in entry['sub_actions']]
+            macro = self.register(entry['name'], tokens, macro_id=entry['macro_id'])
+            if entry['embedding'] is not None:
+                macro.embedding = nn.Parameter(entry['embedding'].clone())
+            macro.usage_count = entry['usage_count']
+            macro.composition_score = entry['composition_score']
+
     def summary(self) -> Dict[str, object]:
         return {
             'num_macros': len(self.macros),
@@ -0,0 +1,169 @@
+"""
+Streaming n-gram statistics for the discovery rollout buffer.
+
+Counts are maintained incrementally: every n-gram of a rollout is added
+when the rollout enters the buffer and subtracted when it is evicted, so
+the statistics always describe exactly the current buffer and never need
+to be recounted.
+
+Two count backends are available:
+  - exact: a ``Counter`` keyed by n-gram tuple (memory grows with the
+    number of distinct n-grams);
+  - sketch: a Count-Min sketch with fixed ``width x depth`` memory whose
+    estimates never undercount.
+
+In both cases the n-grams whose count is at least ``min_frequency`` are
+tracked in a small heavy-hitter table, so top-k queries only touch
+frequent n-grams.  Top-k ranks maximal heavy hitters, matching the
+maximal repeats the non-streaming miner proposes.
+"""
+
+from __future__ import annotations
+
+import heapq
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+__all__ = [
+    "CountMinSketch",
+    "StreamingNGramCounter",
+]
+
+
+class CountMinSketch:
+    """
+    Count-Min sketch over hashable keys, supporting decrements.
+
+    Each row uses an independent salt; the estimate is the minimum over
+    rows, which over-counts by at most ``e * N / width`` with probability
+    ``1 - exp(-depth)`` (N = total count).
+    """
+
+    def __init__(self, width: int = 1 << 16, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.table: List[List[int]] = [[0] * width for _ in range(depth)]
+        self._salts = [0x9E3779B1 * (row + 1) for row in range(depth)]
+
+    def _cells(self, key) -> List[int]:
+        return [hash((salt, key)) % self.width for salt in self._salts]
+
+    def add(self, key, amount: int = 1) -> int:
+        """Add *amount* (may be negative) and return the new estimate."""
+        estimate = None
+        for row, col in zip(self.table, self._cells(key)):
+            row[col] += amount
+            estimate = row[col] if estimate is None else min(estimate, row[col])
+        return estimate
+
+    def estimate(self, key) -> int:
+        return min(row[col] for row, col in zip(self.table, self._cells(key)))
+
+
+class StreamingNGramCounter:
+    """
+    Incrementally maintained n-gram counts over a sliding set of sequences.
+
+    Args:
+        min_len: Shortest n-gram length counted.
+        max_len: Longest n-gram length counted.
+        min_frequency: Count at which an n-gram becomes a heavy hitter.
+        sketch_width: If given, use a Count-Min sketch of this width
+            instead of exact counts.
+        sketch_depth: Number of sketch rows.
+    """
+
+    def __init__(
+        self,
+        min_len: int = 3,
+        max_len: int = 15,
+        min_frequency: int = 50,
+        sketch_width: Optional[int] = None,
+        sketch_depth: int = 4,
+    ):
+        self.min_len = min_len
+        self.max_len = max_len
+        self.min_frequency = min_frequency
+
+        self.exact: Optional[Counter] = None
+        self.sketch: Optional[CountMinSketch] = None
+        if sketch_width is None:
+            self.exact = Counter()
+        else:
+            self.sketch = CountMinSketch(width=sketch_width, depth=sketch_depth)
+
+        # n-gram → count, for n-grams with count >= min_frequency
+        self.heavy: Dict[Tuple[int, ...], int] = {}
+
+    def _ngrams(self, seq: Sequence[int]):
+        seq = tuple(seq)
+        for n in range(self.min_len, self.max_len + 1):
+            for i in range(len(seq) - n + 1):
+                yield seq[i:i+n]
+
+    def _update(self, ngram: Tuple[int, ...], amount: int) -> None:
+        if self.exact is not None:
+            count = self.exact[ngram] + amount
+            if count > 0:
+                self.exact[ngram] = count
+            else:
+                del self.exact[ngram]
+        else:
+            count = self.sketch.add(ngram, amount)
+
+        if count >= self.min_frequency:
+            self.heavy[ngram] = count
+        else:
+            self.heavy.pop(ngram, None)
+
+    def add(self, seq: Sequence[int]) -> None:
+        """Count every n-gram of *seq*."""
+        for ngram in self._ngrams(seq):
+            self._update(ngram, 1)
+
+    def remove(self, seq: Sequence[int]) -> None:
+        """Un-count every n-gram of a previously added *seq*."""
+        for ngram in self._ngrams(seq):
+            self._update(ngram, -1)
+
+    def count(self, ngram: Sequence[int]) -> int:
+        ngram = tuple(ngram)
+        if self.exact is not None:
+            return self.exact.get(ngram, 0)
+        return self.sketch.estimate(ngram)
+
+    def maximal_heavy(self) -> Dict[Tuple[int, ...], int]:
+        """
+        Heavy hitters that are maximal: no one-longer extension (left or
+        right) occurs as often.  This is the streaming counterpart of the
+        suffix automaton's maximal repeats; without it every sub-n-gram of
+        a frequent pattern would compete with the pattern itself.
+        """
+        covered = set()
+        for ngram, count in self.heavy.items():
+            if len(ngram) > self.min_len:
+                for sub in (ngram[:-1], ngram[1:]):
+                    if self.heavy.get(sub) == count:
+                        covered.add(sub)
+        return {ngram: count for ngram, count in self.heavy.items() if ngram not in covered}
+
+    def top_k(self, k: int = 20, maximal: bool = True) -> List[Tuple[List[int], int]]:
+        """
+        The *k* most frequent heavy-hitter n-grams, most frequent first.
+
+        With *maximal* (default) only :meth:`maximal_heavy` entries are
+        ranked.  Ties prefer longer n-grams.  Cost depends only on the
+        number of heavy hitters, not on the buffer size.
+        """
+        candidates = self.maximal_heavy() if maximal else self.heavy
+        best = heapq.nlargest(
+            k, candidates.items(), key=lambda kv: (kv[1], len(kv[0]))
+        )
+        return [(list(ngram), count) for ngram, count in best]
+
+    def clear(self) -> None:
+        if self.exact is not None:
+            self.exact.clear()
+        else:
+            self.sketch = CountMinSketch(width=self.sketch.width, depth=self.sketch.depth)
+        self.heavy.clear()
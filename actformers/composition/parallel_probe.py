@@ -0,0 +1,169 @@
+"""
+Parallel Probe Evaluation — fans macro-candidate probing out across a
+process pool.
+
+Each worker process is initialised once with a read-only copy of the model
+and the shared probe set.  A probe task only ships the candidate's name and
+sub-actions; the worker registers the macro in *its own* copy of the action
+space, runs the user's probe function, and unregisters it again, so
+candidates never interfere with each other or with the training process.
+Workers start lazily and may copy the model after a caller (such as
+``CompositionDiscovery.discovery_step``) has registered the whole batch of
+candidates, so every candidate of an :meth:`ParallelProbeEvaluator.evaluate`
+call is hidden from the worker's action space while one is probed.
+
+The probe function has the signature::
+
+    probe_fn(model, probe_set, macro: MacroAction) -> (baseline_acc, macro_acc)
+
+and must be picklable (a module-level function) when the pool uses the
+``spawn`` start method.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import torch
+import torch.nn as nn
+
+from actformers.core.action_space import ActionToken, MacroAction
+
+__all__ = ["ParallelProbeEvaluator"]
+
+
+ProbeFn = Callable[[nn.Module, Any, MacroAction], Tuple[float, float]]
+
+# Per-worker globals, populated by _init_worker
+_worker_model: Optional[nn.Module] = None
+_worker_probe_set: Any = None
+_worker_probe_fn: Optional[ProbeFn] = None
+
+
+def _init_worker(model: nn.Module, probe_set: Any, probe_fn: ProbeFn, num_threads: int) -> None:
+    global _worker_model, _worker_probe_set, _worker_probe_fn
+    torch.set_num_threads(num_threads)
+    model.eval()
+    for p in model.parameters():
+        p.requires_grad_(False)
+    _worker_model = model
+    _worker_probe_set = probe_set
+    _worker_probe_fn = probe_fn
+
+
+def _probe_candidate(
+    name: str,
+    sub_actions: List[ActionToken],
+    hidden: List[str],
+) -> Tuple[str, float, float]:
+    """Probe one candidate with the macros named in *hidden* (the whole
+    candidate batch) temporarily removed from the worker's action space."""
+    aspace = _worker_model.action_space
+    stashed = [aspace.macro_library[n] for n in hidden if n in aspace.macro_library]
+    for other in stashed:
+        aspace.remove_macro(other.name)
+    macro = MacroAction(name=name, sub_actions=list(sub_actions))
+    aspace.register_macro(macro)
+    try:
+        with torch.no_grad():
+            baseline_acc, macro_acc = _worker_probe_fn(_worker_model, _worker_probe_set, macro)
+    finally:
+        aspace.remove_macro(name)
+        for other in stashed:
+            aspace.register_macro(other, macro_id=other.macro_id)
+    return name, float(baseline_acc), float(macro_acc)
+
+
+class ParallelProbeEvaluator:
+    """
+    Evaluates many macro candidates concurrently.
+
+    The pool is started lazily on the first :meth:`evaluate` call.  Workers
+    hold a snapshot of the model taken at pool start; call
+    :meth:`update_model` after training steps to have the next evaluation
+    re-fork workers with fresh weights.
+
+    Args:
+        model: Actformer (or any module with an ``action_space``).
+        probe_set: Held-out probe data passed to ``probe_fn``.
+        probe_fn: ``(model, probe_set, macro) -> (baseline_acc, macro_acc)``.
+        num_workers: Pool size (default: CPU count).
+        mp_context: Multiprocessing start method ('fork', 'spawn', ...).
+        threads_per_worker: torch intra-op threads per worker.
+    """
+
+    def __init__(
+        self,
+        model: nn.Module,
+        probe_set: Any,
+        probe_fn: ProbeFn,
+        num_workers: Optional[int] = None,
+        mp_context: Optional[str] = None,
+        threads_per_worker: int = 1,
+    ):
+        self.model = model
+        self.probe_set = probe_set
+        self.probe_fn = probe_fn
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.mp_context = mp_context
+        self.threads_per_worker = threads_per_worker
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            ctx = multiprocessing.get_context(self.mp_context)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                mp_context=ctx,
+                initializer=_init_worker,
+                initargs=(self.model, self.probe_set, self.probe_fn, self.threads_per_worker),
+            )
+        return self._pool
+
+    def evaluate(
+        self,
+        candidates: Dict[str, Sequence[ActionToken]],
+    ) -> Dict[str, Optional[Tuple[float, float]]]:
+        """
+        Probe every candidate in parallel, each against the worker's
+        library without any of the others.
+
+        Returns:
+            ``{name: (baseline_acc, macro_acc)}``; ``None`` for candidates
+            whose probe raised.
+        """
+        if not candidates:
+            return {}
+        pool = self._ensure_pool()
+        hidden = list(candidates)
+        futures = {
+            name: pool.submit(_probe_candidate, name, list(sub_actions), hidden)
+            for name, sub_actions in candidates.items()
+        }
+        results: Dict[str, Optional[Tuple[float, float]]] = {}
+        for name, future in futures.items():
+            try:
+                _, baseline_acc, macro_acc = future.result()
+                results[name] = (baseline_acc, macro_acc)
+            except Exception:
+                results[name] = None
+        return results
+
+    def update_model(self, model: Optional[nn.Module] = None) -> None:
+        """Drop the current workers so the next evaluation sees fresh weights."""
+        if model is not None:
+            self.model = model
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def __enter__(self) -> "ParallelProbeEvaluator":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
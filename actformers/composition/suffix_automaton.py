@@ -0,0 +1,217 @@
+"""
+Suffix Automaton — linear-time frequent-substring mining over action traces.
+
+The automaton is built once over the concatenation of all rollouts, with a
+unique negative separator appended after each rollout so that no substring
+ever spans two rollouts.  Every automaton state is an equivalence class of
+substrings sharing the same set of end positions, so occurrence counts are
+computed for *all* substrings at once by propagating counts along suffix
+links — no per-length n-gram enumeration and no tuple allocation.
+
+Mining returns **maximal repeats**: substrings that occur at least
+``min_count`` times and cannot be extended left or right without losing an
+occurrence (subject to the ``[min_len, max_len]`` length window).
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Sequence, Tuple
+
+__all__ = [
+    "SuffixAutomaton",
+    "mine_maximal_repeats",
+]
+
+
+class SuffixAutomaton:
+    """
+    Suffix automaton over a stream of integer symbols.
+
+    Symbols ``>= 0`` are action indices; negative symbols are reserved for
+    rollout separators (see :meth:`add_sequence`).
+
+    Build cost is O(N) amortised in the total number of symbols; the number
+    of states is at most 2N.
+    """
+
+    def __init__(self):
+        self.length: List[int] = [0]
+        self.link: List[int] = [-1]
+        self.trans: List[Dict[int, int]] = [{}]
+        self.cnt: List[int] = [0]
+        self.firstpos: List[int] = [-1]
+        self.text: List[int] = []
+        self._last = 0
+        self._num_separators = 0
+        self._counted = False
+
+    def __len__(self) -> int:
+        return len(self.length)
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    def extend(self, symbol: int) -> None:
+        """Append one symbol (standard online construction)."""
+        length, link, trans = self.length, self.link, self.trans
+        pos = len(self.text)
+        self.text.append(symbol)
+
+        cur = len(length)
+        length.append(length[self._last] + 1)
+        link.append(-1)
+        trans.append({})
+        self.cnt.append(1)
+        self.firstpos.append(pos)
+
+        p = self._last
+        while p != -1 and symbol not in trans[p]:
+            trans[p][symbol] = cur
+            p = link[p]
+
+        if p == -1:
+            link[cur] = 0
+        else:
+            q = trans[p][symbol]
+            if length[p] + 1 == length[q]:
+                link[cur] = q
+            else:
+                clone = len(length)
+                length.append(length[p] + 1)
+                link.append(link[q])
+                trans.append(dict(trans[q]))
+                self.cnt.append(0)
+                self.firstpos.append(self.firstpos[q])
+                while p != -1 and trans[p].get(symbol) == q:
+                    trans[p][symbol] = clone
+                    p = link[p]
+                link[q] = clone
+                link[cur] = clone
+
+        self._last = cur
+        self._counted = False
+
+    def add_sequence(self, seq: Sequence[int]) -> None:
+        """Append *seq* followed by a fresh separator symbol."""
+        for symbol in seq:
+            self.extend(symbol)
+        self._num_separators += 1
+        self.extend(-self._num_separators)
+
+    # ------------------------------------------------------------------
+    # Occurrence counts
+    # ------------------------------------------------------------------
+
+    def _propagate_counts(self) -> List[int]:
+        """
+        Return per-state occurrence counts (|endpos|).
+
+        Counts flow from each state to its suffix-link parent, processed in
+        decreasing ``length`` order (counting sort, O(N)).
+        """
+        if self._counted:
+            return self._occ
+        n = len(self.length)
+        max_len = max(self.length)
+        buckets = [0] * (max_len + 1)
+        for length in self.length:
+            buckets[length] += 1
+        for i in range(1, max_len + 1):
+            buckets[i] += buckets[i - 1]
+        order = [0] * n
+        for v in range(n - 1, -1, -1):
+            buckets[self.length[v]] -= 1
+            order[buckets[self.length[v]]] = v
+
+        occ = list(self.cnt)
+        for v in reversed(order):
+            parent = self.link[v]
+            if parent >= 0:
+                occ[parent] += occ[v]
+        self._occ = occ
+        self._counted = True
+        return occ
+
+    def count(self, pattern: Sequence[int]) -> int:
+        """Number of (possibly overlapping) occurrences of *pattern*."""
+        occ = self._propagate_counts()
+        v = 0
+        for symbol in pattern:
+            v = self.trans[v].get(symbol, -1)
+            if v == -1:
+                return 0
+        return occ[v] if pattern else 0
+
+    # ------------------------------------------------------------------
+    # Mining
+    # ------------------------------------------------------------------
+
+    def maximal_repeats(
+        self,
+        min_len: int,
+        max_len: int,
+        min_count: int,
+    ) -> List[Tuple[Tuple[int, ...], int]]:
+        """
+        Enumerate maximal repeats with length in ``[min_len, max_len]``.
+
+        Each state contributes at most one candidate: its longest string,
+        truncated (from the left) to ``max_len``.  A state is skipped if it
+        can be extended to the right by a real action without losing an
+        occurrence, i.e. if some action transition leads to a state with the
+        same count.
+
+        Returns:
+            List of ``(ngram, count)`` pairs (unsorted).
+        """
+        occ = self._propagate_counts()
+        text = self.text
+
+        # Prefix sums of separator positions → O(1) "contains separator" test
+        sep_prefix = [0] * (len(text) + 1)
+        for i, symbol in enumerate(text):
+            sep_prefix[i + 1] = sep_prefix[i] + (symbol < 0)
+
+        results: List[Tuple[Tuple[int, ...], int]] = []
+        for v in range(1, len(self.length)):
+            c = occ[v]
+            if c < min_count:
+                continue
+            L = min(self.length[v], max_len)
+            if L < min_len or L <= self.length[self.link[v]]:
+                continue
+            end = self.firstpos[v]
+            start = end - L + 1
+            if sep_prefix[end + 1] - sep_prefix[start] > 0:
+                continue
+            if self.length[v] < max_len and any(
+                symbol >= 0 and occ[w] == c for symbol, w in self.trans[v].items()
+            ):
+                continue  # not right-maximal
+            results.append((tuple(text[start:end + 1]), c))
+        return results
+
+
+def mine_maximal_repeats(
+    sequences: Sequence[Sequence[int]],
+    min_len: int = 3,
+    max_len: int = 15,
+    min_count: int = 2,
+    top_k: int = 20,
+) -> List[Tuple[List[int], int]]:
+    """
+    Top-k maximal repeats across *sequences*, most frequent first.
+
+    Ties are broken by preferring longer repeats (more compression per
+    macro call), then lexicographically for determinism.
+
+    Returns:
+        List of ``(subsequence, count)`` pairs.
+    """
+    sam = SuffixAutomaton()
+    for seq in sequences:
+        sam.add_sequence(seq)
+    repeats = sam.maximal_repeats(min_len, max_len, min_count)
+    repeats.sort(key=lambda rc: (-rc[1], -len(rc[0]), rc[0]))
+    return [(list(ngram), count) for ngram, count in repeats[:top_k]]
@@ -0,0 +1,135 @@
+"""
+Macro Tokenizer — compresses flat action traces with the macro library.
+
+Encoding walks the trace left to right and, at every position, replaces
+the longest macro body that matches there with a single CALL_TOOL token
+(greedy longest-match over a trie of macro bodies, the decode-side view of
+BPE merges).  Decoding expands every CALL_TOOL token back into its body,
+recursively, so ``decode(encode(trace)) == trace`` for any trace.
+
+Training on compressed traces means fewer action-loop steps per sample;
+``Actformer.forward`` executes a CALL_TOOL token as the whole macro.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from actformers.core.action_space import ActionSpace
+
+__all__ = ["MacroTokenizer"]
+
+
+class _TrieNode:
+    __slots__ = ("children", "macro_id", "depth")
+
+    def __init__(self, depth: int = 0):
+        self.children: Dict[int, "_TrieNode"] = {}
+        self.macro_id: Optional[int] = None
+        self.depth = depth
+
+
+class MacroTokenizer:
+    """
+    Greedy trie-based encoder/decoder between flat and macro-call traces.
+
+    The trie is rebuilt lazily whenever the action space's macro library
+    changes (tracked via ``ActionSpace.macro_version``).
+
+    Args:
+        action_space: Action space holding the registered macros.
+        min_macro_length: Macros shorter than this are never substituted
+            (a length-1 macro saves no steps).
+    """
+
+    def __init__(self, action_space: ActionSpace, min_macro_length: int = 2):
+        self.action_space = action_space
+        self.min_macro_length = min_macro_length
+        self._root = _TrieNode()
+        self._bodies: Dict[int, List[int]] = {}
+        self._version: Optional[int] = None
+
+    # ------------------------------------------------------------------
+    # Trie maintenance
+    # ------------------------------------------------------------------
+
+    def refresh(self) -> None:
+        """Rebuild the trie from the current macro library."""
+        aspace = self.action_space
+        self._root = _TrieNode()
+        self._bodies = {}
+        for macro in aspace.macro_library.values():
+            body = [aspace.encode_token_flat(t) for t in macro.sub_actions]
+            self._bodies[macro.macro_id] = body
+            if len(body) < self.min_macro_length:
+                continue
+            node = self._root
+            for idx in body:
+                child = node.children.get(idx)
+                if child is None:
+                    child = node.children[idx] = _TrieNode(node.depth + 1)
+                node = child
+            # On duplicate bodies keep the smallest id for determinism
+            if node.macro_id is None or macro.macro_id < node.macro_id:
+                node.macro_id = macro.macro_id
+        self._version = aspace.macro_version
+
+    def _ensure_fresh(self) -> None:
+        if self._version != self.action_space.macro_version:
+            self.refresh()
+
+    # ------------------------------------------------------------------
+    # Encode / decode
+    # ------------------------------------------------------------------
+
+    def _longest_match(self, trace: Sequence[int], start: int) -> Tuple[Optional[int], int]:
+        node = self._root
+        best_id, best_len = None, 0
+        for i in range(start, len(trace)):
+            node = node.children.get(trace[i])
+            if node is None:
+                break
+            if node.macro_id is not None:
+                best_id, best_len = node.macro_id, node.depth
+        return best_id, best_len
+
+    def encode(self, flat_trace: Sequence[int]) -> List[int]:
+        """
+        Compress a flat trace into a sequence of primitive and macro-call
+        flat indices.
+        """
+        self._ensure_fresh()
+        aspace = self.action_space
+        out: List[int] = []
+        i = 0
+        while i < len(flat_trace):
+            macro_id, length = self._longest_match(flat_trace, i)
+            if macro_id is None:
+                out.append(flat_trace[i])
+                i += 1
+            else:
+                out.append(aspace.encode_token_flat(aspace.make_macro_call(macro_id)))
+                i += length
+        return out
+
+    def decode(self, compressed: Sequence[int]) -> List[int]:
+        """Expand every macro call (recursively) back to primitive indices."""
+        self._ensure_fresh()
+        aspace = self.action_space
+        out: List[int] = []
+        stack = list(reversed(compressed))
+        while stack:
+            idx = stack.pop()
+            macro_id = aspace.macro_id_from_token(aspace.decode_flat_token(idx))
+            body = self._bodies.get(macro_id) if macro_id is not None else None
+            if body is None:
+                out.append(idx)
+            else:
+                stack.extend(reversed(body))
+        return out
+
+    def compression_ratio(self, flat_trace: Sequence[int]) -> float:
+        """len(encoded) / len(flat); lower is better."""
+        if not flat_trace:
+            return 1.0
+        return len(self.encode(flat_trace)) / len(flat_trace)
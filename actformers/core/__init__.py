@@ -1,13 +1,39 @@
-from .action_space import (
-    ActionType,
-    ActionToken,
-    FactorizedActionEmbedding,
-    ActionSpace,
-    MacroAction,
-)
-from .working_memory import MemoryState, WorkingMemory
-from .primitives import DifferentiablePrimitives
-from .execution_engine import ActionExecutionEngine
+import importlib
+from typing import TYPE_CHECKING
+
+# Resolved lazily so the torch-free ``core.actions`` can be imported alone
+_LAZY_ATTRS = {
+    "ActionType": ".actions",
+    "ActionToken": ".actions",
+    "FactorizedActionEmbedding": ".action_space",
+    "ActionSpace": ".action_space",
+    "MacroAction": ".action_space",
+    "MemoryState": ".working_memory",
+    "WorkingMemory": ".working_memory",
+    "DifferentiablePrimitives": ".primitives",
+    "ActionExecutionEngine": ".execution_engine",
+}
+
+if TYPE_CHECKING:
+    from .actions import ActionType, ActionToken
+    from .action_space import FactorizedActionEmbedding, ActionSpace, MacroAction
+    from .working_memory import MemoryState, WorkingMemory
+    from .primitives import DifferentiablePrimitives
+    from .execution_engine import ActionExecutionEngine
+
+
+def __getattr__(name: str):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
 
 __all__ = [
     "ActionType",
@@ -19,4 +45,4 @@ __all__ = [
     "WorkingMemory",
     "DifferentiablePrimitives",
     "ActionExecutionEngine",
-]
\ No newline at end of file
+]
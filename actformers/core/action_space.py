@@ -13,8 +13,31 @@ from __future__ import annotations
 import torch
 import torch.nn as nn
 from dataclasses import dataclass, field
-from enum import IntEnum
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional
+
+# ActionType / ActionToken live in the torch-free ``actions`` module
+from .actions import (
+    NUM_ACTION_TYPES,
+    ActionToken,
+    ActionType,
+    make_add,
+    make_load,
+    make_read,
+    make_write,
+    make_store,
+    make_output,
+    make_halt,
+    make_pointer_move,
+    make_digit_extract,
+    make_digit_pack,
+    make_subtract,
+    make_multiply,
+    make_compare,
+    make_loop,
+    make_if,
+    make_break,
+    make_nop,
+)
 
 __all__ = [
     "ActionType",
@@ -22,164 +45,27 @@ __all__ = [
     "FactorizedActionEmbedding",
     "ActionSpace",
     "MacroAction",
+    # Re-exported from ``actions`` for existing imports
+    "make_add",
+    "make_load",
+    "make_read",
+    "make_write",
+    "make_store",
+    "make_output",
+    "make_halt",
+    "make_pointer_move",
+    "make_digit_extract",
+    "make_digit_pack",
+    "make_subtract",
+    "make_multiply",
+    "make_compare",
+    "make_loop",
+    "make_if",
+    "make_break",
+    "make_nop",
 ]
 
 
-# ---------------------------------------------------------------------------
-# Action Types
-# ---------------------------------------------------------------------------
-
-class ActionType(IntEnum):
-    """Categories of computational actions the model can perform."""
-    # Primitive Operations
-    READ = 0
-    WRITE = 1
-    ADD = 2
-    SUBTRACT = 3
-    MULTIPLY = 4
-    COMPARE = 5
-    # Memory Operations
-    LOAD = 6
-    STORE = 7
-    POINTER_MOVE = 8
-    # Control Flow
-    IF = 9
-    LOOP = 10
-    BREAK = 11
-    # Meta Operations
-    OUTPUT = 12
-    HALT = 13
-    CALL_TOOL = 14
-    # Extended
-    DIGIT_EXTRACT = 15
-    DIGIT_PACK = 16
-    SHIFT_LEFT = 17
-    SHIFT_RIGHT = 18
-    MAX_OP = 19
-    MIN_OP = 20
-    MOD_OP = 21
-    DIVIDE_SAFE = 22
-    NOP = 23  # no-op for padding
-
-
-NUM_ACTION_TYPES = len(ActionType)  # 24
-
-
-# ---------------------------------------------------------------------------
-# Structured Action Token
-# ---------------------------------------------------------------------------
-
-@dataclass(frozen=True)
-class ActionToken:
-    """
-    Structured, deterministic action representation.
-
-    Fields map directly to embedding table indices — no hashing, no collisions.
-    """
-    op_id: int       # index into OP vocabulary (0..NUM_ACTION_TYPES-1)
-    arg0: int = 0    # register / pointer / value index (0..31)
-    arg1: int = 0
-    arg2: int = 0
-    modifier: int = 0  # flags: e.g. carry-bit, branch condition (0..15)
-
-    def __post_init__(self):
-        # Clamp to vocab ranges to prevent OOB on embedding lookup
-        object.__setattr__(self, "op_id", min(max(self.op_id, 0), NUM_ACTION_TYPES - 1))
-        object.__setattr__(self, "arg0", min(max(self.arg0, 0), 31))
-        object.__setattr__(self, "arg1", min(max(self.arg1, 0), 31))
-        object.__setattr__(self, "arg2", min(max(self.arg2, 0), 31))
-        object.__setattr__(self, "modifier", min(max(self.modifier, 0), 15))
-
-    def components(self) -> Tuple[int, int, int, int, int]:
-        return (self.op_id, self.arg0, self.arg1, self.arg2, self.modifier)
-
-    def to_flat_index(self, op_slots: int = 64, arg_slots: int = 32, mod_slots: int = 16) -> int:
-        """Convert to a single integer for flat softmax prediction."""
-        return (
-            self.op_id * (arg_slots ** 3) * mod_slots
-            + self.arg0 * (arg_slots ** 2) * mod_slots
-            + self.arg1 * arg_slots * mod_slots
-            + self.arg2 * mod_slots
-            + self.modifier
-        )
-
-    @staticmethod
-    def from_flat_index(idx: int, arg_slots: int = 32, mod_slots: int = 16) -> "ActionToken":
-        """Inverse of to_flat_index."""
-        modifier = idx % mod_slots
-        idx //= mod_slots
-        arg2 = idx % arg_slots
-        idx //= arg_slots
-        arg1 = idx % arg_slots
-        idx //= arg_slots
-        arg0 = idx % arg_slots
-        op_id = idx // arg_slots
-        return ActionToken(op_id=op_id, arg0=arg0, arg1=arg1, arg2=arg2, modifier=modifier)
-
-    def is_halt(self) -> bool:
-        return self.op_id == ActionType.HALT
-
-    def __repr__(self) -> str:
-        try:
-            op_name = ActionType(self.op_id).name
-        except ValueError:
-            op_name = f"UNK({self.op_id})"
-        return f"ActionToken({op_name}, a0={self.arg0}, a1={self.arg1}, a2={self.arg2}, mod={self.modifier})"
-
-
-# Convenience constructors
-def make_add(src_a: int, src_b: int, dst: int, carry_mod: int = 0) -> ActionToken:
-    return ActionToken(op_id=int(ActionType.ADD), arg0=src_a, arg1=src_b, arg2=dst, modifier=carry_mod)
-
-def make_load(value_reg: int, target_reg: int, mod: int = 0) -> ActionToken:
-    return ActionToken(op_id=int(ActionType.LOAD), arg0=value_reg, arg1=target_reg, modifier=mod)
-
-def make_read(src_reg: int, dst_reg: int, ptr: int = 0) -> ActionToken:
-    return ActionToken(op_id=int(ActionType.READ), arg0=src_reg, arg1=dst_reg, arg2=ptr)
-
-def make_write(src_reg: int, dst_reg: int, mod: int = 0) -> ActionToken:
-    return ActionToken(op_id=int(ActionType.WRITE), arg0=src_reg, arg1=dst_reg, modifier=mod)
-
-def make_store(src_reg: int, dst_reg: int, mod: int = 0) -> ActionToken:
-    return ActionToken(op_id=int(ActionType.STORE), arg0=src_reg, arg1=dst_reg, modifier=mod)
-
-def make_output(reg: int, mod: int = 0) -> ActionToken:
-    return ActionToken(op_id=int(ActionType.OUTPUT), arg0=reg, modifier=mod)
-
-def make_halt() -> ActionToken:
-    return ActionToken(op_id=int(ActionType.HALT))
-
-def make_pointer_move(ptr_idx: int, direction: int, amount: int = 1) -> ActionToken:
-    return ActionToken(op_id=int(ActionType.POINTER_MOVE), arg0=ptr_idx, arg1=direction, arg2=amount)
-
-def make_digit_extract(src_reg: int, dst_reg: int, digit_pos: int) -> ActionToken:
-    return ActionToken(op_id=int(ActionType.DIGIT_EXTRACT), arg0=src_reg, arg1=dst_reg, arg2=digit_pos)
-
-def make_digit_pack(src_reg: int, dst_reg: int, digit_pos: int) -> ActionToken:
-    return ActionToken(op_id=int(ActionType.DIGIT_PACK), arg0=src_reg, arg1=dst_reg, arg2=digit_pos)
-
-def make_subtract(src_a: int, src_b: int, dst: int, mod: int = 0) -> ActionToken:
-    return ActionToken(op_id=int(ActionType.SUBTRACT), arg0=src_a, arg1=src_b, arg2=dst, modifier=mod)
-
-def make_multiply(src_a: int, src_b: int, dst: int, mod: int = 0) -> ActionToken:
-    return ActionToken(op_id=int(ActionType.MULTIPLY), arg0=src_a, arg1=src_b, arg2=dst, modifier=mod)
-
-def make_compare(src_a: int, src_b: int, dst: int, mod: int = 0) -> ActionToken:
-    return ActionToken(op_id=int(ActionType.COMPARE), arg0=src_a, arg1=src_b, arg2=dst, modifier=mod)
-
-def make_loop(counter_reg: int, limit_reg: int, mod: int = 0) -> ActionToken:
-    return ActionToken(op_id=int(ActionType.LOOP), arg0=counter_reg, arg1=limit_reg, modifier=mod)
-
-def make_if(cond_reg: int, mod: int = 0) -> ActionToken:
-    return ActionToken(op_id=int(ActionType.IF), arg0=cond_reg, modifier=mod)
-
-def make_break() -> ActionToken:
-    return ActionToken(op_id=int(ActionType.BREAK))
-
-def make_nop() -> ActionToken:
-    return ActionToken(op_id=int(ActionType.NOP))
-
-
 # ---------------------------------------------------------------------------
 # Factorized Action Embedding
 # ---------------------------------------------------------------------------
@@ -255,6 +141,18 @@ class FactorizedActionEmbedding(nn.Module):
         ms = torch.tensor([t.modifier for t in tokens])
         return self.forward(ops, a0s, a1s, a2s, ms)
 
+    def embed_components(self, components: torch.LongTensor) -> torch.Tensor:
+        """
+        Embed decoded components (see ``ActionSpace.decode_flat_batch``).
+
+        Args:
+            components: (..., 5) integer tensor of [op, arg0, arg1, arg2, mod].
+
+        Returns:
+            (..., embed_dim) embeddings.
+        """
+        return self.forward(*components.unbind(-1))
+
 
 # ---------------------------------------------------------------------------
 # Macro Action
@@ -303,8 +201,16 @@ class ActionSpace:
 
     Flat vocab size for the action predictor output head:
         flat_vocab = op_vocab * arg_vocab^3 * mod_vocab
+
+    Batches of flat indices are decoded with :meth:`decode_flat_batch`,
+    which gathers from a precomputed ``(flat_vocab, 5)`` component table
+    (built lazily, one copy per device) when the vocab has at most
+    ``decode_table_max_entries`` entries, and falls back to tensor
+    arithmetic otherwise.
     """
 
+    decode_table_max_entries: int = 1 << 20
+
     def __init__(
         self,
         num_registers: int = 16,
@@ -324,21 +230,143 @@ class ActionSpace:
         # Flat vocab size for single-step prediction
         self.flat_vocab_size = op_vocab * (arg_vocab ** 3) * mod_vocab
 
-        # Macro library
+        # Macro library (keyed by name) and reverse index by macro_id
         self.macro_library: Dict[str, MacroAction] = {}
-        self._next_macro_id: int = 0
+        self._macro_by_id: Dict[int, MacroAction] = {}
+        # Bumped on every register/remove so dependents (e.g. the macro
+        # tokenizer) can cheaply detect a stale view of the library
+        self.macro_version: int = 0
+
+        # device -> (flat_vocab, 5) component table
+        self._decode_tables: Dict[torch.device, torch.Tensor] = {}
 
-    def register_macro(self, macro: MacroAction) -> None:
-        macro.macro_id = self._next_macro_id
-        self._next_macro_id += 1
+    @property
+    def max_macro_calls(self) -> int:
+        """Number of distinct macro ids addressable by a CALL_TOOL token."""
+        return self.arg_vocab ** 3
+
+    def register_macro(self, macro: MacroAction, macro_id: Optional[int] = None) -> None:
+        """
+        Register *macro* and assign it the lowest free macro_id.
+
+        Ids of removed macros are reused so that ids stay within
+        ``max_macro_calls`` (and the macro embedding table) no matter how
+        many candidates discovery proposes and rejects.  An explicit, free
+        *macro_id* (e.g. when restoring a checkpoint) is used as is.
+        """
+        self.remove_macro(macro.name)
+        if macro_id is not None and macro_id in self._macro_by_id:
+            raise ValueError(f"Macro id {macro_id} is already taken")
+        if macro_id is None:
+            macro_id = 0
+            while macro_id in self._macro_by_id:
+                macro_id += 1
+        if macro_id >= self.max_macro_calls:
+            raise ValueError(
+                f"Macro id space exhausted ({self.max_macro_calls} CALL_TOOL ids)"
+            )
+        macro.macro_id = macro_id
         self.macro_library[macro.name] = macro
+        self._macro_by_id[macro_id] = macro
+        self.macro_version += 1
 
     def remove_macro(self, name: str) -> None:
-        self.macro_library.pop(name, None)
+        macro = self.macro_library.pop(name, None)
+        if macro is not None:
+            self._macro_by_id.pop(macro.macro_id, None)
+            self.macro_version += 1
 
     def total_macro_count(self) -> int:
         return len(self.macro_library)
 
+    def get_macro_by_id(self, macro_id: int) -> Optional[MacroAction]:
+        return self._macro_by_id.get(macro_id)
+
+    # ------------------------------------------------------------------
+    # Macro call tokens
+    # ------------------------------------------------------------------
+
+    def make_macro_call(self, macro_id: int) -> ActionToken:
+        """
+        CALL_TOOL token invoking *macro_id*.
+
+        The id is packed base-``arg_vocab`` into (arg0, arg1, arg2) so that
+        every call token is representable in the flat vocabulary.
+        """
+        v = self.arg_vocab
+        return ActionToken(
+            op_id=int(ActionType.CALL_TOOL),
+            arg0=macro_id // (v * v),
+            arg1=(macro_id // v) % v,
+            arg2=macro_id % v,
+        )
+
+    def macro_id_from_token(self, token: ActionToken) -> Optional[int]:
+        """Inverse of :meth:`make_macro_call`; None for non-CALL_TOOL tokens."""
+        if token.op_id != ActionType.CALL_TOOL:
+            return None
+        v = self.arg_vocab
+        return (token.arg0 * v + token.arg1) * v + token.arg2
+
+    def macro_for_token(self, token: ActionToken) -> Optional[MacroAction]:
+        """Registered macro invoked by *token*, or None."""
+        macro_id = self.macro_id_from_token(token)
+        return None if macro_id is None else self._macro_by_id.get(macro_id)
+
+    # ------------------------------------------------------------------
+    # Flat index encode / decode
+    # ------------------------------------------------------------------
+
+    def _decode_arithmetic(self, indices: torch.Tensor) -> torch.Tensor:
+        """Tensor version of ``ActionToken.from_flat_index`` (incl. clamping)."""
+        v, m = self.arg_vocab, self.mod_vocab
+        mod = indices % m
+        rest = indices // m
+        arg2 = rest % v
+        rest = rest // v
+        arg1 = rest % v
+        rest = rest // v
+        arg0 = rest % v
+        op = rest // v
+        return torch.stack([
+            op.clamp(0, NUM_ACTION_TYPES - 1),
+            arg0.clamp(0, 31),
+            arg1.clamp(0, 31),
+            arg2.clamp(0, 31),
+            mod.clamp(0, 15),
+        ], dim=-1)
+
+    def decode_table(self, device: Optional[torch.device] = None) -> Optional[torch.Tensor]:
+        """
+        ``(flat_vocab, 5)`` long tensor mapping flat index → components, or
+        None when the vocab is too large to tabulate.
+        """
+        device = torch.device(device) if device is not None else torch.device("cpu")
+        table = self._decode_tables.get(device)
+        if table is None:
+            if self.flat_vocab_size > self.decode_table_max_entries:
+                return None
+            table = self._decode_arithmetic(torch.arange(self.flat_vocab_size)).to(device)
+            self._decode_tables[device] = table
+        return table
+
+    def decode_flat_batch(self, indices: torch.Tensor) -> torch.LongTensor:
+        """
+        Decode a tensor of flat indices in one vectorized op.
+
+        Args:
+            indices: (...) integer tensor with values in [0, flat_vocab).
+
+        Returns:
+            (..., 5) long tensor of [op, arg0, arg1, arg2, mod], ready for
+            ``FactorizedActionEmbedding.embed_components``.
+        """
+        indices = indices.long()
+        table = self.decode_table(indices.device)
+        if table is None:
+            return self._decode_arithmetic(indices)
+        return table[indices]
+
     def decode_flat_token(self, idx: int) -> ActionToken:
         return ActionToken.from_flat_index(idx, arg_slots=self.arg_vocab, mod_slots=self.mod_vocab)
 
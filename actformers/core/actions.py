@@ -0,0 +1,263 @@
+"""
+Actformer Actions — the torch-free symbolic core of the action space.
+
+Holds ``ActionType``, ``ActionToken`` and the ``make_*`` convenience
+constructors.  Nothing here imports torch, so trace generation, symbolic
+interpretation and CLI tooling can use actions without paying the torch
+import cost.  ``actformers.core.action_space`` re-exports everything.
+"""
+
+from __future__ import annotations
+
+from enum import IntEnum
+from typing import Dict, Tuple
+
+__all__ = [
+    "ActionType",
+    "ActionToken",
+    "NUM_ACTION_TYPES",
+]
+
+
+# ---------------------------------------------------------------------------
+# Action Types
+# ---------------------------------------------------------------------------
+
+class ActionType(IntEnum):
+    """Categories of computational actions the model can perform."""
+    # Primitive Operations
+    READ = 0
+    WRITE = 1
+    ADD = 2
+    SUBTRACT = 3
+    MULTIPLY = 4
+    COMPARE = 5
+    # Memory Operations
+    LOAD = 6
+    STORE = 7
+    POINTER_MOVE = 8
+    # Control Flow
+    IF = 9
+    LOOP = 10
+    BREAK = 11
+    # Meta Operations
+    OUTPUT = 12
+    HALT = 13
+    CALL_TOOL = 14
+    # Extended
+    DIGIT_EXTRACT = 15
+    DIGIT_PACK = 16
+    SHIFT_LEFT = 17
+    SHIFT_RIGHT = 18
+    MAX_OP = 19
+    MIN_OP = 20
+    MOD_OP = 21
+    DIVIDE_SAFE = 22
+    NOP = 23  # no-op for padding
+
+
+NUM_ACTION_TYPES = len(ActionType)  # 24
+
+
+# ---------------------------------------------------------------------------
+# Structured Action Token
+# ---------------------------------------------------------------------------
+
+# Upper bound (inclusive) of each field, and its bit offset in the packed int
+_FIELD_MAX = (NUM_ACTION_TYPES - 1, 31, 31, 31, 15)
+_FIELD_SHIFT = (19, 14, 9, 4, 0)
+
+# Interning table: canonical (clamped) components -> the single token instance
+_INTERNED: Dict[Tuple[int, int, int, int, int], "ActionToken"] = {}
+# (arg_slots, mod_slots) -> {flat index -> token}
+_FLAT_DECODE: Dict[Tuple[int, int], Dict[int, "ActionToken"]] = {}
+
+
+class ActionToken:
+    """
+    Structured, deterministic action representation.
+
+    Fields map directly to embedding table indices — no hashing, no collisions.
+
+    Tokens are immutable and interned: constructing a token with the same
+    (clamped) components always returns the same instance, so the trace
+    generators' millions of constructions are a dict lookup each.  The
+    components are also available packed into one 24-bit int
+    (``packed``, 5/5/5/5/4 bits for op/arg0/arg1/arg2/modifier).
+    """
+    __slots__ = ("op_id", "arg0", "arg1", "arg2", "modifier", "packed",
+                 "_flat_layout", "_flat_index")
+
+    op_id: int       # index into OP vocabulary (0..NUM_ACTION_TYPES-1)
+    arg0: int        # register / pointer / value index (0..31)
+    arg1: int
+    arg2: int
+    modifier: int    # flags: e.g. carry-bit, branch condition (0..15)
+    packed: int
+
+    def __new__(cls, op_id: int, arg0: int = 0, arg1: int = 0, arg2: int = 0, modifier: int = 0):
+        key = (op_id, arg0, arg1, arg2, modifier)
+        token = _INTERNED.get(key)
+        if token is not None:
+            return token
+        # Clamp to vocab ranges to prevent OOB on embedding lookup
+        canonical = tuple(min(max(int(v), 0), hi) for v, hi in zip(key, _FIELD_MAX))
+        token = _INTERNED.get(canonical)
+        if token is None:
+            token = object.__new__(cls)
+            for name, value in zip(cls.__slots__, canonical):
+                object.__setattr__(token, name, value)
+            packed = 0
+            for value, shift in zip(canonical, _FIELD_SHIFT):
+                packed |= value << shift
+            object.__setattr__(token, "packed", packed)
+            object.__setattr__(token, "_flat_layout", None)
+            object.__setattr__(token, "_flat_index", 0)
+            _INTERNED[canonical] = token
+        return token
+
+    @classmethod
+    def from_packed(cls, packed: int) -> "ActionToken":
+        """Inverse of ``packed``."""
+        return cls(*((packed >> shift) & (0x1F if shift else 0xF) for shift in _FIELD_SHIFT))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"cannot assign to field {name!r}: ActionToken is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"cannot delete field {name!r}: ActionToken is immutable")
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not ActionToken:
+            return NotImplemented
+        return self.packed == other.packed
+
+    def __hash__(self) -> int:
+        return hash(self.packed)
+
+    def __reduce__(self):
+        return (ActionToken, self.components())
+
+    def __copy__(self) -> "ActionToken":
+        return self
+
+    def __deepcopy__(self, memo) -> "ActionToken":
+        return self
+
+    def components(self) -> Tuple[int, int, int, int, int]:
+        return (self.op_id, self.arg0, self.arg1, self.arg2, self.modifier)
+
+    def to_flat_index(self, op_slots: int = 64, arg_slots: int = 32, mod_slots: int = 16) -> int:
+        """Convert to a single integer for flat softmax prediction."""
+        # Memoised for the last layout used (in practice one per ActionSpace)
+        layout = (arg_slots, mod_slots)
+        if self._flat_layout == layout:
+            return self._flat_index
+        flat = (
+            self.op_id * (arg_slots ** 3) * mod_slots
+            + self.arg0 * (arg_slots ** 2) * mod_slots
+            + self.arg1 * arg_slots * mod_slots
+            + self.arg2 * mod_slots
+            + self.modifier
+        )
+        object.__setattr__(self, "_flat_layout", layout)
+        object.__setattr__(self, "_flat_index", flat)
+        return flat
+
+    @staticmethod
+    def from_flat_index(idx: int, arg_slots: int = 32, mod_slots: int = 16) -> "ActionToken":
+        """Inverse of to_flat_index."""
+        table = _FLAT_DECODE.get((arg_slots, mod_slots))
+        if table is None:
+            table = _FLAT_DECODE[(arg_slots, mod_slots)] = {}
+        token = table.get(idx)
+        if token is not None:
+            return token
+        rest = int(idx)
+        rest, modifier = divmod(rest, mod_slots)
+        rest, arg2 = divmod(rest, arg_slots)
+        rest, arg1 = divmod(rest, arg_slots)
+        op_id, arg0 = divmod(rest, arg_slots)
+        token = table[int(idx)] = ActionToken(op_id, arg0, arg1, arg2, modifier)
+        return token
+
+    def is_halt(self) -> bool:
+        return self.op_id == ActionType.HALT
+
+    def __repr__(self) -> str:
+        try:
+            op_name = ActionType(self.op_id).name
+        except ValueError:
+            op_name = f"UNK({self.op_id})"
+        return f"ActionToken({op_name}, a0={self.arg0}, a1={self.arg1}, a2={self.arg2}, mod={self.modifier})"
+
+
+# Convenience constructors (positional int op ids hit the intern table directly)
+_OP_ADD = int(ActionType.ADD)
+_OP_LOAD = int(ActionType.LOAD)
+_OP_READ = int(ActionType.READ)
+_OP_WRITE = int(ActionType.WRITE)
+_OP_STORE = int(ActionType.STORE)
+_OP_OUTPUT = int(ActionType.OUTPUT)
+_OP_HALT = int(ActionType.HALT)
+_OP_POINTER_MOVE = int(ActionType.POINTER_MOVE)
+_OP_DIGIT_EXTRACT = int(ActionType.DIGIT_EXTRACT)
+_OP_DIGIT_PACK = int(ActionType.DIGIT_PACK)
+_OP_SUBTRACT = int(ActionType.SUBTRACT)
+_OP_MULTIPLY = int(ActionType.MULTIPLY)
+_OP_COMPARE = int(ActionType.COMPARE)
+_OP_LOOP = int(ActionType.LOOP)
+_OP_IF = int(ActionType.IF)
+_OP_BREAK = int(ActionType.BREAK)
+_OP_NOP = int(ActionType.NOP)
+
+def make_add(src_a: int, src_b: int, dst: int, carry_mod: int = 0) -> ActionToken:
+    return ActionToken(_OP_ADD, src_a, src_b, dst, carry_mod)
+
+def make_load(value_reg: int, target_reg: int, mod: int = 0) -> ActionToken:
+    return ActionToken(_OP_LOAD, value_reg, target_reg, 0, mod)
+
+def make_read(src_reg: int, dst_reg: int, ptr: int = 0) -> ActionToken:
+    return ActionToken(_OP_READ, src_reg, dst_reg, ptr)
+
+def make_write(src_reg: int, dst_reg: int, mod: int = 0) -> ActionToken:
+    return ActionToken(_OP_WRITE, src_reg, dst_reg, 0, mod)
+
+def make_store(src_reg: int, dst_reg: int, mod: int = 0) -> ActionToken:
+    return ActionToken(_OP_STORE, src_reg, dst_reg, 0, mod)
+
+def make_output(reg: int, mod: int = 0) -> ActionToken:
+    return ActionToken(_OP_OUTPUT, reg, 0, 0, mod)
+
+def make_halt() -> ActionToken:
+    return ActionToken(_OP_HALT)
+
+def make_pointer_move(ptr_idx: int, direction: int, amount: int = 1) -> ActionToken:
+    return ActionToken(_OP_POINTER_MOVE, ptr_idx, direction, amount)
+
+def make_digit_extract(src_reg: int, dst_reg: int, digit_pos: int) -> ActionToken:
+    return ActionToken(_OP_DIGIT_EXTRACT, src_reg, dst_reg, digit_pos)
+
+def make_digit_pack(src_reg: int, dst_reg: int, digit_pos: int) -> ActionToken:
+    return ActionToken(_OP_DIGIT_PACK, src_reg, dst_reg, digit_pos)
+
+def make_subtract(src_a: int, src_b: int, dst: int, mod: int = 0) -> ActionToken:
+    return ActionToken(_OP_SUBTRACT, src_a, src_b, dst, mod)
+
+def make_multiply(src_a: int, src_b: int, dst: int, mod: int = 0) -> ActionToken:
+    return ActionToken(_OP_MULTIPLY, src_a, src_b, dst, mod)
+
+def make_compare(src_a: int, src_b: int, dst: int, mod: int = 0) -> ActionToken:
+    return ActionToken(_OP_COMPARE, src_a, src_b, dst, mod)
+
+def make_loop(counter_reg: int, limit_reg: int, mod: int = 0) -> ActionToken:
+    return ActionToken(_OP_LOOP, counter_reg, limit_reg, 0, mod)
+
+def make_if(cond_reg: int, mod: int = 0) -> ActionToken:
+    return ActionToken(_OP_IF, cond_reg, 0, 0, mod)
+
+def make_break() -> ActionToken:
+    return ActionToken(_OP_BREAK)
+
+def make_nop() -> ActionToken:
+    return ActionToken(_OP_NOP)
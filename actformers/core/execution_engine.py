@@ -24,7 +24,9 @@ from .action_space import (
     ActionType,
     ActionSpace,
 )
+from .macro_compiler import CompiledMacro, compile_macro
 from .primitives import DifferentiablePrimitives
+from .profiling import ExecutionProfiler
 from .working_memory import MemoryState, WorkingMemory
 
 __all__ = [
@@ -47,6 +49,8 @@ class ActionExecutionEngine(nn.Module):
         action_space: ActionSpace,
         working_memory: WorkingMemory,
         primitive_dim: int = 64,
+        compile_macros: bool = True,
+        macro_cache_size: int = 1024,
     ):
         super().__init__()
         self.action_space = action_space
@@ -63,6 +67,15 @@ class ActionExecutionEngine(nn.Module):
         # Learned projection: scratchpad_dim → register_dim (replaces random hack)
         self.scratchpad_proj = nn.Linear(primitive_dim, primitive_dim)
 
+        # Compiled macro bodies, keyed by the sub-action sequence itself
+        # (macro ids are reused after removal, bodies are not)
+        self.compile_macros = compile_macros
+        self.macro_cache_size = macro_cache_size
+        self._compiled_macros: Dict[Tuple[ActionToken, ...], CompiledMacro] = {}
+
+        # Opt-in instrumentation (see profiling.ExecutionProfiler)
+        self.profiler: Optional[ExecutionProfiler] = None
+
     def reset_scratchpad_pos(self) -> None:
         self._scratchpad_write_pos = 0
 
@@ -88,6 +101,17 @@ class ActionExecutionEngine(nn.Module):
         Returns:
             New MemoryState with the action applied.
         """
+        if self.profiler is not None:
+            return self.profiler.profile_op(self._execute, action, state, execution_mode)
+        return self._execute(action, state, execution_mode)
+
+    def _execute(
+        self,
+        action: ActionToken,
+        state: MemoryState,
+        execution_mode: str,
+    ) -> MemoryState:
+        """Un-instrumented body of :meth:`execute`."""
         op = ActionType(action.op_id) if action.op_id < len(ActionType) else None
 
         if op is None or op == ActionType.NOP:
@@ -132,6 +156,168 @@ class ActionExecutionEngine(nn.Module):
         handler = dispatch.get(op, self._exec_nop)
         return handler(safe_action, state, execution_mode)
 
+    # ------------------------------------------------------------------
+    # Batched, tensorized dispatch
+    # ------------------------------------------------------------------
+
+    def execute_batch(
+        self,
+        op: torch.Tensor,
+        arg0: torch.Tensor,
+        arg1: torch.Tensor,
+        arg2: torch.Tensor,
+        modifier: torch.Tensor,
+        state: MemoryState,
+        execution_mode: str = "train",
+        static: bool = False,
+    ) -> MemoryState:
+        """
+        Execute a different action in every batch row.
+
+        Each op family is evaluated for the whole batch and its result is
+        selected per row with ``torch.where``, so there is no per-action
+        Python dispatch and no data-dependent control flow.  Row by row
+        the result matches :meth:`execute` (CALL_TOOL is a no-op here;
+        macro expansion happens in the caller).
+
+        Args:
+            op, arg0, arg1, arg2, modifier: (batch,) integer tensors, e.g.
+                the columns of ``ActionSpace.decode_flat_batch``.
+            state: Current working memory (not mutated).
+            execution_mode: ``'train'`` or ``'infer'``.
+            static: Evaluate every op family even when no row uses it.
+                Required for graph capture (``torch.compile``); otherwise
+                absent families are skipped after one ``bincount``.
+
+        Returns:
+            New MemoryState.
+        """
+        T = ActionType
+        wm = self.wm
+        N, P = wm.num_registers, wm.num_pointers
+        batch, dim = state.registers.shape[0], state.registers.shape[-1]
+        train = execution_mode == "train"
+        op = op.long()
+        a0, a1, a2 = arg0.long() % N, arg1.long() % N, arg2.long() % N
+        mod = modifier.long()
+
+        present = None if static else set(torch.bincount(op).nonzero().flatten().tolist())
+
+        def uses(*ops: ActionType) -> bool:
+            return present is None or any(int(o) in present for o in ops)
+
+        def is_op(o: ActionType) -> torch.Tensor:
+            return op == int(o)
+
+        regs = state.registers
+
+        def reg(idx: torch.Tensor) -> torch.Tensor:
+            gathered = regs.gather(1, idx.view(batch, 1, 1).expand(batch, 1, dim))
+            return gathered.squeeze(1).to(wm.compute_dtype)
+
+        val_a, val_b = reg(a0), reg(a1)
+        prims = self.primitives
+
+        # (result, dst register, does-this-row-write) accumulated per family
+        result = torch.zeros_like(val_a)
+        dst = torch.zeros_like(a0)
+        writes = torch.zeros(batch, dtype=torch.bool, device=op.device)
+
+        def select(mask: torch.Tensor, value: torch.Tensor, dst_idx: torch.Tensor) -> None:
+            nonlocal result, dst, writes
+            result = torch.where(mask.view(-1, 1), value, result)
+            dst = torch.where(mask, dst_idx, dst)
+            writes = writes | mask
+
+        # Binary register ops: reg[a2] = f(reg[a0], reg[a1])
+        if uses(T.ADD):
+            added = prims.add(val_a, val_b)
+            carry = reg((a2 + 1) % N)
+            added = torch.where((mod == 1).view(-1, 1), prims.add(added, carry), added)
+            select(is_op(T.ADD), added, a2)
+        for o, fn in (
+            (T.SUBTRACT, prims.subtract),
+            (T.MULTIPLY, prims.multiply),
+            (T.COMPARE, prims.compare),
+            (T.MAX_OP, prims.max_soft),
+            (T.MIN_OP, prims.min_soft),
+            (T.DIVIDE_SAFE, prims.divide_safe),
+            (T.MOD_OP, prims.mod_op),
+        ):
+            if uses(o):
+                select(is_op(o), fn(val_a, val_b), a2)
+
+        # Unary register ops: reg[a1] = f(reg[a0])
+        if uses(T.LOAD):
+            select(is_op(T.LOAD), val_a, a1)
+        if uses(T.DIGIT_EXTRACT):
+            select(is_op(T.DIGIT_EXTRACT), prims.digit_extract(val_a, a2), a1)
+        if uses(T.DIGIT_PACK):
+            select(is_op(T.DIGIT_PACK), prims.digit_pack(val_a, a2, val_b), a1)
+        if uses(T.SHIFT_LEFT):
+            select(is_op(T.SHIFT_LEFT), prims.shift_left(val_a, shift=a2 + 1), a1)
+        if uses(T.SHIFT_RIGHT):
+            select(is_op(T.SHIFT_RIGHT), prims.shift_right(val_a, shift=a2 + 1), a1)
+        if train and uses(T.LOOP):
+            step = prims.scalar_to_embedding(
+                torch.ones(batch, 1, device=val_a.device, dtype=val_a.dtype), dim
+            ) * 0.01
+            select(is_op(T.LOOP), val_a + step, a0)
+        if uses(T.READ):
+            value, _weights = wm.read_from_scratchpad(
+                state, val_b.unsqueeze(1), ptr_idx=a2 % P, execution_mode=execution_mode,
+            )
+            value = value.squeeze(1)
+            if value.shape[-1] != wm.register_dim:
+                value = self.scratchpad_proj(value)
+            select(is_op(T.READ), value, a0)
+
+        # Register write-back
+        new_regs = regs
+        if present is None or writes.any():
+            target = F.one_hot(dst, N).bool() & writes.view(-1, 1)        # (batch, N)
+            new_regs = torch.where(target.unsqueeze(-1), result.unsqueeze(1).to(regs.dtype), regs)
+        if train and uses(T.IF):
+            gate = torch.sigmoid(val_a.mean(dim=-1, keepdim=True)).unsqueeze(1)  # (batch,1,1)
+            gated = (new_regs * gate).to(regs.dtype)
+            new_regs = torch.where(is_op(T.IF).view(-1, 1, 1), gated, new_regs)
+
+        # Scratchpad writes: WRITE / STORE reg[a0] under pointer `modifier`
+        new_sp = state.scratchpad
+        if uses(T.WRITE, T.STORE):
+            written = wm.write_to_scratchpad(
+                state, val_a.unsqueeze(1), ptr_idx=mod % P, execution_mode=execution_mode,
+            ).scratchpad
+            mask = (is_op(T.WRITE) | is_op(T.STORE)).view(-1, 1, 1)
+            new_sp = torch.where(mask, written, new_sp)
+
+        # Pointer moves: pointer[a0 % P] += direction(a1) * amount(a2 + 1) * step
+        new_ptrs = state.pointers
+        if uses(T.POINTER_MOVE):
+            step_size = 0.1 / max(wm.scratchpad_size, 1)
+            delta = (a1 * (a2 + 1)).to(new_ptrs.dtype) * step_size
+            target = F.one_hot(a0 % P, P).bool() & is_op(T.POINTER_MOVE).view(-1, 1)
+            moved = new_ptrs + target.to(new_ptrs.dtype) * delta.view(-1, 1)
+            if not train:
+                moved = torch.where(target, moved.clamp(0.0, 1.0), moved)
+            new_ptrs = moved
+
+        # Halting: HALT always, BREAK in infer mode
+        new_halt = state.halt_flag
+        if uses(T.HALT) or (not train and uses(T.BREAK)):
+            stop = is_op(T.HALT)
+            if not train:
+                stop = stop | is_op(T.BREAK)
+            new_halt = state.halt_flag | stop
+
+        return MemoryState(
+            registers=new_regs,
+            scratchpad=new_sp,
+            pointers=new_ptrs,
+            step=state.step,
+            halt_flag=new_halt,
+        )
+
     # ------------------------------------------------------------------
     # Primitive operations (all fully differentiable)
     # ------------------------------------------------------------------
@@ -145,15 +331,18 @@ class ActionExecutionEngine(nn.Module):
         """
         READ dst_reg, src_reg, ptr_idx
 
-        Read from scratchpad (content-addressed by src_reg query) into dst_reg.
+        Read from scratchpad (content-addressed by src_reg query, or under
+        pointer ptr_idx in pointer-addressing mode) into dst_reg.
         Gradient: attention read is differentiable.
         """
         dst_reg = action.arg0
         src_reg = action.arg1
-        _ptr_idx = action.arg2
+        ptr_idx = action.arg2 % self.wm.num_pointers
 
-        query = state.registers[:, src_reg, :].unsqueeze(1)  # (batch, 1, dim)
-        value, _weights = self.wm.read_from_scratchpad(state, query)
+        query = self.wm.read_register(state, src_reg).unsqueeze(1)  # (batch, 1, dim)
+        value, _weights = self.wm.read_from_scratchpad(
+            state, query, ptr_idx=ptr_idx, execution_mode=execution_mode,
+        )
         # Project scratchpad_dim → register_dim if needed
         value = value.squeeze(1)  # (batch, scratchpad_dim)
         if value.shape[-1] != self.wm.register_dim:
@@ -169,12 +358,16 @@ class ActionExecutionEngine(nn.Module):
         """
         WRITE src_reg, dst_reg
 
-        Write from register to scratchpad at next available position.
+        Write from register to scratchpad at next available position (at
+        pointer ``modifier`` in pointer-addressing mode).
         Gradient: soft write is differentiable.
         """
         src_reg = action.arg0
-        value = state.registers[:, src_reg, :].unsqueeze(1)
-        return self.wm.write_to_scratchpad(state, value)
+        value = self.wm.read_register(state, src_reg).unsqueeze(1)
+        return self.wm.write_to_scratchpad(
+            state, value,
+            ptr_idx=action.modifier % self.wm.num_pointers, execution_mode=execution_mode,
+        )
 
     def _exec_add(
         self,
@@ -321,12 +514,16 @@ class ActionExecutionEngine(nn.Module):
         """
         STORE src_reg, scratchpad_pos
 
-        Write register to scratchpad at position derived from modifier.
+        Write register to scratchpad at position derived from modifier
+        (the slot under pointer ``modifier`` in pointer-addressing mode).
         Gradient: soft write is differentiable.
         """
         src_reg = action.arg0
-        value = state.registers[:, src_reg, :].unsqueeze(1)
-        return self.wm.write_to_scratchpad(state, value)
+        value = self.wm.read_register(state, src_reg).unsqueeze(1)
+        return self.wm.write_to_scratchpad(
+            state, value,
+            ptr_idx=action.modifier % self.wm.num_pointers, execution_mode=execution_mode,
+        )
 
     def _exec_pointer_move(
         self,
@@ -370,7 +567,7 @@ class ActionExecutionEngine(nn.Module):
             cond_val = self.wm.read_register(state, cond_reg)
             gate = torch.sigmoid(cond_val.mean(dim=-1, keepdim=True)).unsqueeze(1)  # (batch,1,1)
             # Apply gate to all registers (soft conditional)
-            gated_regs = state.registers * gate
+            gated_regs = (state.registers * gate).to(state.registers.dtype)
             return MemoryState(
                 registers=gated_regs,
                 scratchpad=state.scratchpad.clone(),
@@ -533,8 +730,29 @@ class ActionExecutionEngine(nn.Module):
         """
         Expand and execute a macro action sequence in-line.
 
+        With ``compile_macros`` enabled the body is compiled once into a
+        fused register-dataflow function (see ``macro_compiler``) and
+        cached; results and gradients are identical to sequential
+        execution.
+
         Returns the final MemoryState after all sub-actions.
         """
+        if self.compile_macros:
+            compiled = self.get_compiled_macro(sub_actions)
+            if self.profiler is not None:
+                return self.profiler.profile_call("MACRO", state, compiled, state, execution_mode)
+            return compiled(state, execution_mode)
         for sub_action in sub_actions:
             state = self.execute(sub_action, state, execution_mode)
-        return state
\ No newline at end of file
+        return state
+
+    def get_compiled_macro(self, sub_actions: List[ActionToken]) -> CompiledMacro:
+        """Return the cached compiled form of *sub_actions*, compiling on a miss."""
+        key = tuple(sub_actions)
+        compiled = self._compiled_macros.get(key)
+        if compiled is None:
+            if len(self._compiled_macros) >= self.macro_cache_size:
+                self._compiled_macros.clear()
+            compiled = compile_macro(key, self)
+            self._compiled_macros[key] = compiled
+        return compiled
@@ -0,0 +1,205 @@
+"""
+Macro Compiler — fuses a fixed macro body into a single register-dataflow
+function.
+
+``ActionExecutionEngine.execute`` pays per-op overhead on every call:
+re-wrapping the token, rebuilding the dispatch table and cloning the whole
+register file for every write.  A macro body is a *fixed* op sequence, so
+all of that can be resolved once:
+
+  1. Each sub-action is normalised exactly as ``execute`` would (register
+     args taken mod ``num_registers``, unknown ops become NOPs).
+  2. Pure register ops (arithmetic, LOAD, digit and shift ops) are grouped
+     into fused blocks.  Ops touching the scratchpad, pointers, halt flag
+     or control flow stay as barriers and go through ``execute``.
+  3. Inside a block, writes that are overwritten before being read are
+     dropped (dead-write elimination).
+  4. At run time a block reads only the registers it needs, evaluates the
+     ops on those tensors, and writes all surviving results back with one
+     ``index_copy`` — a single register-file allocation per block.
+
+The result is numerically identical to executing the sub-actions one by
+one, and gradients flow through the same primitive ops.  With registers
+stored in reduced precision (``exact_registers=False``), every value
+written inside a block is rounded to the storage dtype before later ops
+read it, exactly as a sequential register write would.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+import torch
+
+from .action_space import ActionToken, ActionType
+from .primitives import DifferentiablePrimitives
+from .working_memory import MemoryState
+
+__all__ = [
+    "CompiledMacro",
+    "compile_macro",
+]
+
+
+@dataclass(frozen=True)
+class _RegisterOp:
+    """One fused register op: ``reg[dst] = compute(*reg[srcs])``."""
+    srcs: Tuple[int, ...]
+    dst: int
+    compute: Callable[..., torch.Tensor]
+
+
+# Ops that are a no-op in ``execute`` regardless of execution mode
+_NOOP_TYPES = {ActionType.NOP, ActionType.OUTPUT, ActionType.CALL_TOOL}
+
+_BINARY_PRIMITIVES = {
+    ActionType.SUBTRACT: "subtract",
+    ActionType.MULTIPLY: "multiply",
+    ActionType.COMPARE: "compare",
+    ActionType.MAX_OP: "max_soft",
+    ActionType.MIN_OP: "min_soft",
+    ActionType.DIVIDE_SAFE: "divide_safe",
+    ActionType.MOD_OP: "mod_op",
+}
+
+
+def _lower(
+    action: ActionToken,
+    prims: DifferentiablePrimitives,
+    num_registers: int,
+) -> Union[_RegisterOp, ActionToken, None]:
+    """
+    Lower one sub-action to a fused register op, a barrier token, or None
+    (no-op).  Argument handling mirrors the ``_exec_*`` handlers.
+    """
+    if action.op_id >= len(ActionType):
+        return None
+    op = ActionType(action.op_id)
+    if op in _NOOP_TYPES:
+        return None
+
+    a0 = action.arg0 % num_registers
+    a1 = action.arg1 % num_registers
+    a2 = action.arg2 % num_registers
+
+    if op == ActionType.ADD:
+        if action.modifier == 1:
+            carry = (a2 + 1) % num_registers
+            return _RegisterOp(
+                (a0, a1, carry), a2, lambda x, y, c: prims.add(prims.add(x, y), c)
+            )
+        return _RegisterOp((a0, a1), a2, prims.add)
+    if op in _BINARY_PRIMITIVES:
+        return _RegisterOp((a0, a1), a2, getattr(prims, _BINARY_PRIMITIVES[op]))
+    if op == ActionType.LOAD:
+        return _RegisterOp((a0,), a1, lambda x: x)
+    if op == ActionType.DIGIT_EXTRACT:
+        return _RegisterOp((a0,), a1, lambda x: prims.digit_extract(x, a2))
+    if op == ActionType.DIGIT_PACK:
+        return _RegisterOp((a0, a1), a1, lambda x, acc: prims.digit_pack(x, a2, acc))
+    if op == ActionType.SHIFT_LEFT:
+        return _RegisterOp((a0,), a1, lambda x: prims.shift_left(x, shift=a2 + 1))
+    if op == ActionType.SHIFT_RIGHT:
+        return _RegisterOp((a0,), a1, lambda x: prims.shift_right(x, shift=a2 + 1))
+
+    # Scratchpad, pointer, halt and control-flow ops
+    return action
+
+
+def _eliminate_dead_writes(ops: List[_RegisterOp]) -> List[_RegisterOp]:
+    """
+    Drop ops whose destination is overwritten later in the block before
+    being read.  All registers are treated as live at block exit.
+    """
+    killed: set = set()  # registers whose next access is a write
+    kept: List[_RegisterOp] = []
+    for op in reversed(ops):
+        if op.dst in killed:
+            continue
+        kept.append(op)
+        killed.add(op.dst)
+        killed.difference_update(op.srcs)
+    kept.reverse()
+    return kept
+
+
+class _FusedBlock:
+    """A straight-line run of register ops evaluated without intermediate states."""
+
+    def __init__(self, ops: List[_RegisterOp], compute_dtype: torch.dtype = torch.float32):
+        self.ops = _eliminate_dead_writes(ops)
+        self.compute_dtype = compute_dtype
+        self.reads = sorted({s for op in self.ops for s in op.srcs})
+        self.writes = sorted({op.dst for op in self.ops})
+        self._write_index: Dict[torch.device, torch.Tensor] = {}
+
+    def __call__(self, state: MemoryState) -> MemoryState:
+        regs = state.registers
+        reduced = regs.dtype != self.compute_dtype
+        env: Dict[int, torch.Tensor] = {}
+        for op in self.ops:
+            # Reduced-precision state is upcast so primitives stay int-exact
+            args = [env[s] if s in env else regs[:, s, :].to(self.compute_dtype) for s in op.srcs]
+            value = op.compute(*args)
+            if reduced:  # round as the unfused register write would
+                value = value.to(regs.dtype).to(self.compute_dtype)
+            env[op.dst] = value
+
+        index = self._write_index.get(regs.device)
+        if index is None:
+            index = torch.tensor(self.writes, dtype=torch.long, device=regs.device)
+            self._write_index[regs.device] = index
+        values = torch.stack([env[r] for r in self.writes], dim=1).to(regs.dtype)
+        return replace(state, registers=regs.index_copy(1, index, values))
+
+
+class CompiledMacro:
+    """
+    Executable form of a macro body.
+
+    Calling it is equivalent to
+    ``ActionExecutionEngine.execute_macro(sub_actions, state, mode)``.
+    """
+
+    def __init__(
+        self,
+        sub_actions: Sequence[ActionToken],
+        engine,
+    ):
+        self.sub_actions = tuple(sub_actions)
+        self.engine = engine
+        self.segments: List[Union[_FusedBlock, ActionToken]] = []
+
+        pending: List[_RegisterOp] = []
+        nregs = engine.wm.num_registers
+        for action in self.sub_actions:
+            lowered = _lower(action, engine.primitives, nregs)
+            if lowered is None:
+                continue
+            if isinstance(lowered, _RegisterOp):
+                pending.append(lowered)
+                continue
+            if pending:
+                self.segments.append(_FusedBlock(pending, engine.wm.compute_dtype))
+                pending = []
+            self.segments.append(lowered)
+        if pending:
+            self.segments.append(_FusedBlock(pending, engine.wm.compute_dtype))
+
+    @property
+    def num_fused_ops(self) -> int:
+        return sum(len(s.ops) for s in self.segments if isinstance(s, _FusedBlock))
+
+    def __call__(self, state: MemoryState, execution_mode: str = "train") -> MemoryState:
+        for segment in self.segments:
+            if isinstance(segment, _FusedBlock):
+                state = segment(state)
+            else:
+                state = self.engine.execute(segment, state, execution_mode)
+        return state
+
+
+def compile_macro(sub_actions: Sequence[ActionToken], engine) -> CompiledMacro:
+    """Compile *sub_actions* against *engine*'s primitives and register file."""
+    return CompiledMacro(sub_actions, engine)
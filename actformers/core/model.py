@@ -10,26 +10,66 @@ Supports two modes:
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+from contextlib import nullcontext
+from dataclasses import replace as dc_replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
+from torch.utils.checkpoint import checkpoint
 
 from .action_space import (
     ActionSpace,
     ActionToken,
     FactorizedActionEmbedding,
     MacroAction,
-    ActionType,
 )
+from .actions import ActionType
 from .working_memory import MemoryState, WorkingMemory
 from .primitives import DifferentiablePrimitives
 from .execution_engine import ActionExecutionEngine
+from .profiling import ExecutionProfiler
 from actformers.prediction.action_predictor import ActionPredictor
+from actformers.prediction.draft import DraftSource
 
 __all__ = ["Actformer"]
 
+# Shared no-op context used for phase timing / autocast when disabled
+_NO_PHASE = nullcontext()
+
+# torch.compile'd Actformer.step_batch, built on first use
+_COMPILED_STEP: Optional[Callable] = None
+
+
+def _compiled_step_batch() -> Callable:
+    global _COMPILED_STEP
+    if _COMPILED_STEP is None:
+        _COMPILED_STEP = torch.compile(Actformer.step_batch, dynamic=False)
+    return _COMPILED_STEP
+
+
+def _scatter_rows(state: MemoryState, index: torch.Tensor, rows: MemoryState) -> MemoryState:
+    """Copy of *state* with the rows at *index* replaced by *rows*."""
+    return MemoryState(
+        registers=state.registers.index_copy(0, index, rows.registers),
+        scratchpad=state.scratchpad.index_copy(0, index, rows.scratchpad.to(state.scratchpad.dtype)),
+        pointers=state.pointers.index_copy(0, index, rows.pointers),
+        step=state.step,
+        halt_flag=state.halt_flag.index_copy(0, index, rows.halt_flag),
+    )
+
+
+def _select_state(mask: torch.Tensor, new: MemoryState, old: MemoryState) -> MemoryState:
+    """Per-row ``new if mask else old`` for every MemoryState tensor."""
+    return MemoryState(
+        registers=torch.where(mask.view(-1, 1, 1), new.registers, old.registers),
+        scratchpad=torch.where(mask.view(-1, 1, 1), new.scratchpad, old.scratchpad),
+        pointers=torch.where(mask.view(-1, 1), new.pointers, old.pointers),
+        step=old.step,
+        halt_flag=torch.where(mask, new.halt_flag, old.halt_flag),
+    )
+
 
 class Actformer(nn.Module):
     """
@@ -57,6 +97,14 @@ class Actformer(nn.Module):
         max_steps: Maximum computation steps per forward pass.
         input_encoder: Optional pre-built input encoder module.
         output_decoder: Optional pre-built output decoder module.
+        scratchpad_addressing: WorkingMemory scratchpad addressing mode
+            ('dense', 'topk' or 'pointer').
+        scratchpad_topk: Slots touched per read/write in 'topk' mode.
+        state_dtype: Storage dtype for the scratchpad (e.g.
+            ``torch.bfloat16``); None keeps float32.  Registers stay
+            float32 so integer values remain exact.
+        autocast_dtype: If set, the action predictor runs under
+            ``torch.autocast`` with this dtype.
     """
 
     def __init__(
@@ -71,6 +119,10 @@ class Actformer(nn.Module):
         max_steps: int = 100,
         input_encoder: Optional[nn.Module] = None,
         output_decoder: Optional[nn.Module] = None,
+        scratchpad_addressing: str = "dense",
+        scratchpad_topk: int = 8,
+        state_dtype: Optional[torch.dtype] = None,
+        autocast_dtype: Optional[torch.dtype] = None,
     ):
         super().__init__()
 
@@ -80,6 +132,25 @@ class Actformer(nn.Module):
         self.scratchpad_dim = scratchpad_dim
         self.hidden_dim = hidden_dim
         self.max_steps = max_steps
+        # Constructor arguments, stored by save_pretrained
+        self.config: Dict[str, Any] = {
+            'num_registers': num_registers,
+            'register_dim': register_dim,
+            'scratchpad_size': scratchpad_size,
+            'scratchpad_dim': scratchpad_dim,
+            'hidden_dim': hidden_dim,
+            'num_heads': num_heads,
+            'num_layers': num_layers,
+            'max_steps': max_steps,
+            'scratchpad_addressing': scratchpad_addressing,
+            'scratchpad_topk': scratchpad_topk,
+            'state_dtype': state_dtype,
+            'autocast_dtype': autocast_dtype,
+        }
+        self._custom_modules = [
+            name for name, module in (('input_encoder', input_encoder), ('output_decoder', output_decoder))
+            if module is not None
+        ]
 
         # Action space
         self.action_space = ActionSpace(
@@ -92,7 +163,11 @@ class Actformer(nn.Module):
             register_dim=register_dim,
             scratchpad_size=scratchpad_size,
             scratchpad_dim=scratchpad_dim,
+            addressing=scratchpad_addressing,
+            topk=scratchpad_topk,
+            state_dtype=state_dtype,
         )
+        self.autocast_dtype = autocast_dtype
 
         # Execution engine
         self.execution_engine = ActionExecutionEngine(
@@ -108,6 +183,8 @@ class Actformer(nn.Module):
             hidden_dim=hidden_dim,
             num_heads=num_heads,
             num_layers=num_layers,
+            # Positional table must cover the longest history (default 100)
+            max_history=max(100, max_steps),
         )
 
         # Input encoder (default: simple scalar encoder)
@@ -134,6 +211,151 @@ class Actformer(nn.Module):
         # Output scale factor for mapping [-1,1] -> reasonable range
         self.output_scale = nn.Parameter(torch.tensor(100.0))
 
+        # Opt-in instrumentation (see enable_profiling)
+        self.profiler: Optional[ExecutionProfiler] = None
+        # Opt-in per-input initial state cache (see enable_state_cache)
+        self.state_cache = None
+
+    # ------------------------------------------------------------------
+    # Weight files
+    # ------------------------------------------------------------------
+
+    def save_pretrained(self, path: str) -> None:
+        """
+        Save the constructor config and weights to *path*.
+
+        The file is torch's zip format, which stores each tensor as one
+        uncompressed, aligned record, so :meth:`from_pretrained` can mmap
+        it instead of reading it.
+        """
+        torch.save({
+            'format_version': 1,
+            'config': dict(self.config),
+            'custom_modules': list(self._custom_modules),
+            'state_dict': self.state_dict(),
+        }, path)
+
+    @classmethod
+    def from_pretrained(
+        cls,
+        path: str,
+        mmap: bool = True,
+        device: Optional[torch.device] = None,
+        **overrides,
+    ) -> "Actformer":
+        """
+        Build an Actformer from a :meth:`save_pretrained` file.
+
+        The model is constructed on the meta device (no allocation, no
+        random init) and its parameters are then bound directly to the
+        loaded tensors.  With *mmap* those tensors are views of the
+        memory-mapped file: startup does not read the weights, and workers
+        loading the same file share its pages until they write to them.
+
+        Args:
+            path: File written by :meth:`save_pretrained`.
+            mmap: Memory-map the file instead of reading it.
+            device: Move the model here after loading (copies the weights).
+            **overrides: Constructor arguments to override; models saved
+                with a custom ``input_encoder``/``output_decoder`` need a
+                (possibly meta-device) instance of it passed here.
+        """
+        checkpoint = torch.load(path, map_location="cpu", mmap=mmap, weights_only=True)
+        missing = [name for name in checkpoint['custom_modules'] if name not in overrides]
+        if missing:
+            raise ValueError(f"Model was saved with custom {missing}; pass them to from_pretrained")
+        with torch.device("meta"):
+            model = cls(**{**checkpoint['config'], **overrides})
+        model.load_state_dict(checkpoint['state_dict'], assign=True)
+        if device is not None:
+            model = model.to(device)
+        return model
+
+    # ------------------------------------------------------------------
+    # Profiling
+    # ------------------------------------------------------------------
+
+    def enable_profiling(
+        self,
+        profiler: Optional[ExecutionProfiler] = None,
+    ) -> ExecutionProfiler:
+        """
+        Attach *profiler* (or a fresh one) to the model and its execution
+        engine, and return it.
+        """
+        self.profiler = profiler if profiler is not None else ExecutionProfiler()
+        self.execution_engine.profiler = self.profiler
+        return self.profiler
+
+    def disable_profiling(self) -> Optional[ExecutionProfiler]:
+        """Detach and return the current profiler."""
+        profiler = self.profiler
+        self.profiler = None
+        self.execution_engine.profiler = None
+        return profiler
+
+    def _phase(self, name: str):
+        return self.profiler.phase(name) if self.profiler is not None else _NO_PHASE
+
+    # ------------------------------------------------------------------
+    # Initial-state cache
+    # ------------------------------------------------------------------
+
+    def enable_state_cache(self, cache=None, max_entries: int = 4096):
+        """
+        Cache ``encode_input`` results per input row and return the cache
+        (an ``actformers.serving.cache.LRUCache`` unless one is given).
+
+        Only consulted while autograd is disabled, so training always
+        re-encodes and gets gradients.  Clear the cache after changing the
+        input encoder or working-memory weights.
+        """
+        if cache is None:
+            from actformers.serving.cache import LRUCache
+            cache = LRUCache(max_entries=max_entries)
+        self.state_cache = cache
+        return cache
+
+    def disable_state_cache(self):
+        """Detach and return the current state cache."""
+        cache, self.state_cache = self.state_cache, None
+        return cache
+
+    def _encode_input_cached(self, inputs: torch.Tensor) -> MemoryState:
+        tag = (str(inputs.dtype), str(inputs.device), str(self.working_memory.state_dtype))
+        keys = [(*tag, *row) for row in inputs.tolist()]
+        rows: List[Optional[MemoryState]] = [self.state_cache.get(k) for k in keys]
+        missing = [i for i, row in enumerate(rows) if row is None]
+        if missing:
+            encoded = self._encode_input(inputs[missing])
+            for j, i in enumerate(missing):
+                row = encoded.index_select(torch.tensor([j], device=inputs.device))
+                self.state_cache.put(keys[i], row)
+                rows[i] = row
+        return rows[0] if len(rows) == 1 else MemoryState.cat(rows)
+
+    # ------------------------------------------------------------------
+    # Precision
+    # ------------------------------------------------------------------
+
+    def set_precision(
+        self,
+        state_dtype: Optional[torch.dtype] = None,
+        autocast_dtype: Optional[torch.dtype] = None,
+    ) -> "Actformer":
+        """
+        Select the scratchpad storage dtype and predictor autocast dtype
+        (None = float32 for both).  Takes effect from the next forward.
+        """
+        self.working_memory.state_dtype = state_dtype
+        self.autocast_dtype = autocast_dtype
+        return self
+
+    def _autocast(self, device: torch.device):
+        if self.autocast_dtype is None:
+            return _NO_PHASE
+        return torch.autocast(device_type=device.type, dtype=self.autocast_dtype)
+
     def encode_input(self, inputs: torch.Tensor) -> MemoryState:
         """
         Encode input tensors to initial working memory state.
@@ -144,17 +366,23 @@ class Actformer(nn.Module):
         Returns:
             Initial MemoryState.
         """
+        if self.state_cache is not None and not torch.is_grad_enabled():
+            return self._encode_input_cached(inputs)
+        return self._encode_input(inputs)
+
+    def _encode_input(self, inputs: torch.Tensor) -> MemoryState:
         batch_size = inputs.shape[0]
         device = inputs.device
 
-        # Initialize clean memory state
+        # Initialize clean memory state (freshly cloned, safe to write into)
         state = self.working_memory.init_state(batch_size, device)
 
-        # Encode each input into a register
-        for i in range(min(inputs.shape[1], self.num_registers)):
-            scalar = inputs[:, i:i+1]  # (batch, 1)
-            encoded = self.input_encoder(scalar)  # (batch, register_dim)
-            state = self.working_memory.update_register(state, i, encoded)
+        # Encode all inputs in one encoder call: input i → register i
+        num_inputs = min(inputs.shape[1], self.num_registers)
+        if num_inputs > 0:
+            scalars = inputs[:, :num_inputs].reshape(-1, 1)            # (batch * n, 1)
+            encoded = self.input_encoder(scalars).view(batch_size, num_inputs, -1)
+            state.registers[:, :num_inputs] = encoded.to(state.registers.dtype)
 
         return state
 
@@ -178,6 +406,9 @@ class Actformer(nn.Module):
         target_trace: Optional[List[int]] = None,
         execution_mode: str = "train",
         temperature: float = 1.0,
+        draft_source: Optional[DraftSource] = None,
+        speculative_k: int = 4,
+        checkpoint_every: Optional[int] = None,
     ) -> Tuple[torch.Tensor, Dict[str, Any]]:
         """
         Run the Actformer computation loop.
@@ -187,20 +418,30 @@ class Actformer(nn.Module):
             target_trace: Optional ground-truth flat action indices for teacher forcing.
             execution_mode: 'train' (soft branches) or 'infer' (hard branches).
             temperature: Sampling temperature for autoregressive mode.
+            draft_source: Optional draft (see ``actformers.prediction.draft``)
+                for speculative autoregressive decoding; ignored under
+                teacher forcing.
+            speculative_k: Draft actions verified per predictor call.
+            checkpoint_every: If set (and autograd is on), run the loop in
+                segments of this many steps under activation
+                checkpointing: only segment boundaries are kept and each
+                segment is recomputed during backward.  Smaller values
+                save more memory at the cost of more recomputation.
 
         Returns:
             output: (batch, 1) predicted output.
             info: Dict with action history, log_probs, losses, etc.
         """
-        batch_size = inputs.shape[0]
-        device = inputs.device
-
         # Initialize state
-        state = self.encode_input(inputs)
+        with self._phase("encode_input"):
+            state = self.encode_input(inputs)
+        if draft_source is not None and target_trace is None:
+            return self._forward_speculative(
+                state, draft_source, speculative_k, execution_mode, temperature,
+            )
         action_history: List[int] = []
         log_probs: List[torch.Tensor] = []
         step_losses: List[Optional[torch.Tensor]] = []
-        actions_taken = 0
 
         # Determine loop length
         if target_trace is not None:
@@ -208,9 +449,271 @@ class Actformer(nn.Module):
         else:
             loop_length = self.max_steps
 
+        if checkpoint_every and torch.is_grad_enabled():
+            # Recompute each segment of steps during backward instead of
+            # keeping its intermediate states and predictor activations
+            while len(action_history) < loop_length:
+                num_steps = min(checkpoint_every, loop_length - len(action_history))
+                state, seg_log_probs, seg_losses, halted = self._run_steps_checkpointed(
+                    state, action_history, num_steps, target_trace, execution_mode, temperature,
+                )
+                log_probs.extend(seg_log_probs)
+                step_losses.extend(seg_losses)
+                if halted:
+                    break
+        else:
+            state, log_probs, step_losses, _ = self.run_steps(
+                state, action_history, loop_length, target_trace, execution_mode, temperature,
+            )
+        actions_taken = len(action_history)
+
+        # Decode output
+        with self._phase("decode_output"):
+            output = self.decode_output(state)
+
+        info = {
+            'action_history': action_history,
+            'log_probs': log_probs,
+            'step_losses': step_losses,
+            'actions_taken': actions_taken,
+            'final_state': state,
+            'memory_summary': self.working_memory.summary(state),
+        }
+
+        return output, info
+
+    # ------------------------------------------------------------------
+    # Static-shape action loop
+    # ------------------------------------------------------------------
+
+    def step_batch(
+        self,
+        state: MemoryState,
+        history: torch.Tensor,
+        lengths: torch.Tensor,
+        execution_mode: str = "infer",
+        target: Optional[torch.Tensor] = None,
+        temperature: float = 1.0,
+        greedy: bool = False,
+        static: bool = False,
+    ) -> Tuple[MemoryState, torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+        """
+        One predict → execute step for every row.
+
+        Rows that have halted, or whose *target* is negative (padding),
+        keep their state and history unchanged.  Actions run through
+        :meth:`execute_flat_batch`, so macro tokens expand to their bodies
+        as in :meth:`forward`.  With *static* the step has fixed shapes, no
+        host syncs and no data-dependent branches, so it compiles with
+        ``torch.compile`` (macros must then not be registered); eager
+        callers should leave it off, which skips op families no row uses.
+
+        Args:
+            state: Current MemoryState (batch B).
+            history: (B, H) flat action indices taken so far.
+            lengths: (B,) valid history entries per row.
+            execution_mode: 'train' or 'infer'.
+            target: Optional (B,) teacher-forced flat indices.
+            temperature: Sampling temperature when *target* is None.
+            greedy: Take the argmax instead of sampling.
+            static: Evaluate every op family (needed for graph capture).
+
+        Returns:
+            (state, history, lengths, action, log_prob, nll) where *action*,
+            *log_prob* and *nll* (teacher-forced cross-entropy, else zeros)
+            are (B,) and only meaningful for rows that were active.
+        """
+        active = ~state.halt_flag
+        with self._autocast(state.registers.device):
+            logits = self.action_predictor.forward_batch(state, history, lengths)
+        logits = logits.to(self.output_scale.dtype)
+
+        if target is not None:
+            active = active & (target >= 0)
+            action = target.clamp(min=0)
+            log_prob = F.log_softmax(logits, dim=-1).gather(1, action.unsqueeze(1)).squeeze(1)
+            nll = -log_prob
+        else:
+            scores = F.log_softmax(logits / temperature, dim=-1)
+            if greedy:
+                action = scores.argmax(dim=-1)
+            else:
+                action = torch.multinomial(scores.exp(), 1).squeeze(1)
+            log_prob = scores.gather(1, action.unsqueeze(1)).squeeze(1)
+            nll = torch.zeros_like(log_prob)
+
+        new_state = self.execute_flat_batch(action, state, execution_mode, static=static)
+        state = _select_state(active, new_state, state)
+
+        slot = lengths.clamp(max=history.shape[1] - 1).unsqueeze(1)
+        appended = history.scatter(1, slot, action.unsqueeze(1))
+        history = torch.where(active.unsqueeze(1), appended, history)
+        lengths = lengths + active.long()
+        return state, history, lengths, action, log_prob, nll
+
+    def execute_flat_batch(
+        self,
+        action: torch.Tensor,
+        state: MemoryState,
+        execution_mode: str = "infer",
+        static: bool = False,
+    ) -> MemoryState:
+        """
+        Execute one flat action index per row (the batched
+        :meth:`_execute_flat`).
+
+        Primitive actions run together through
+        ``ActionExecutionEngine.execute_batch``; rows whose action calls a
+        registered macro are then re-run from *state* through
+        ``execute_macro``, one group per macro.  Expansion needs the host
+        to see which rows call macros, so *static* (graph capture) is
+        refused while macros are registered.
+
+        Args:
+            action: (B,) flat action indices.
+            state: Current MemoryState (batch B).
+            execution_mode: 'train' or 'infer'.
+            static: Evaluate every op family (see ``execute_batch``).
+        """
+        components = self.action_space.decode_flat_batch(action)
+        new_state = self.execution_engine.execute_batch(
+            *components.unbind(-1), state, execution_mode, static=static,
+        )
+        if not self.action_space.macro_library:
+            return new_state
+        if static:
+            raise RuntimeError("static (compiled) execution cannot expand registered macros")
+
+        calls = (components[:, 0] == int(ActionType.CALL_TOOL)).nonzero().flatten()
+        groups: Dict[str, Tuple[MacroAction, List[int]]] = {}
+        for row, action_idx in zip(calls.tolist(), action.index_select(0, calls).tolist()):
+            macro = self.action_space.macro_for_token(self.action_space.decode_flat_token(action_idx))
+            if macro is not None:
+                groups.setdefault(macro.name, (macro, []))[1].append(row)
+        for macro, rows in groups.values():
+            index = torch.tensor(rows, device=action.device)
+            expanded = self.execution_engine.execute_macro(
+                macro.expand(), state.index_select(index), execution_mode,
+            )
+            new_state = _scatter_rows(new_state, index, expanded)
+        return new_state
+
+    def forward_static(
+        self,
+        inputs: torch.Tensor,
+        target_trace: Optional[torch.Tensor] = None,
+        execution_mode: str = "infer",
+        temperature: float = 1.0,
+        greedy: bool = False,
+        early_exit: bool = True,
+        compile: bool = False,
+    ) -> Tuple[torch.Tensor, Dict[str, Any]]:
+        """
+        Batched action loop over preallocated ``(batch, max_steps)`` buffers.
+
+        Unlike :meth:`forward`, every row runs its own action sequence and
+        halts independently; the per-step work is :meth:`step_batch`, which
+        can be compiled.  Macro tokens expand to their bodies (eager only;
+        ``compile=True`` refuses registered macros) and profiling phases
+        are not recorded.
+
+        Args:
+            inputs: (batch, input_len) input tensor.
+            target_trace: Optional (batch, T) teacher-forcing indices,
+                padded with -1.
+            execution_mode: 'train' or 'infer'.
+            temperature: Sampling temperature for autoregressive mode.
+            greedy: Argmax decoding instead of sampling.
+            early_exit: Stop once every row has halted (one host sync per
+                step).  False always runs the full loop length.
+            compile: Run the step through ``torch.compile``.
+
+        Returns:
+            output: (batch, 1) predicted output.
+            info: 'actions' and 'log_probs' (batch, steps) buffers (-1 / 0
+                past each row's end), 'lengths' (batch,), 'loss' (mean
+                teacher-forced cross-entropy, or None), 'final_state'.
+        """
+        batch_size = inputs.shape[0]
+        device = inputs.device
+        loop_length = self.max_steps
+        if target_trace is not None:
+            loop_length = min(target_trace.shape[1], loop_length)
+        if loop_length > self.action_predictor.max_history:
+            raise ValueError(
+                f"{loop_length} steps exceed the predictor's max_history "
+                f"({self.action_predictor.max_history})"
+            )
+        if compile and self.action_space.macro_library:
+            raise ValueError("compile=True cannot expand registered macros; use eager mode")
+        step_fn = _compiled_step_batch() if compile else Actformer.step_batch
+
+        state = self.encode_input(inputs)
+        history = torch.zeros(batch_size, loop_length, dtype=torch.long, device=device)
+        lengths = torch.zeros(batch_size, dtype=torch.long, device=device)
+        log_probs = torch.zeros(batch_size, loop_length, device=device)
+        nll = torch.zeros(batch_size, loop_length, device=device)
+
         for step in range(loop_length):
+            target = target_trace[:, step] if target_trace is not None else None
+            previous = lengths
+            state, history, lengths, _, log_prob, step_nll = step_fn(
+                self, state, history, lengths, execution_mode,
+                target, temperature, greedy, compile,
+            )
+            taken = lengths > previous
+            log_probs[:, step] = torch.where(taken, log_prob, 0.0)
+            nll[:, step] = torch.where(taken, step_nll, 0.0)
+            if early_exit and bool(state.halt_flag.all()):
+                loop_length = step + 1
+                break
+
+        state = dc_replace(state, step=loop_length)
+        output = self.decode_output(state)
+
+        positions = torch.arange(history.shape[1], device=device)
+        valid = positions.unsqueeze(0) < lengths.unsqueeze(1)
+        loss = None
+        if target_trace is not None:
+            loss = nll.sum() / valid.sum().clamp(min=1)
+        info = {
+            'actions': torch.where(valid, history, -1)[:, :loop_length],
+            'log_probs': log_probs[:, :loop_length],
+            'lengths': lengths,
+            'loss': loss,
+            'final_state': state,
+        }
+        return output, info
+
+    def run_steps(
+        self,
+        state: MemoryState,
+        action_history: List[int],
+        num_steps: int,
+        target_trace: Optional[List[int]] = None,
+        execution_mode: str = "train",
+        temperature: float = 1.0,
+    ) -> Tuple[MemoryState, List[torch.Tensor], List[torch.Tensor], bool]:
+        """
+        Run up to *num_steps* predict → execute steps from *state*.
+
+        The step index (and teacher-forcing position) continues from
+        ``len(action_history)``; taken actions are appended to
+        *action_history* in place.
+
+        Returns:
+            (state, log_probs, step_losses, halted)
+        """
+        device = state.registers.device
+        log_probs: List[torch.Tensor] = []
+        step_losses: List[torch.Tensor] = []
+        start = len(action_history)
+
+        for step in range(start, start + num_steps):
             # Predict next action
-            logits = self.action_predictor(state, action_history)  # (1, flat_vocab)
+            with self._phase("predictor"), self._autocast(device):
+                logits = self.action_predictor(state, action_history)  # (1, flat_vocab)
+            logits = logits.to(self.output_scale.dtype)
 
             if target_trace is not None and step < len(target_trace):
                 # Teacher forcing: use ground-truth action
@@ -234,41 +737,166 @@ class Actformer(nn.Module):
             action_idx = action_token[0].item()
             action_history.append(action_idx)
             log_probs.append(log_prob)
-            actions_taken += 1
 
             # Decode and execute action
-            action = self.action_space.decode_flat_token(action_idx)
-
-            # Handle macro actions: expand to primitives if macro detected
-            op = ActionType(action.op_id) if action.op_id < len(ActionType) else None
-            if op is not None and op == ActionType.CALL_TOOL and action.modifier in self.action_space.macro_library:
-                macro = self.action_space.macro_library[action.modifier]
-                state = self.execution_engine.execute_macro(
-                    macro.expand(), state, execution_mode
-                )
-            else:
-                state = self.execution_engine.execute(action, state, execution_mode)
+            with self._phase("execute"):
+                state = self._execute_flat(action_idx, state, execution_mode)
 
             # Check for halt
             if state.halt_flag is not None and state.halt_flag.any():
-                break
+                return state, log_probs, step_losses, True
 
             # Increment step counter in state
-            from dataclasses import replace as dc_replace
             state = dc_replace(state, step=step + 1)
 
-        # Decode output
-        output = self.decode_output(state)
+        return state, log_probs, step_losses, False
+
+    def _run_steps_checkpointed(
+        self,
+        state: MemoryState,
+        action_history: List[int],
+        num_steps: int,
+        target_trace: Optional[List[int]],
+        execution_mode: str,
+        temperature: float,
+    ) -> Tuple[MemoryState, List[torch.Tensor], List[torch.Tensor], bool]:
+        """:meth:`run_steps` under ``torch.utils.checkpoint``.
+
+        The segment only sees a copy of the history, so recomputation in
+        backward has no side effects; the saved RNG state makes sampled
+        actions replay identically.
+        """
+        prefix = list(action_history)
+        step = state.step
+
+        def segment(registers, scratchpad, pointers, halt_flag):
+            seg_state = MemoryState(registers=registers, scratchpad=scratchpad,
+                                    pointers=pointers, step=step, halt_flag=halt_flag)
+            history = list(prefix)
+            out, log_probs, losses, _ = self.run_steps(
+                seg_state, history, num_steps, target_trace, execution_mode, temperature,
+            )
+            actions = torch.tensor(history[len(prefix):], dtype=torch.long)
+            stacked_losses = torch.stack(losses) if losses else registers.new_zeros(0)
+            return (out.registers, out.scratchpad, out.pointers, out.halt_flag,
+                    torch.stack(log_probs), stacked_losses, actions, torch.tensor(out.step))
+
+        registers, scratchpad, pointers, halt_flag, log_probs, losses, actions, out_step = checkpoint(
+            segment, state.registers, state.scratchpad, state.pointers, state.halt_flag,
+            use_reentrant=False,
+        )
+        action_history.extend(actions.tolist())
+        state = MemoryState(registers=registers, scratchpad=scratchpad, pointers=pointers,
+                            step=int(out_step), halt_flag=halt_flag)
+        return state, list(log_probs.unbind(0)), list(losses.unbind(0)), bool(halt_flag.any())
+
+    def _execute_flat(self, action_idx: int, state: MemoryState, execution_mode: str) -> MemoryState:
+        """Execute one flat action index, expanding macro tokens to primitives."""
+        action = self.action_space.decode_flat_token(action_idx)
+        macro = self.action_space.macro_for_token(action)
+        if macro is not None:
+            return self.execution_engine.execute_macro(macro.expand(), state, execution_mode)
+        return self.execution_engine.execute(action, state, execution_mode)
+
+    # ------------------------------------------------------------------
+    # Speculative decoding
+    # ------------------------------------------------------------------
+
+    def _forward_speculative(
+        self,
+        state: MemoryState,
+        draft_source: DraftSource,
+        speculative_k: int,
+        execution_mode: str,
+        temperature: float,
+    ) -> Tuple[torch.Tensor, Dict[str, Any]]:
+        """
+        Autoregressive loop where each predictor call verifies a draft.
+
+        The states reached by executing the drafted actions are stacked
+        into one ``forward_batch`` call, giving the policy at every draft
+        position at once.  Draft action ``d`` is accepted with probability
+        ``p(d)`` (the draft is deterministic); on rejection a replacement
+        is sampled from ``p`` with ``d`` removed.  This is the standard
+        speculative sampling rule, so actions follow the same distribution
+        as :meth:`forward` while every call yields at least one action.
+        """
+        if state.registers.shape[0] != 1:
+            raise ValueError("speculative decoding supports batch size 1")
+        device = state.registers.device
+        limit = min(self.max_steps, self.action_predictor.max_history)
+        action_history: List[int] = []
+        log_probs: List[torch.Tensor] = []
+        predictor_calls = proposed = accepted = 0
+
+        while len(action_history) < limit and not state.halt_flag.any():
+            n = len(action_history)
+            draft = draft_source.propose(state, list(action_history), min(speculative_k, limit - n))
+
+            # states[i] is the state before draft[i]; drafting stops at a HALT
+            states = [state]
+            with self._phase("execute"):
+                for i, action_idx in enumerate(draft):
+                    states.append(self._execute_flat(action_idx, states[-1], execution_mode))
+                    if states[-1].halt_flag.any():
+                        draft = draft[:i + 1]
+                        break
+            rows = max(len(draft), 1)
+
+            width = max(n + len(draft), 1)
+            history = torch.tensor(
+                [(action_history + draft[:i] + [0] * width)[:width] for i in range(rows)],
+                dtype=torch.long, device=device,
+            )
+            lengths = torch.arange(n, n + rows, device=device)
+            batched = MemoryState.cat(states[:rows])
+            with self._phase("predictor"), self._autocast(device):
+                logits = self.action_predictor.forward_batch(batched, history, lengths)
+            step_log_probs = F.log_softmax(logits.to(self.output_scale.dtype) / temperature, dim=-1)
+            predictor_calls += 1
+            proposed += len(draft)
+
+            # Accept the longest prefix that passes the speculative test
+            taken = 0
+            for action_idx in draft:
+                if torch.rand((), device=device) >= step_log_probs[taken, action_idx].exp():
+                    break
+                taken += 1
+            accepted += taken
+            for i in range(taken):
+                action_history.append(draft[i])
+                log_probs.append(step_log_probs[i:i + 1, draft[i]])
+            state = states[taken]
+            if draft and taken == len(draft):
+                continue
+
+            # Rejected (or no draft): sample position `taken` from p minus the draft
+            probs = step_log_probs[taken].exp()
+            if taken < len(draft):
+                probs = probs.clone()
+                probs[draft[taken]] = 0.0
+                if probs.sum() <= 0:
+                    probs = step_log_probs[taken].exp()
+            action_idx = int(torch.multinomial(probs, 1))
+            action_history.append(action_idx)
+            log_probs.append(step_log_probs[taken:taken + 1, action_idx])
+            with self._phase("execute"):
+                state = self._execute_flat(action_idx, state, execution_mode)
 
+        state = dc_replace(state, step=len(action_history))
+        with self._phase("decode_output"):
+            output = self.decode_output(state)
         info = {
             'action_history': action_history,
             'log_probs': log_probs,
-            'step_losses': step_losses,
-            'actions_taken': actions_taken,
+            'step_losses': [],
+            'actions_taken': len(action_history),
             'final_state': state,
             'memory_summary': self.working_memory.summary(state),
+            'predictor_calls': predictor_calls,
+            'draft_proposed': proposed,
+            'draft_accepted': accepted,
         }
-
         return output, info
 
     def compute_loss(
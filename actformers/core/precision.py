@@ -0,0 +1,85 @@
+"""
+Precision — reduced-precision inference helpers.
+
+Two independent knobs, both inference-only:
+
+  - **State / activation precision**: ``Actformer.set_precision`` stores
+    the scratchpad in bf16/fp16 and optionally runs the action predictor
+    under autocast.  Registers stay float32 and primitives compute in
+    float32, so digit extraction and carries stay integer-exact.
+  - **Weight precision**: :func:`quantize_predictor` applies dynamic int8
+    quantization to the ``nn.Linear`` layers of the action predictor
+    (state encoder, decoder feed-forward layers, output head).  Attention
+    output projections are left in float, as ``quantize_dynamic`` does
+    for ``nn.MultiheadAttention``.
+
+Accuracy deltas against the float32 model can be measured with
+``GeneralizationEvaluator.compare_precision``.
+"""
+
+from __future__ import annotations
+
+import copy
+from typing import Optional
+
+import torch
+import torch.nn as nn
+
+from .model import Actformer
+
+__all__ = [
+    "quantize_predictor",
+    "reduced_precision",
+]
+
+
+def quantize_predictor(
+    model: Actformer,
+    dtype: torch.dtype = torch.qint8,
+    inplace: bool = False,
+) -> Actformer:
+    """
+    Dynamically quantize the action predictor's linear layers.
+
+    The returned model is for inference only: quantized layers have no
+    trainable weights.
+
+    Args:
+        model: Trained Actformer.
+        dtype: Quantized weight dtype (``torch.qint8`` or ``torch.float16``).
+        inplace: Modify *model* instead of a deep copy.
+
+    Returns:
+        The model with a quantized ``action_predictor``.
+    """
+    if not inplace:
+        model = copy.deepcopy(model)
+    model.eval()
+    # In place, so the predictor's action embedding keeps its identity
+    torch.ao.quantization.quantize_dynamic(
+        model.action_predictor, {nn.Linear}, dtype=dtype, inplace=True,
+    )
+    return model
+
+
+def reduced_precision(
+    model: Actformer,
+    state_dtype: Optional[torch.dtype] = torch.bfloat16,
+    autocast_dtype: Optional[torch.dtype] = None,
+    quantize: bool = False,
+) -> Actformer:
+    """
+    Deep copy of *model* configured for reduced-precision CPU inference.
+
+    Args:
+        model: Float32 Actformer.
+        state_dtype: Scratchpad storage dtype.
+        autocast_dtype: Predictor autocast dtype.  Off by default: bf16
+            matmuls only pay off on CPUs with native bf16 support.
+        quantize: Also apply :func:`quantize_predictor`.
+    """
+    model = copy.deepcopy(model).eval()
+    model.set_precision(state_dtype=state_dtype, autocast_dtype=autocast_dtype)
+    if quantize:
+        model = quantize_predictor(model, inplace=True)
+    return model
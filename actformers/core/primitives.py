@@ -13,6 +13,7 @@ forward pass is discrete, backward pass pretends the operation was continuous.
 from __future__ import annotations
 
 import math
+from typing import Union
 
 import torch
 import torch.nn as nn
@@ -23,6 +24,13 @@ __all__ = [
 ]
 
 
+def _power(base: float, exponent: Union[int, torch.Tensor], like: torch.Tensor):
+    """``base ** exponent``; a (batch,) tensor exponent becomes (batch, 1)."""
+    if isinstance(exponent, torch.Tensor):
+        return torch.pow(base, exponent.to(like.dtype)).view(-1, 1)
+    return base ** exponent
+
+
 class DifferentiablePrimitives(nn.Module):
     """
     Collection of differentiable computational primitives.
@@ -106,7 +114,7 @@ class DifferentiablePrimitives(nn.Module):
     def digit_extract(
         self,
         value: torch.Tensor,
-        digit_pos: int,
+        digit_pos: Union[int, torch.Tensor],
         base: int = 10,
     ) -> torch.Tensor:
         """
@@ -120,7 +128,8 @@ class DifferentiablePrimitives(nn.Module):
 
         Args:
             value: (batch, dim) — each element encodes a scalar in its first component.
-            digit_pos: which digit to extract (0 = ones, 1 = tens, …).
+            digit_pos: which digit to extract (0 = ones, 1 = tens, …); an
+                int or a (batch,) tensor of per-row positions.
 
         Returns:
             (batch, dim) with the extracted digit in the first component,
@@ -129,7 +138,7 @@ class DifferentiablePrimitives(nn.Module):
         # Forward: discrete extraction
         with torch.no_grad():
             v = value[:, 0:1].abs()
-            divisor = base ** digit_pos
+            divisor = _power(base, digit_pos, v)
             digit = (torch.floor(v / divisor) % base) / base  # normalised to [0, 1]
 
         # Straight-through: pretend gradient flows through identity
@@ -140,7 +149,7 @@ class DifferentiablePrimitives(nn.Module):
     def digit_pack(
         self,
         digit_tensor: torch.Tensor,
-        digit_pos: int,
+        digit_pos: Union[int, torch.Tensor],
         accumulator: torch.Tensor,
         base: int = 10,
     ) -> torch.Tensor:
@@ -154,7 +163,7 @@ class DifferentiablePrimitives(nn.Module):
             Gradient flows through as identity w.r.t. digit_tensor.
         """
         with torch.no_grad():
-            digit_val = (digit_tensor[:, 0:1] * base).round() * (base ** digit_pos)
+            digit_val = (digit_tensor[:, 0:1] * base).round() * _power(base, digit_pos, digit_tensor)
         # Straight-through
         new_acc = accumulator.clone()
         new_acc[:, 0:1] = accumulator[:, 0:1] + digit_val + (digit_tensor[:, 0:1] - digit_tensor[:, 0:1].detach())
@@ -164,13 +173,17 @@ class DifferentiablePrimitives(nn.Module):
     # Shift operations
     # ----------------------------------------------------------------
 
-    def shift_left(self, value: torch.Tensor, shift: int = 1, base: float = 10.0) -> torch.Tensor:
+    def shift_left(
+        self, value: torch.Tensor, shift: Union[int, torch.Tensor] = 1, base: float = 10.0,
+    ) -> torch.Tensor:
         """Multiply by base^shift (equivalent to left-shifting digits). Differentiable."""
-        return value * (base ** shift)
+        return value * _power(base, shift, value)
 
-    def shift_right(self, value: torch.Tensor, shift: int = 1, base: float = 10.0) -> torch.Tensor:
+    def shift_right(
+        self, value: torch.Tensor, shift: Union[int, torch.Tensor] = 1, base: float = 10.0,
+    ) -> torch.Tensor:
         """Divide by base^shift (equivalent to right-shifting digits). Differentiable."""
-        return value / (base ** shift)
+        return value / _power(base, shift, value)
 
     # ----------------------------------------------------------------
     # Utility
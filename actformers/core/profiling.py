@@ -0,0 +1,231 @@
+"""
+Execution Profiler — opt-in instrumentation for the action loop.
+
+Attach an ``ExecutionProfiler`` with ``Actformer.enable_profiling()`` (or by
+setting ``ActionExecutionEngine.profiler``) to collect:
+
+  - per-ActionType call counts and wall time;
+  - bytes of state tensors freshly allocated by each op (the register /
+    scratchpad / pointer clones made by immutable state updates);
+  - wall time per phase of ``Actformer.forward`` (encode, predictor,
+    execute, decode), i.e. how step time splits between prediction and
+    execution.
+
+Every recorded region is also emitted as a ``torch.profiler.record_function``
+range, so the same names show up inside a ``torch.profiler.profile`` session.
+Collected events can be exported as a Chrome trace (``chrome://tracing`` /
+Perfetto) or printed as a summary table.
+
+When no profiler is attached the instrumented code paths only perform a
+single ``is None`` check.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import torch
+
+from .action_space import ActionToken, ActionType
+from .working_memory import MemoryState
+
+__all__ = [
+    "ExecutionProfiler",
+    "OpStats",
+]
+
+
+@dataclass
+class OpStats:
+    """Aggregated statistics for one op or phase."""
+    calls: int = 0
+    total_time: float = 0.0      # seconds
+    bytes_allocated: int = 0     # new state-tensor bytes produced
+    tensors_allocated: int = 0   # number of new state tensors produced
+
+    @property
+    def mean_time_us(self) -> float:
+        return 1e6 * self.total_time / max(self.calls, 1)
+
+
+def _state_tensors(state: MemoryState) -> Tuple[Optional[torch.Tensor], ...]:
+    return (state.registers, state.scratchpad, state.pointers, state.halt_flag)
+
+
+def _new_state_bytes(before: MemoryState, after: MemoryState) -> Tuple[int, int]:
+    """Bytes and count of state tensors in *after* that do not alias *before*."""
+    if after is before:
+        return 0, 0
+    nbytes, count = 0, 0
+    for old, new in zip(_state_tensors(before), _state_tensors(after)):
+        if new is None or new is old:
+            continue
+        if old is not None and new.data_ptr() == old.data_ptr():
+            continue
+        nbytes += new.numel() * new.element_size()
+        count += 1
+    return nbytes, count
+
+
+def _op_name(action: ActionToken) -> str:
+    if action.op_id < len(ActionType):
+        return ActionType(action.op_id).name
+    return f"UNK({action.op_id})"
+
+
+class ExecutionProfiler:
+    """
+    Collects per-op and per-phase timing and allocation counters.
+
+    Args:
+        record_functions: Emit ``torch.profiler.record_function`` ranges.
+        record_events: Keep individual timed events for Chrome-trace export.
+        max_events: Cap on stored events (oldest are kept).
+    """
+
+    def __init__(
+        self,
+        record_functions: bool = True,
+        record_events: bool = False,
+        max_events: int = 100_000,
+    ):
+        self.record_functions = record_functions
+        self.record_events = record_events
+        self.max_events = max_events
+        self.reset()
+
+    def reset(self) -> None:
+        self.op_stats: Dict[str, OpStats] = {}
+        self.phase_stats: Dict[str, OpStats] = {}
+        self.events: List[Tuple[str, str, float, float]] = []  # (name, cat, start, dur)
+        self._t0 = time.perf_counter()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def _record(self, table: Dict[str, OpStats], name: str, cat: str, start: float, dur: float) -> OpStats:
+        stats = table.get(name)
+        if stats is None:
+            stats = table[name] = OpStats()
+        stats.calls += 1
+        stats.total_time += dur
+        if self.record_events and len(self.events) < self.max_events:
+            self.events.append((name, cat, start - self._t0, dur))
+        return stats
+
+    def profile_op(
+        self,
+        fn: Callable[..., MemoryState],
+        action: ActionToken,
+        state: MemoryState,
+        execution_mode: str,
+    ) -> MemoryState:
+        """Run ``fn(action, state, execution_mode)`` and record it under the op's name."""
+        return self.profile_call(_op_name(action), state, fn, action, state, execution_mode)
+
+    def profile_call(
+        self,
+        name: str,
+        state: MemoryState,
+        fn: Callable[..., MemoryState],
+        *args,
+    ) -> MemoryState:
+        """
+        Run ``fn(*args)`` and record it as op *name*; allocations are
+        measured between the input *state* and the returned state.
+        """
+        start = time.perf_counter()
+        if self.record_functions:
+            with torch.profiler.record_function(f"actformer::{name}"):
+                new_state = fn(*args)
+        else:
+            new_state = fn(*args)
+        dur = time.perf_counter() - start
+        stats = self._record(self.op_stats, name, "op", start, dur)
+        nbytes, count = _new_state_bytes(state, new_state)
+        stats.bytes_allocated += nbytes
+        stats.tensors_allocated += count
+        return new_state
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a phase of the action loop (e.g. 'predictor', 'execute')."""
+        start = time.perf_counter()
+        try:
+            if self.record_functions:
+                with torch.profiler.record_function(f"actformer::{name}"):
+                    yield
+            else:
+                yield
+        finally:
+            self._record(self.phase_stats, name, "phase", start, time.perf_counter() - start)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def summary(self) -> Dict[str, object]:
+        """Plain-dict summary suitable for logging."""
+        total_op_time = sum(s.total_time for s in self.op_stats.values())
+        phases = {k: v.total_time for k, v in self.phase_stats.items()}
+        predictor = phases.get("predictor", 0.0)
+        execute = phases.get("execute", 0.0)
+        return {
+            "ops": {
+                name: {
+                    "calls": s.calls,
+                    "total_ms": 1e3 * s.total_time,
+                    "mean_us": s.mean_time_us,
+                    "time_frac": s.total_time / total_op_time if total_op_time else 0.0,
+                    "bytes_allocated": s.bytes_allocated,
+                    "tensors_allocated": s.tensors_allocated,
+                }
+                for name, s in self.op_stats.items()
+            },
+            "phases_ms": {k: 1e3 * v for k, v in phases.items()},
+            "predictor_frac": predictor / (predictor + execute) if predictor + execute else 0.0,
+        }
+
+    def summary_table(self) -> str:
+        """Human-readable table of ops (sorted by total time) and phases."""
+        lines = [
+            f"{'op':<16}{'calls':>8}{'total ms':>11}{'mean us':>10}{'%':>7}{'MB alloc':>10}",
+            "-" * 62,
+        ]
+        total = sum(s.total_time for s in self.op_stats.values()) or 1.0
+        for name, s in sorted(self.op_stats.items(), key=lambda kv: -kv[1].total_time):
+            lines.append(
+                f"{name:<16}{s.calls:>8}{1e3 * s.total_time:>11.2f}{s.mean_time_us:>10.1f}"
+                f"{100 * s.total_time / total:>7.1f}{s.bytes_allocated / 2**20:>10.2f}"
+            )
+        if self.phase_stats:
+            lines.append("")
+            lines.append(f"{'phase':<16}{'calls':>8}{'total ms':>11}{'mean us':>10}")
+            lines.append("-" * 45)
+            for name, s in sorted(self.phase_stats.items(), key=lambda kv: -kv[1].total_time):
+                lines.append(
+                    f"{name:<16}{s.calls:>8}{1e3 * s.total_time:>11.2f}{s.mean_time_us:>10.1f}"
+                )
+        return "\n".join(lines)
+
+    def export_chrome_trace(self, path: str) -> None:
+        """Write recorded events in Chrome trace-event JSON format."""
+        trace_events = [
+            {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": 1e6 * start,
+                "dur": 1e6 * dur,
+                "pid": 0,
+                "tid": 0 if cat == "phase" else 1,
+            }
+            for name, cat, start, dur in self.events
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
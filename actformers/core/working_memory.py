@@ -12,7 +12,7 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass, replace
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
 import torch
 import torch.nn as nn
@@ -23,6 +23,9 @@ __all__ = [
     "WorkingMemory",
 ]
 
+# A pointer index: a Python int, or a (batch,) LongTensor for per-row pointers
+PointerIndex = Union[int, torch.Tensor]
+
 
 # ---------------------------------------------------------------------------
 # Memory State
@@ -46,6 +49,37 @@ class MemoryState:
     def make_halt_flag(batch_size: int, device: torch.device) -> torch.Tensor:
         return torch.zeros(batch_size, dtype=torch.bool, device=device)
 
+    def detach(self) -> "MemoryState":
+        """Same values, cut from the autograd graph (truncated backprop)."""
+        return MemoryState(
+            registers=self.registers.detach(),
+            scratchpad=self.scratchpad.detach(),
+            pointers=self.pointers.detach(),
+            step=self.step,
+            halt_flag=self.halt_flag.detach() if self.halt_flag is not None else None,
+        )
+
+    def index_select(self, index: torch.Tensor) -> "MemoryState":
+        """Batch rows selected (possibly repeated) by a 1-D *index*."""
+        return MemoryState(
+            registers=self.registers.index_select(0, index),
+            scratchpad=self.scratchpad.index_select(0, index),
+            pointers=self.pointers.index_select(0, index),
+            step=self.step,
+            halt_flag=self.halt_flag.index_select(0, index),
+        )
+
+    @staticmethod
+    def cat(states: List["MemoryState"]) -> "MemoryState":
+        """Concatenate states along the batch dimension (step of the first)."""
+        return MemoryState(
+            registers=torch.cat([s.registers for s in states]),
+            scratchpad=torch.cat([s.scratchpad for s in states]),
+            pointers=torch.cat([s.pointers for s in states]),
+            step=states[0].step,
+            halt_flag=torch.cat([s.halt_flag for s in states]),
+        )
+
 
 # ---------------------------------------------------------------------------
 # Working Memory Module
@@ -71,8 +105,34 @@ class WorkingMemory(nn.Module):
     estimators during training.  This module does NOT branch on
     ``model.training()`` — the caller must set an explicit
     ``execution_mode: Literal['train', 'infer']``.
+
+    Scratchpad addressing
+    ---------------------
+    ``addressing="dense"`` (default) attends over, and writes to, every
+    slot.  ``addressing="topk"`` scores slots with a single matrix-vector
+    product in slot space, then runs the read head over only the ``topk``
+    best slots and blends writes into only the ``topk`` most-addressed
+    slots, so attention and write cost scale with k rather than
+    ``scratchpad_size``.  ``addressing="pointer"`` reads and writes the
+    slot under a pointer (a two-slot interpolation window around
+    ``pointer * (scratchpad_size - 1)``) with gather/scatter, which makes
+    sequential traversal O(1) per step.  In train mode the window is hard
+    in the forward pass and soft in the backward pass (straight-through),
+    so gradients reach the pointer position.
+
+    Reduced precision
+    -----------------
+    With ``state_dtype`` set (e.g. ``torch.bfloat16``) the scratchpad —
+    the bulk of the state — is *stored* in that dtype, halving state memory
+    traffic per step.  Registers carry exact integers in their first
+    component, so they are only reduced when ``exact_registers=False``.
+    Pointers stay float32.  Reads upcast to the parameter dtype (float32)
+    so primitives and attention compute at full precision; writes round
+    back to the storage dtype.
     """
 
+    ADDRESSING_MODES = ("dense", "topk", "pointer")
+
     def __init__(
         self,
         num_registers: int = 16,
@@ -80,13 +140,25 @@ class WorkingMemory(nn.Module):
         scratchpad_size: int = 256,
         scratchpad_dim: int = 64,
         num_pointers: int = 4,
+        addressing: str = "dense",
+        topk: int = 8,
+        state_dtype: Optional[torch.dtype] = None,
+        exact_registers: bool = True,
     ):
         super().__init__()
+        if addressing not in self.ADDRESSING_MODES:
+            raise ValueError(
+                f"addressing must be one of {self.ADDRESSING_MODES}, got {addressing!r}"
+            )
         self.num_registers = num_registers
         self.register_dim = register_dim
         self.scratchpad_size = scratchpad_size
         self.scratchpad_dim = scratchpad_dim
         self.num_pointers = num_pointers
+        self.addressing = addressing
+        self.topk = min(topk, scratchpad_size)
+        self.state_dtype = state_dtype
+        self.exact_registers = exact_registers
 
         # Learnable initial values (trained, not frozen)
         self.register_init = nn.Parameter(torch.zeros(num_registers, register_dim))
@@ -125,6 +197,10 @@ class WorkingMemory(nn.Module):
         registers = self.register_init.unsqueeze(0).expand(batch_size, -1, -1).clone().detach()
         scratchpad = self.scratchpad_init.unsqueeze(0).expand(batch_size, -1, -1).clone().detach()
         pointers = self.pointer_init.unsqueeze(0).expand(batch_size, -1).clone().detach()
+        if self.state_dtype is not None:
+            scratchpad = scratchpad.to(self.state_dtype)
+            if not self.exact_registers:
+                registers = registers.to(self.state_dtype)
         return MemoryState(
             registers=registers,
             scratchpad=scratchpad,
@@ -159,9 +235,17 @@ class WorkingMemory(nn.Module):
             new_regs[:, reg_idx] = value.squeeze(1)
         return replace(state, registers=new_regs, step=state.step)
 
+    @property
+    def compute_dtype(self) -> torch.dtype:
+        """Dtype reads are upcast to (that of the parameters)."""
+        return self.register_init.dtype
+
     def read_register(self, state: MemoryState, reg_idx: int) -> torch.Tensor:
-        """Read register *reg_idx* → (batch, register_dim). Differentiable."""
-        return state.registers[:, reg_idx, :].clone()
+        """
+        Read register *reg_idx* → (batch, register_dim) in ``compute_dtype``.
+        Differentiable.
+        """
+        return state.registers[:, reg_idx, :].to(self.compute_dtype, copy=True)
 
     # ------------------------------------------------------------------
     # Scratchpad operations
@@ -171,18 +255,65 @@ class WorkingMemory(nn.Module):
         self,
         state: MemoryState,
         query: torch.Tensor,
+        ptr_idx: PointerIndex = 0,
+        execution_mode: str = "train",
     ) -> Tuple[torch.Tensor, torch.Tensor]:
         """
-        Content-based differentiable read.
+        Content-based differentiable read (pointer-based in ``pointer`` mode).
 
         Args:
             query: (batch, 1, register_dim) key vector.
+            ptr_idx: Pointer to read under (``pointer`` mode only); an int
+                or a (batch,) LongTensor.
+            execution_mode: 'train' or 'infer' (``pointer`` mode only).
 
         Returns:
             value: (batch, 1, scratchpad_dim)
-            weights: (batch, scratchpad_size)
+            weights: (batch, 1, scratchpad_size); zero outside the selected
+                slots in ``topk`` and ``pointer`` modes.
+        """
+        if self.addressing == "pointer":
+            return self._read_pointer(state, ptr_idx, execution_mode)
+        if self.addressing == "topk":
+            return self._read_topk(state, query)
+        scratchpad = state.scratchpad.to(query.dtype)
+        value, weights = self.read_head(query, scratchpad, scratchpad)
+        return value, weights
+
+    def _slot_scores(self, scratchpad: torch.Tensor, query: torch.Tensor) -> torch.Tensor:
+        """
+        Read-head key scores of every slot, summed over heads → (batch, S).
+
+        ``q · (W_k s + b_k)`` is evaluated as ``(W_k^T q) · s``: one
+        matrix-vector product over the slots instead of projecting all of
+        them.  The ``q · b_k`` term is the same for every slot and does not
+        affect the ranking, so it is dropped.
         """
-        value, weights = self.read_head(query, state.scratchpad, state.scratchpad)
+        head = self.read_head
+        E = head.embed_dim
+        if head.in_proj_weight is not None:
+            w_q, w_k = head.in_proj_weight[:E], head.in_proj_weight[E:2 * E]
+        else:
+            w_q, w_k = head.q_proj_weight, head.k_proj_weight
+        b_q = head.in_proj_bias[:E] if head.in_proj_bias is not None else None
+        q = F.linear(query.squeeze(1), w_q, b_q)        # (batch, E)
+        q_slot = q @ w_k                               # (batch, scratchpad_dim)
+        return torch.bmm(scratchpad, q_slot.unsqueeze(-1)).squeeze(-1)
+
+    def _read_topk(
+        self,
+        state: MemoryState,
+        query: torch.Tensor,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Attend over only the ``topk`` highest-scoring slots."""
+        with torch.no_grad():
+            scores = self._slot_scores(state.scratchpad.to(query.dtype), query)
+        idx = scores.topk(self.topk, dim=-1).indices                 # (batch, k)
+        gather_idx = idx.unsqueeze(-1).expand(-1, -1, self.scratchpad_dim)
+        slots = state.scratchpad.gather(1, gather_idx).to(query.dtype)  # (batch, k, dim)
+        value, sub_weights = self.read_head(query, slots, slots)     # (batch, 1, k)
+        weights = sub_weights.new_zeros(sub_weights.shape[0], 1, self.scratchpad_size)
+        weights = weights.scatter(2, idx.unsqueeze(1), sub_weights)
         return value, weights
 
     def write_to_scratchpad(
@@ -190,16 +321,28 @@ class WorkingMemory(nn.Module):
         state: MemoryState,
         value: torch.Tensor,
         address: Optional[torch.Tensor] = None,
+        ptr_idx: PointerIndex = 0,
+        execution_mode: str = "train",
     ) -> MemoryState:
         """
         Write *value* into scratchpad.
 
         If *address* is provided (batch, scratchpad_size) it is used as a
-        soft write mask.  Otherwise the write is broadcast to all positions.
+        soft write mask.  Otherwise the write is broadcast to all positions
+        (``dense``) or addressed by ``address_net`` (``topk``).  In ``topk``
+        mode only the k most-addressed slots are touched, with the mask
+        renormalised over them.  In ``pointer`` mode the slot under pointer
+        *ptr_idx* is overwritten and *address* is ignored.
 
         Gradient: soft attention write is differentiable.
         """
         proj = self.write_proj(value)  # (batch, 1, scratchpad_dim)
+        if self.addressing == "pointer":
+            return self._write_pointer(state, proj, ptr_idx, execution_mode)
+        if self.addressing == "topk":
+            if address is None:
+                address = self.address_net(value.reshape(value.shape[0], -1))
+            return self._write_topk(state, proj, address)
         new_sp = state.scratchpad.clone()
         if address is not None:
             # Soft write: blend value into addressed positions
@@ -207,6 +350,87 @@ class WorkingMemory(nn.Module):
             new_sp = new_sp * (1 - mask) + proj * mask
         else:
             new_sp = new_sp + proj
+        return replace(state, scratchpad=new_sp.to(state.scratchpad.dtype))
+
+    def _write_topk(
+        self,
+        state: MemoryState,
+        proj: torch.Tensor,
+        address: torch.Tensor,
+    ) -> MemoryState:
+        """Blend *proj* into the ``topk`` slots with the largest address weight."""
+        weight, idx = address.reshape(address.shape[0], -1).topk(self.topk, dim=-1)
+        weight = weight / weight.sum(dim=-1, keepdim=True).clamp_min(1e-8)
+        gather_idx = idx.unsqueeze(-1).expand(-1, -1, self.scratchpad_dim)
+        slots = state.scratchpad.gather(1, gather_idx)               # (batch, k, dim)
+        mask = weight.unsqueeze(-1)
+        blended = slots * (1 - mask) + proj.reshape(proj.shape[0], 1, -1) * mask
+        new_sp = state.scratchpad.scatter(1, gather_idx, blended.to(state.scratchpad.dtype))
+        return replace(state, scratchpad=new_sp)
+
+    # ------------------------------------------------------------------
+    # Pointer-addressed scratchpad access
+    # ------------------------------------------------------------------
+
+    def _pointer_window(
+        self,
+        state: MemoryState,
+        ptr_idx: PointerIndex,
+        execution_mode: str,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Slots and weights of the interpolation window under a pointer.
+
+        Returns:
+            idx: (batch, 2) slot indices ``floor(p)`` and ``floor(p) + 1``
+                (clamped so both are in range).
+            weight: (batch, 2) window weights.  In infer mode these are the
+                one-hot nearest slot; in train mode the one-hot forward is
+                combined with the linear-interpolation gradient (STE).
+        """
+        if isinstance(ptr_idx, torch.Tensor):
+            ptr = state.pointers.gather(1, ptr_idx.view(-1, 1).to(state.pointers.device)).squeeze(1)
+        else:
+            ptr = state.pointers[:, ptr_idx]
+        if self.scratchpad_size == 1:
+            return ptr.new_zeros(ptr.shape[0], 1, dtype=torch.long), ptr.new_ones(ptr.shape[0], 1)
+        pos = ptr.float().clamp(0.0, 1.0) * (self.scratchpad_size - 1)
+        base = pos.detach().floor().clamp(max=self.scratchpad_size - 2)
+        frac = pos - base                                             # (batch,)
+        idx = torch.stack([base, base + 1], dim=1).long()
+        soft = torch.stack([1 - frac, frac], dim=1)
+        hard = torch.stack([frac.detach() < 0.5, frac.detach() >= 0.5], dim=1).to(soft.dtype)
+        if execution_mode == "infer":
+            return idx, hard
+        return idx, soft + (hard - soft).detach()
+
+    def _read_pointer(
+        self,
+        state: MemoryState,
+        ptr_idx: PointerIndex,
+        execution_mode: str,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        idx, weight = self._pointer_window(state, ptr_idx, execution_mode)
+        gather_idx = idx.unsqueeze(-1).expand(-1, -1, self.scratchpad_dim)
+        slots = state.scratchpad.gather(1, gather_idx).to(self.compute_dtype)  # (batch, 2, dim)
+        value = (weight.unsqueeze(-1) * slots).sum(dim=1, keepdim=True)
+        weights = weight.new_zeros(weight.shape[0], self.scratchpad_size)
+        weights = weights.scatter_add(1, idx, weight).unsqueeze(1)
+        return value, weights
+
+    def _write_pointer(
+        self,
+        state: MemoryState,
+        proj: torch.Tensor,
+        ptr_idx: PointerIndex,
+        execution_mode: str,
+    ) -> MemoryState:
+        idx, weight = self._pointer_window(state, ptr_idx, execution_mode)
+        gather_idx = idx.unsqueeze(-1).expand(-1, -1, self.scratchpad_dim)
+        slots = state.scratchpad.gather(1, gather_idx)                # (batch, 2, dim)
+        mask = weight.unsqueeze(-1)
+        blended = slots * (1 - mask) + proj.reshape(proj.shape[0], 1, -1) * mask
+        new_sp = state.scratchpad.scatter(1, gather_idx, blended.to(state.scratchpad.dtype))
         return replace(state, scratchpad=new_sp)
 
     # ------------------------------------------------------------------
@@ -1,11 +1,42 @@
-from .trace_generator import ActionTraceGenerator
-from .datasets import (
-    AdditionDataset,
-    SubtractionDataset,
-    MultiplicationDataset,
-    DigitReversalDataset,
-    MultiTaskDataset,
-)
+import importlib
+from typing import TYPE_CHECKING
+
+# Resolved lazily: the trace generator is torch-free, the datasets are not
+_LAZY_ATTRS = {
+    "ActionTraceGenerator": ".trace_generator",
+    "AdditionDataset": ".datasets",
+    "SubtractionDataset": ".datasets",
+    "MultiplicationDataset": ".datasets",
+    "DigitReversalDataset": ".datasets",
+    "MultiTaskDataset": ".datasets",
+    "PrefetchDataLoader": ".prefetch",
+    "collate_samples": ".prefetch",
+}
+
+if TYPE_CHECKING:
+    from .trace_generator import ActionTraceGenerator
+    from .datasets import (
+        AdditionDataset,
+        SubtractionDataset,
+        MultiplicationDataset,
+        DigitReversalDataset,
+        MultiTaskDataset,
+    )
+    from .prefetch import PrefetchDataLoader, collate_samples
+
+
+def __getattr__(name: str):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
 
 __all__ = [
     "ActionTraceGenerator",
@@ -14,4 +45,6 @@ __all__ = [
     "MultiplicationDataset",
     "DigitReversalDataset",
     "MultiTaskDataset",
-]
\ No newline at end of file
+    "PrefetchDataLoader",
+    "collate_samples",
+]
@@ -0,0 +1,175 @@
+"""
+Prefetching input pipeline.
+
+:class:`PrefetchDataLoader` builds samples (and optional batches) in
+worker processes, ahead of the training loop:
+
+  - Each worker keeps up to ``prefetch_factor`` ready items in a bounded
+    queue, so at most ``num_workers * prefetch_factor`` items are in
+    flight and memory stays bounded.
+  - Tensors come back in shared memory (no copy through the pipe) and are
+    optionally pinned for faster host-to-device transfer.
+  - Workers persist across epochs, so datasets are not re-pickled and
+    processes are not re-spawned every epoch.
+
+Samples hold non-tensor fields (``trace`` is a list of ActionTokens,
+``operands`` a tuple), which ``default_collate`` cannot batch;
+:func:`collate_samples` stacks the tensors and keeps the rest as lists.
+
+With ``shuffle`` the loader draws each epoch's order itself, from its own
+generator, when iteration starts.  torch builds a fresh iterator (which
+first draws a worker base seed) on the first epoch but only resets a
+persistent one afterwards, so leaving the draw to torch would make the
+order depend on which of the two paths ran; here the generator state at
+the start of an epoch alone fixes the order, which is what
+``SupervisedTrainer.train_epoch`` saves to resume mid-epoch.
+
+The loader also times itself: ``stats`` splits wall time into waiting for
+data and everything the consumer did between items (compute), which tells
+whether training is input-bound.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import torch
+from torch.utils.data import DataLoader, Dataset, Sampler
+
+__all__ = ["PrefetchDataLoader", "collate_samples"]
+
+
+def collate_samples(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Batch sample dicts: same-shape tensors are stacked along a new leading
+    dim, ints and floats become tensors, everything else (traces, operand
+    tuples, ragged tensors) is kept as a per-sample list.
+    """
+    batch: Dict[str, Any] = {}
+    for key in samples[0]:
+        values = [s[key] for s in samples]
+        first = values[0]
+        if isinstance(first, torch.Tensor) and all(v.shape == first.shape for v in values):
+            batch[key] = torch.stack(values)
+        elif isinstance(first, (int, float)) and not isinstance(first, bool):
+            batch[key] = torch.tensor(values)
+        else:
+            batch[key] = values
+    return batch
+
+
+class _EpochOrder(Sampler):
+    """Sampler yielding the order :class:`PrefetchDataLoader` drew for the
+    current epoch (iterated in the main process, also with workers)."""
+
+    def __init__(self, size: int):
+        self.order = list(range(size))
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.order)
+
+
+class PrefetchDataLoader:
+    """
+    Background-prefetching loader over a map-style dataset.
+
+    Args:
+        dataset: Dataset of sample dicts (e.g. ``AdditionDataset``).
+        batch_size: Samples per batch; None yields single samples, the
+            only format ``SupervisedTrainer.train_step`` and
+            ``train_epoch`` consume.
+        shuffle: Reshuffle every epoch.
+        num_workers: Worker processes; 0 loads inline (no prefetching).
+        prefetch_factor: Ready items buffered per worker.
+        pin_memory: Pin batches in page-locked memory (default: when CUDA
+            is available).
+        persistent_workers: Keep workers alive between epochs.
+        collate_fn: Batch builder (default :func:`collate_samples`).
+        seed: Seed for the shuffling order (default: drawn from the
+            global torch RNG).
+    """
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        batch_size: Optional[int] = None,
+        shuffle: bool = False,
+        num_workers: int = 2,
+        prefetch_factor: int = 2,
+        pin_memory: Optional[bool] = None,
+        persistent_workers: bool = True,
+        collate_fn: Optional[Callable[[List[Any]], Any]] = None,
+        seed: Optional[int] = None,
+    ):
+        if num_workers < 0:
+            raise ValueError(f"num_workers must be >= 0, got {num_workers}")
+        if pin_memory is None:
+            pin_memory = torch.cuda.is_available()
+        if seed is None:
+            seed = int(torch.empty((), dtype=torch.int64).random_())
+        self.generator = torch.Generator().manual_seed(seed)
+        self.sampler = _EpochOrder(len(dataset)) if shuffle else None
+        workers = {}
+        if num_workers > 0:
+            workers = {
+                'prefetch_factor': prefetch_factor,
+                'persistent_workers': persistent_workers,
+            }
+        self.loader = DataLoader(
+            dataset,
+            batch_size=batch_size,
+            sampler=self.sampler,
+            num_workers=num_workers,
+            collate_fn=(collate_fn or collate_samples) if batch_size is not None else None,
+            pin_memory=pin_memory,
+            generator=self.generator,
+            **workers,
+        )
+        self.reset_stats()
+
+    def __len__(self) -> int:
+        return len(self.loader)
+
+    @property
+    def dataset(self) -> Dataset:
+        return self.loader.dataset
+
+    def reset_stats(self) -> None:
+        self.data_time = 0.0
+        self.compute_time = 0.0
+        self.batches = 0
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Seconds spent waiting for data vs. in the consumer, since
+        :meth:`reset_stats`."""
+        total = self.data_time + self.compute_time
+        return {
+            'batches': self.batches,
+            'data_time': self.data_time,
+            'compute_time': self.compute_time,
+            'data_wait_fraction': self.data_time / total if total > 0 else 0.0,
+        }
+
+    def __iter__(self) -> Iterator[Any]:
+        if self.sampler is not None:
+            order = torch.randperm(len(self.sampler), generator=self.generator)
+            self.sampler.order = order.tolist()
+        it = iter(self.loader)
+        clock = time.perf_counter
+        last = clock()
+        while True:
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            now = clock()
+            self.data_time += now - last
+            self.batches += 1
+            yield item
+            last = clock()
+            self.compute_time += last - now
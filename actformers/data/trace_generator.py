@@ -26,7 +26,7 @@ from __future__ import annotations
 
 from typing import List, Optional, Tuple
 
-from actformers.core.action_space import (
+from actformers.core.actions import (
     ActionToken,
     ActionType,
     make_add,
@@ -11,7 +11,7 @@ Transformers score near 0% at 5x.  Actformer should score >95% at any scale.
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import torch
 from torch.utils.data import DataLoader
@@ -26,6 +26,16 @@ class GeneralizationEvaluator:
     """
     Evaluates OOD generalization by training on N-digit problems and
     testing on M-digit problems where M > N.
+
+    Args:
+        model: Model to evaluate.
+        execution_mode: Execution mode passed to the model.
+        device: Device inputs are moved to.
+        output_scale: Scale between dataset targets and integer answers.
+        search: Optional decoder used instead of ``model.forward``, e.g. a
+            ``BeamSearchDecoder`` or ``BestOfNDecoder`` from
+            ``actformers.prediction``; called as
+            ``search(inputs, execution_mode=...) -> (output, info)``.
     """
 
     def __init__(
@@ -34,8 +44,10 @@ class GeneralizationEvaluator:
         execution_mode: str = "infer",
         device: Optional[torch.device] = None,
         output_scale: float = 100.0,
+        search: Optional[Callable[..., Tuple[torch.Tensor, Dict[str, Any]]]] = None,
     ):
         self.model = model
+        self.search = search
         self.execution_mode = execution_mode
         self.device = device or torch.device("cpu")
         self.output_scale = output_scale
@@ -52,6 +64,7 @@ class GeneralizationEvaluator:
             Dict with 'exact_match', 'per_digit', 'num_samples'.
         """
         self.model.eval()
+        decode = self.search if self.search is not None else self.model
         predictions = []
         targets = []
 
@@ -60,7 +73,7 @@ class GeneralizationEvaluator:
                 inp = sample['input'].unsqueeze(0).to(self.device)
                 target = sample['output'].item()
 
-                output, info = self.model(inp, execution_mode=self.execution_mode)
+                output, info = decode(inp, execution_mode=self.execution_mode)
                 pred = round(output.item() * self.output_scale)
 
                 predictions.append(pred)
@@ -116,4 +129,37 @@ class GeneralizationEvaluator:
         return {
             'per_level': results,
             'gaps': gaps,
-        }
\ No newline at end of file
+        }
+
+    def compare_precision(
+        self,
+        variants: Dict[str, Actformer],
+        test_dataset,
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Accuracy of reduced-precision variants relative to ``self.model``.
+
+        Args:
+            variants: {name: model}, e.g. from ``actformers.core.precision``.
+            test_dataset: Dataset to evaluate every model on.
+
+        Returns:
+            {name: metrics} for 'reference' and each variant; variant
+            entries also carry 'exact_match_delta' and 'per_digit_delta'
+            (variant minus reference).  ``search`` is not applied, since
+            it is bound to a single model.
+        """
+        base_model, search = self.model, self.search
+        self.search = None
+        try:
+            reference = self.eval_addition(test_dataset)
+            results = {'reference': reference}
+            for name, model in variants.items():
+                self.model = model
+                metrics = self.eval_addition(test_dataset)
+                metrics['exact_match_delta'] = metrics['exact_match'] - reference['exact_match']
+                metrics['per_digit_delta'] = metrics['per_digit'] - reference['per_digit']
+                results[name] = metrics
+        finally:
+            self.model, self.search = base_model, search
+        return results
\ No newline at end of file
@@ -1,3 +1,13 @@
 from .action_predictor import ActionPredictor
+from .draft import DraftSource, MacroDraft, PredictorDraft, TraceDraft
+from .search import BeamSearchDecoder, BestOfNDecoder
 
-__all__ = ["ActionPredictor"]
\ No newline at end of file
+__all__ = [
+    "ActionPredictor",
+    "BeamSearchDecoder",
+    "BestOfNDecoder",
+    "DraftSource",
+    "MacroDraft",
+    "PredictorDraft",
+    "TraceDraft",
+]
@@ -110,7 +110,8 @@ class ActionPredictor(nn.Module):
             (batch, 1, hidden_dim) context vector.
         """
         batch_size = state.registers.shape[0]
-        flat_regs = state.registers.reshape(batch_size, -1)  # (batch, num_regs * reg_dim)
+        # Reduced-precision state is upcast to the parameter dtype
+        flat_regs = state.registers.reshape(batch_size, -1).to(self.pos_encoding.dtype)
         context = self.state_encoder(flat_regs)  # (batch, hidden_dim)
         return context.unsqueeze(1)  # (batch, 1, hidden_dim)
 
@@ -132,8 +133,9 @@ class ActionPredictor(nn.Module):
         if not action_history:
             return torch.zeros(1, 0, self.hidden_dim, device=device)
 
-        tokens = [self.action_space.decode_flat_token(idx) for idx in action_history]
-        emb = self.action_embed.embed_tokens(tokens)  # (seq, hidden_dim)
+        indices = torch.tensor(action_history, dtype=torch.long, device=device)
+        components = self.action_space.decode_flat_batch(indices)  # (seq, 5)
+        emb = self.action_embed.embed_components(components)  # (seq, hidden_dim)
         seq_len = emb.shape[0]
 
         # Add positional encoding: (seq, dim) + (seq, dim) → (seq, dim)
@@ -178,6 +180,49 @@ class ActionPredictor(nn.Module):
         logits = self.output_head(next_action_repr.squeeze(1))  # (1, flat_vocab)
         return logits
 
+    def forward_batch(
+        self,
+        state: MemoryState,
+        history: torch.Tensor,
+        lengths: torch.Tensor,
+    ) -> torch.Tensor:
+        """
+        Static-shape batched variant of :meth:`forward`.
+
+        Every row has its own history in a fixed-width buffer; positions at
+        or beyond ``lengths[b]`` are padding and are masked out of the
+        history self-attention.  Rows with an empty history fall back to
+        the state context, exactly as :meth:`forward` does.  There is no
+        data-dependent Python control flow, so this can be captured by
+        ``torch.compile``.
+
+        Args:
+            state: MemoryState with batch size B.
+            history: (B, T) long tensor of flat action indices, T <= max_history.
+            lengths: (B,) number of valid entries per row.
+
+        Returns:
+            (B, flat_vocab_size) logits for the next action.
+        """
+        context = self.encode_state(state)                            # (B, 1, hidden)
+        steps = history.shape[1]
+        components = self.action_space.decode_flat_batch(history)     # (B, T, 5)
+        emb = self.action_embed.embed_components(components)          # (B, T, hidden)
+        emb = emb + self.pos_encoding[:, :steps, :]
+
+        # At least one unmasked key per row keeps empty rows NaN-free
+        valid = lengths.clamp(min=1)
+        positions = torch.arange(steps, device=history.device)
+        padding_mask = positions.unsqueeze(0) >= valid.unsqueeze(1)   # (B, T)
+        decoded = self.decoder(emb, context, tgt_key_padding_mask=padding_mask)
+
+        last = (valid - 1).view(-1, 1, 1).expand(-1, 1, decoded.shape[-1])
+        next_action_repr = decoded.gather(1, last)                    # (B, 1, hidden)
+        next_action_repr = torch.where(
+            (lengths == 0).view(-1, 1, 1), context, next_action_repr,
+        )
+        return self.output_head(next_action_repr.squeeze(1))
+
     def sample_action(
         self,
         logits: torch.Tensor,
@@ -0,0 +1,135 @@
+"""
+Draft sources — cheap proposals for speculative action decoding.
+
+A draft source guesses the next few flat action indices; the
+``ActionPredictor`` then checks all of them in one batched pass (see
+``Actformer.forward(draft_source=...)``).  Drafts never change what the
+model outputs, only how many sequential predictor calls it takes:
+
+  - :class:`TraceDraft`: the symbolic ``ActionTraceGenerator`` trace for
+    the problem at hand (free and usually right for known algorithms).
+  - :class:`MacroDraft`: completes a macro body once the history ends
+    with a prefix of it.
+  - :class:`PredictorDraft`: greedy rollout of a small (e.g. distilled)
+    ActionPredictor against the execution engine.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Iterable, List, Sequence, Union
+
+import torch
+
+from actformers.core.action_space import ActionSpace, MacroAction
+from actformers.core.actions import ActionToken
+from actformers.core.working_memory import MemoryState
+from actformers.data.trace_generator import ActionTraceGenerator
+
+if TYPE_CHECKING:
+    from actformers.composition.macro_library import MacroLibrary
+    from actformers.core.execution_engine import ActionExecutionEngine
+    from .action_predictor import ActionPredictor
+
+__all__ = ["DraftSource", "TraceDraft", "MacroDraft", "PredictorDraft"]
+
+
+class DraftSource(ABC):
+    """Base class: propose up to *k* flat action indices to follow *history*."""
+
+    @abstractmethod
+    def propose(self, state: MemoryState, history: List[int], k: int) -> List[int]:
+        ...
+
+
+class TraceDraft(DraftSource):
+    """
+    Proposes the continuation of a known trace while the history still
+    follows it; proposes nothing once the model has diverged.
+    """
+
+    def __init__(self, action_space: ActionSpace, trace: Sequence[ActionToken]):
+        self.flat = [action_space.encode_token_flat(t) for t in trace]
+
+    @classmethod
+    def from_generator(
+        cls,
+        action_space: ActionSpace,
+        task: str,
+        *operands,
+        generator: ActionTraceGenerator = None,
+    ) -> "TraceDraft":
+        """Draft from ``generator.generate_<task>_trace(*operands)``."""
+        generator = generator or ActionTraceGenerator()
+        method = getattr(generator, f"generate_{task}_trace", None)
+        if method is None:
+            raise ValueError(f"ActionTraceGenerator has no '{task}' trace")
+        return cls(action_space, method(*operands))
+
+    def propose(self, state: MemoryState, history: List[int], k: int) -> List[int]:
+        n = len(history)
+        if self.flat[:n] != history:
+            return []
+        return self.flat[n:n + k]
+
+
+class MacroDraft(DraftSource):
+    """
+    Proposes the rest of a macro body when the history ends with (at least
+    ``min_prefix`` actions of) its beginning.  Longest matching prefix
+    wins, then the higher-scored macro.
+    """
+
+    def __init__(
+        self,
+        action_space: ActionSpace,
+        macros: Union["MacroLibrary", Iterable[MacroAction]],
+        min_prefix: int = 1,
+    ):
+        if hasattr(macros, "get_all_macros"):
+            macros = macros.get_all_macros()
+        self.bodies = [
+            [action_space.encode_token_flat(t) for t in m.sub_actions] for m in macros
+        ]
+        self.min_prefix = max(1, min_prefix)
+
+    def propose(self, state: MemoryState, history: List[int], k: int) -> List[int]:
+        best: List[int] = []
+        best_len = 0
+        for body in self.bodies:
+            for n in range(min(len(body) - 1, len(history)), self.min_prefix - 1, -1):
+                if n > best_len and body[:n] == history[-n:]:
+                    best, best_len = body[n:], n
+                    break
+        return best[:k]
+
+
+class PredictorDraft(DraftSource):
+    """
+    Greedy rollout of a small predictor: predict, execute, repeat *k* times.
+    The predictor must share the target model's action space.
+    """
+
+    def __init__(
+        self,
+        predictor: "ActionPredictor",
+        engine: "ActionExecutionEngine",
+        execution_mode: str = "infer",
+    ):
+        self.predictor = predictor
+        self.engine = engine
+        self.execution_mode = execution_mode
+
+    @torch.no_grad()
+    def propose(self, state: MemoryState, history: List[int], k: int) -> List[int]:
+        space = self.predictor.action_space
+        history = list(history)
+        proposals: List[int] = []
+        for _ in range(k):
+            action_idx = int(self.predictor(state, history).argmax(dim=-1)[0])
+            proposals.append(action_idx)
+            history.append(action_idx)
+            state = self.engine.execute(space.decode_flat_token(action_idx), state, self.execution_mode)
+            if state.halt_flag.any():
+                break
+        return proposals
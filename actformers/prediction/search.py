@@ -0,0 +1,301 @@
+"""
+Search — inference-time decoding over action sequences.
+
+Two decoders that spend extra compute for accuracy while keeping every
+step batched through ``ActionPredictor.forward_batch`` and
+``ActionExecutionEngine.execute_batch``:
+
+  - :class:`BeamSearchDecoder` keeps the ``beam_width`` best partial
+    traces per input, each with its own MemoryState.  Beams are ranked by
+    cumulative log-prob, optionally plus a ValueNet estimate of the state
+    they reach.
+  - :class:`BestOfNDecoder` samples N complete traces per input, reads the
+    answer each one produces with the symbolic trace interpreter
+    (``ActionTraceGenerator.extract_result_from_trace``) and keeps the
+    majority answer, or the first one accepted by a verifier.
+
+Both are callables with the same contract as ``Actformer.forward`` in
+inference: ``decoder(inputs) -> (output, info)``.  Actions execute
+through ``Actformer.execute_flat_batch``, so macro tokens expand to their
+bodies exactly as in ``Actformer.forward``.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+import torch
+import torch.nn.functional as F
+
+from actformers.core.actions import ActionToken, ActionType
+from actformers.core.working_memory import MemoryState
+from actformers.data.trace_generator import ActionTraceGenerator
+from .value_net import ValueNet
+
+if TYPE_CHECKING:
+    from actformers.core.model import Actformer
+
+__all__ = ["BeamSearchDecoder", "BestOfNDecoder"]
+
+
+class BeamSearchDecoder:
+    """
+    Beam search over action sequences.
+
+    Every step scores all ``vocab`` continuations of the B*W live beams in
+    one predictor call, keeps the best candidates per input, executes them
+    as one batch (expanding macro calls) and (with a ValueNet) re-ranks by
+    ``log_prob + value_weight * V(state)``.  Halted beams are carried
+    forward unchanged.
+
+    Args:
+        model: Trained Actformer.
+        beam_width: Beams kept per input.
+        value_net: Optional critic used to re-rank expanded beams.
+        value_weight: Weight of the value estimate in the beam score.
+        expansion: Candidates executed per beam before re-ranking when a
+            ValueNet is given (without one, ranking is by log-prob only and
+            exactly ``beam_width`` candidates are executed).
+        max_steps: Step limit; defaults to ``model.max_steps``.
+    """
+
+    def __init__(
+        self,
+        model: "Actformer",
+        beam_width: int = 4,
+        value_net: Optional[ValueNet] = None,
+        value_weight: float = 1.0,
+        expansion: int = 2,
+        max_steps: Optional[int] = None,
+    ):
+        if beam_width < 1:
+            raise ValueError(f"beam_width must be >= 1, got {beam_width}")
+        self.model = model
+        self.beam_width = beam_width
+        self.value_net = value_net
+        self.value_weight = value_weight
+        self.expansion = max(1, expansion)
+        self.max_steps = max_steps or model.max_steps
+
+    def _rank(self, cum_log_prob: torch.Tensor, state: MemoryState) -> torch.Tensor:
+        if self.value_net is None:
+            return cum_log_prob
+        value = self.value_net(state).squeeze(-1).to(cum_log_prob.dtype)
+        return cum_log_prob + self.value_weight * value
+
+    @torch.no_grad()
+    def __call__(
+        self,
+        inputs: torch.Tensor,
+        execution_mode: str = "infer",
+    ) -> Tuple[torch.Tensor, Dict[str, Any]]:
+        """
+        Decode *inputs* and return the best beam's output.
+
+        Returns:
+            output: (batch, 1) decoded from the best beam.
+            info: 'actions' (batch, steps) best trace (-1 padded),
+                'beam_actions' (batch, W, steps), 'beam_scores' (batch, W),
+                'lengths' (batch,), 'final_state' of the best beams.
+        """
+        model = self.model
+        predictor = model.action_predictor
+        batch, W = inputs.shape[0], self.beam_width
+        device = inputs.device
+        steps = min(self.max_steps, predictor.max_history)
+        vocab = model.action_space.flat_vocab_size
+        offsets = torch.arange(batch, device=device).unsqueeze(1)   # (B, 1)
+
+        state = model.encode_input(inputs).index_select(
+            torch.arange(batch, device=device).repeat_interleave(W),
+        )
+        history = torch.zeros(batch * W, steps, dtype=torch.long, device=device)
+        lengths = torch.zeros(batch * W, dtype=torch.long, device=device)
+        # Identical initial beams: only the first may expand at step 0
+        cum_log_prob = torch.full((batch, W), float("-inf"), device=device)
+        cum_log_prob[:, 0] = 0.0
+        score = cum_log_prob.clone()
+
+        # Halted beams may only "continue" with a free, non-executed action 0
+        finished_row = torch.full((vocab,), float("-inf"), device=device)
+        finished_row[0] = 0.0
+        num_candidates = W * self.expansion if self.value_net is not None else W
+
+        for _ in range(steps):
+            if bool(state.halt_flag.all()):
+                break
+            logits = predictor.forward_batch(state, history, lengths)
+            log_probs = F.log_softmax(logits.float(), dim=-1)
+            halted = state.halt_flag
+            log_probs = torch.where(halted.unsqueeze(1), finished_row, log_probs)
+
+            candidates = cum_log_prob.view(-1, 1) + log_probs              # (B*W, V)
+            k = min(num_candidates, W * vocab)
+            top_lp, top_idx = candidates.view(batch, -1).topk(k, dim=-1)    # (B, k)
+            parent = offsets * W + top_idx // vocab                         # (B, k)
+            action = (top_idx % vocab).flatten()
+            parent = parent.flatten()
+
+            parent_state = state.index_select(parent)
+            stepped = model.execute_flat_batch(action, parent_state, execution_mode)
+            active = ~parent_state.halt_flag
+            cand_state = MemoryState(
+                registers=torch.where(active.view(-1, 1, 1), stepped.registers, parent_state.registers),
+                scratchpad=torch.where(active.view(-1, 1, 1), stepped.scratchpad, parent_state.scratchpad),
+                pointers=torch.where(active.view(-1, 1), stepped.pointers, parent_state.pointers),
+                step=state.step,
+                halt_flag=stepped.halt_flag | parent_state.halt_flag,
+            )
+            cand_score = self._rank(top_lp.flatten(), cand_state).view(batch, k)
+
+            # Keep the W best candidates per input
+            keep_score, keep = cand_score.topk(W, dim=-1)                   # (B, W)
+            keep_flat = (offsets * k + keep).flatten()
+            state = cand_state.index_select(keep_flat)
+            parent = parent.index_select(0, keep_flat)
+            action = action.index_select(0, keep_flat)
+            active = active.index_select(0, keep_flat)
+            cum_log_prob = top_lp.gather(1, keep)
+            score = keep_score
+
+            history = history.index_select(0, parent)
+            lengths = lengths.index_select(0, parent)
+            slot = lengths.clamp(max=steps - 1).unsqueeze(1)
+            history = torch.where(active.unsqueeze(1), history.scatter(1, slot, action.unsqueeze(1)), history)
+            lengths = lengths + active.long()
+
+        best = score.argmax(dim=-1)                                         # (B,)
+        best_flat = offsets.squeeze(1) * W + best
+        best_state = state.index_select(best_flat)
+        output = model.decode_output(best_state)
+
+        positions = torch.arange(steps, device=device)
+        actions = torch.where(positions.unsqueeze(0) < lengths.unsqueeze(1), history, -1)
+        max_len = int(lengths.max()) if lengths.numel() else 0
+        actions = actions[:, :max_len]
+        info = {
+            'actions': actions.index_select(0, best_flat),
+            'beam_actions': actions.view(batch, W, -1),
+            'beam_scores': score,
+            'lengths': lengths.index_select(0, best_flat),
+            'final_state': best_state,
+        }
+        return output, info
+
+
+class BestOfNDecoder:
+    """
+    Best-of-N sampling with symbolic answer selection.
+
+    Each input is replicated ``num_samples`` times and decoded in one
+    batch with ``Actformer.forward_static``.  Every sampled trace is run
+    through the symbolic trace interpreter to get the integer answer it
+    writes with OUTPUT actions, macro calls expanded to their bodies.
+    With a *verify_fn*, the most likely trace
+    whose answer is accepted wins; otherwise (or if none is accepted) the
+    most frequent answer wins, ties broken by trace log-prob.
+
+    Args:
+        model: Trained Actformer.
+        num_samples: Traces sampled per input.
+        temperature: Sampling temperature.
+        verify_fn: Optional ``(input_row, answer) -> bool``.
+    """
+
+    def __init__(
+        self,
+        model: "Actformer",
+        num_samples: int = 8,
+        temperature: float = 1.0,
+        verify_fn: Optional[Callable[[torch.Tensor, int], bool]] = None,
+    ):
+        if num_samples < 1:
+            raise ValueError(f"num_samples must be >= 1, got {num_samples}")
+        self.model = model
+        self.num_samples = num_samples
+        self.temperature = temperature
+        self.verify_fn = verify_fn
+
+    def _trace_tokens(self, actions: List[int]) -> List[ActionToken]:
+        """Sampled trace up to its first HALT, with macro calls expanded
+        (recursively) to the primitives the trace interpreter reads."""
+        space = self.model.action_space
+        tokens: List[ActionToken] = []
+        for a in actions:
+            if a >= 0 and self._emit(space.decode_flat_token(a), tokens, frozenset()):
+                break
+        return tokens
+
+    def _emit(self, token: ActionToken, out: List[ActionToken], active: frozenset) -> bool:
+        """Append *token*, expanded if it calls a macro, to *out*; True at
+        HALT.  A macro calling itself (through *active*) stays unexpanded."""
+        macro = self.model.action_space.macro_for_token(token)
+        if macro is None or macro.macro_id in active:
+            out.append(token)
+            return token.op_id == ActionType.HALT
+        active = active | {macro.macro_id}
+        return any(self._emit(sub, out, active) for sub in macro.expand())
+
+    def _choose(
+        self,
+        row_input: torch.Tensor,
+        answers: List[int],
+        trace_log_probs: List[float],
+    ) -> Tuple[int, bool]:
+        order = sorted(range(len(answers)), key=lambda i: -trace_log_probs[i])
+        if self.verify_fn is not None:
+            for i in order:
+                if self.verify_fn(row_input, answers[i]):
+                    return i, True
+        votes = Counter(answers)
+        return max(order, key=lambda i: votes[answers[i]]), False
+
+    @torch.no_grad()
+    def __call__(
+        self,
+        inputs: torch.Tensor,
+        execution_mode: str = "infer",
+    ) -> Tuple[torch.Tensor, Dict[str, Any]]:
+        """
+        Decode *inputs* and return the selected sample's output.
+
+        Returns:
+            output: (batch, 1) decoded from the selected sample.
+            info: 'answers' (symbolic answer per input), 'verified'
+                (per input, whether verify_fn accepted it), 'votes'
+                (per input, share of samples agreeing), 'actions' of the
+                selected traces, 'candidate_answers' (batch, N) lists.
+        """
+        model = self.model
+        batch, N = inputs.shape[0], self.num_samples
+        repeated = inputs.repeat_interleave(N, dim=0)
+        outputs, run = model.forward_static(
+            repeated, execution_mode=execution_mode, temperature=self.temperature,
+        )
+        actions = run['actions'].tolist()
+        trace_log_probs = run['log_probs'].sum(dim=-1).tolist()
+
+        chosen, answers, verified, votes, candidate_answers = [], [], [], [], []
+        for b in range(batch):
+            rows = range(b * N, (b + 1) * N)
+            row_answers = [
+                ActionTraceGenerator.extract_result_from_trace(self._trace_tokens(actions[r]))
+                for r in rows
+            ]
+            pick, ok = self._choose(inputs[b], row_answers, [trace_log_probs[r] for r in rows])
+            chosen.append(b * N + pick)
+            answers.append(row_answers[pick])
+            verified.append(ok)
+            votes.append(row_answers.count(row_answers[pick]) / N)
+            candidate_answers.append(row_answers)
+
+        index = torch.tensor(chosen, device=inputs.device)
+        info = {
+            'answers': answers,
+            'verified': verified,
+            'votes': votes,
+            'actions': run['actions'].index_select(0, index),
+            'candidate_answers': candidate_answers,
+        }
+        return outputs.index_select(0, index), info
@@ -54,6 +54,6 @@ class ValueNet(nn.Module):
             (batch, 1) scalar value estimate.
         """
         batch_size = state.registers.shape[0]
-        flat_regs = state.registers.reshape(batch_size, -1)
+        flat_regs = state.registers.reshape(batch_size, -1).to(state.pointers.dtype)
         features = torch.cat([flat_regs, state.pointers], dim=-1)
         return self.net(features)
\ No newline at end of file
@@ -0,0 +1,5 @@
+from .cache import LRUCache, ResultCache
+from .loadgen import run_load
+from .server import InferenceServer
+
+__all__ = ["InferenceServer", "LRUCache", "ResultCache", "run_load"]
@@ -0,0 +1,169 @@
+"""
+Caches for repeated queries.
+
+  - :class:`LRUCache`: thread-safe LRU map with optional TTL, bounded by
+    entry count and (optionally) by the bytes of the tensors it holds, with
+    hit/miss/eviction counters.
+  - :class:`ResultCache`: final outputs keyed on ``(task, operands)``, with
+    operands normalized so that e.g. ``add(3, 5)`` and ``add(5, 3)`` share
+    an entry.
+
+Initial ``MemoryState`` caching lives on the model:
+``Actformer.enable_state_cache`` stores the per-row result of
+``encode_input`` in an :class:`LRUCache`.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+import torch
+
+__all__ = ["LRUCache", "ResultCache", "COMMUTATIVE_TASKS"]
+
+# Tasks whose answer does not depend on operand order
+COMMUTATIVE_TASKS = frozenset({"addition", "multiplication", "max"})
+
+_MISSING = object()
+
+
+def _nbytes(value: Any) -> int:
+    """Bytes held by the tensors in *value* (tensors, dataclasses, containers)."""
+    if isinstance(value, torch.Tensor):
+        return value.element_size() * value.nelement()
+    if is_dataclass(value) and not isinstance(value, type):
+        return sum(_nbytes(getattr(value, f.name)) for f in fields(value))
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(v) for v in value)
+    return 0
+
+
+class LRUCache:
+    """
+    Least-recently-used cache with optional time-to-live.
+
+    Args:
+        max_entries: Entry limit.
+        ttl: Seconds an entry stays valid; None = forever.
+        max_bytes: Limit on the total tensor bytes held; None = unbounded.
+        clock: Time source (for tests).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be >= 1, got {max_entries}")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _drop(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self.nbytes -= size
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and self.ttl is not None and self.clock() - entry[1] > self.ttl:
+                self._drop(key)
+                self.expirations += 1
+                entry = _MISSING
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = _nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return  # would evict everything and still not fit
+            self._entries[key] = (value, self.clock(), size)
+            self.nbytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.nbytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.nbytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+
+class ResultCache(LRUCache):
+    """
+    LRU/TTL cache of final outputs keyed on the task and its operands.
+
+    Operands are normalized to plain Python numbers (ints stay ints, floats
+    are rounded to ``precision`` digits) and sorted for commutative tasks.
+    """
+
+    def __init__(self, *args, precision: int = 6, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.precision = precision
+
+    def key(self, task: str, operands: Sequence[Any]) -> Tuple[Hashable, ...]:
+        values = []
+        for x in operands:
+            if isinstance(x, torch.Tensor):
+                x = x.item()
+            if isinstance(x, float) and not x.is_integer():
+                x = round(x, self.precision)
+            else:
+                x = int(x)
+            values.append(x)
+        if task in COMMUTATIVE_TASKS:
+            values.sort()
+        return (task, *values)
+
+    def get_result(self, task: str, operands: Sequence[Any], default: Any = None) -> Any:
+        return self.get(self.key(task, operands), default)
+
+    def put_result(self, task: str, operands: Sequence[Any], value: Any) -> None:
+        self.put(self.key(task, operands), value)
@@ -0,0 +1,74 @@
+"""
+Load generator — closed-loop latency/throughput measurement for
+:class:`~actformers.serving.server.InferenceServer`.
+
+``concurrency`` clients each submit a query, wait for the answer and
+submit the next one, until ``num_requests`` have completed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Callable, Dict, List
+
+import torch
+
+from .server import InferenceServer
+
+__all__ = ["percentile", "run_load"]
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank *q*-th percentile (0 <= q <= 100) of *values*."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+async def run_load(
+    server: InferenceServer,
+    make_input: Callable[[int], torch.Tensor],
+    num_requests: int = 200,
+    concurrency: int = 16,
+) -> Dict[str, float]:
+    """
+    Drive *server* with *concurrency* closed-loop clients.
+
+    Args:
+        server: A started server.
+        make_input: Maps a request number to its (input_len,) inputs.
+        num_requests: Total queries to send.
+        concurrency: Simultaneous in-flight queries.
+
+    Returns:
+        Dict with 'requests', 'throughput' (queries/s), 'p50_ms', 'p99_ms',
+        'mean_ms' (client-observed latency) and 'mean_batch' (average rows
+        per action step on the server).
+    """
+    latencies: List[float] = []
+    counter = iter(range(num_requests))
+    stats_before = dict(server.stats)
+
+    async def client() -> None:
+        for i in counter:
+            start = time.perf_counter()
+            await server.submit(make_input(i))
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    steps = server.stats["steps"] - stats_before["steps"]
+    rows = server.stats["batched_rows"] - stats_before["batched_rows"]
+    return {
+        'requests': len(latencies),
+        'throughput': len(latencies) / elapsed if elapsed > 0 else float("inf"),
+        'p50_ms': percentile(latencies, 50) * 1e3,
+        'p99_ms': percentile(latencies, 99) * 1e3,
+        'mean_ms': sum(latencies) / max(len(latencies), 1) * 1e3,
+        'mean_batch': rows / steps if steps else 0.0,
+    }
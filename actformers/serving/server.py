@@ -0,0 +1,271 @@
+"""
+Inference server — asyncio front end with dynamic micro-batching.
+
+Requests are queued from the event loop and served by one worker thread
+that runs the batched, static-shape action loop
+(``Actformer.step_batch``).  The worker keeps a running batch:
+
+  - When idle it waits for a request, then up to ``max_wait`` seconds for
+    more, and starts with at most ``max_batch_size`` rows.
+  - Between steps it admits queued requests into free rows, so new work
+    does not wait for the current batch to drain.
+  - A row leaves the batch as soon as it halts (or hits ``max_steps``):
+    its output is decoded and its future resolved on the event loop
+    immediately, without waiting for slower rows.
+
+Each step runs ``Actformer.step_batch`` eagerly, so macro tokens expand
+to their bodies exactly as in ``Actformer.forward``; answers match
+``model(inputs, execution_mode='infer')`` given the same action choices.
+
+Usage::
+
+    async with InferenceServer(model, max_batch_size=32) as server:
+        output, info = await server.submit(torch.tensor([0.12, 0.34]))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import torch
+
+from actformers.core.model import Actformer
+from actformers.core.working_memory import MemoryState
+from .cache import ResultCache
+
+__all__ = ["InferenceServer"]
+
+
+@dataclass
+class _Request:
+    inputs: torch.Tensor                    # (input_len,)
+    future: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+    submitted: float = field(default_factory=time.perf_counter)
+
+
+def _resolve(future: asyncio.Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+    """Runs on the event loop; the client may have cancelled meanwhile."""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class InferenceServer:
+    """
+    Dynamic-batching Actformer inference server.
+
+    Args:
+        model: Trained Actformer (switched to eval mode).
+        max_batch_size: Maximum rows in the running batch.
+        max_wait: Seconds an idle worker waits to fill a new batch.
+        execution_mode: Execution mode for the action loop.
+        greedy: Argmax decoding (deterministic) instead of sampling.
+        temperature: Sampling temperature when not greedy.
+        result_cache: Optional cache of finished results; hits are answered
+            on the event loop without reaching the worker.  Only used with
+            greedy decoding, since sampled outputs must not repeat.
+    """
+
+    def __init__(
+        self,
+        model: Actformer,
+        max_batch_size: int = 32,
+        max_wait: float = 0.005,
+        execution_mode: str = "infer",
+        greedy: bool = True,
+        temperature: float = 1.0,
+        result_cache: Optional[ResultCache] = None,
+    ):
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be >= 1, got {max_batch_size}")
+        self.model = model.eval()
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.execution_mode = execution_mode
+        self.greedy = greedy
+        self.temperature = temperature
+        self.max_steps = min(model.max_steps, model.action_predictor.max_history)
+        self.result_cache = result_cache
+
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self.stats: Dict[str, int] = {"requests": 0, "steps": 0, "batched_rows": 0}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> "InferenceServer":
+        if self._worker is None:
+            self._stopping.clear()
+            self._worker = threading.Thread(target=self._run, name="actformer-server", daemon=True)
+            self._worker.start()
+        return self
+
+    async def stop(self) -> None:
+        """Finish in-flight requests, then stop the worker."""
+        if self._worker is None:
+            return
+        self._stopping.set()
+        self._queue.put(None)  # wake an idle worker
+        await asyncio.get_running_loop().run_in_executor(None, self._worker.join)
+        self._worker = None
+
+    async def __aenter__(self) -> "InferenceServer":
+        return self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    # ------------------------------------------------------------------
+    # Client API
+    # ------------------------------------------------------------------
+
+    async def submit(
+        self,
+        inputs: torch.Tensor,
+        task: Optional[str] = None,
+        operands: Optional[Sequence[Any]] = None,
+    ) -> Tuple[torch.Tensor, Dict[str, Any]]:
+        """
+        Queue one query and wait for its result.
+
+        Args:
+            inputs: (input_len,) tensor of scalars for one sample.
+            task, operands: Result-cache key, e.g. ``("addition", (a, b))``.
+                Without them the cache is keyed on the input values.
+
+        Returns:
+            output: (1,) decoded output.
+            info: 'actions' (list of flat indices), 'latency' (seconds),
+                'cached' (served from the result cache).
+        """
+        if self._worker is None:
+            raise RuntimeError("server is not running; call start() first")
+        inputs = inputs.detach().reshape(-1)
+        cache = self.result_cache if self.greedy else None
+        key = None
+        if cache is not None:
+            key = cache.key(task or "inputs", inputs.tolist() if operands is None else operands)
+            hit = cache.get(key)
+            if hit is not None:
+                return hit[0].clone(), {**hit[1], 'latency': 0.0, 'cached': True}
+
+        loop = asyncio.get_running_loop()
+        request = _Request(inputs, loop.create_future(), loop)
+        self._queue.put(request)
+        output, info = await request.future
+        if cache is not None:
+            cache.put(key, (output.clone(), info))
+        return output, {**info, 'cached': False}
+
+    # ------------------------------------------------------------------
+    # Worker thread
+    # ------------------------------------------------------------------
+
+    def _collect(self, limit: int, block: bool) -> List[_Request]:
+        """Up to *limit* queued requests; when *block*, wait for the first
+        one and then up to ``max_wait`` for the rest."""
+        requests: List[_Request] = []
+        deadline = None
+        while len(requests) < limit:
+            try:
+                if block and not requests:
+                    item = self._queue.get(timeout=0.1)
+                    deadline = time.perf_counter() + self.max_wait
+                elif block:
+                    item = self._queue.get(timeout=max(deadline - time.perf_counter(), 0.0))
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                if block and not requests and not self._stopping.is_set():
+                    continue
+                break
+            if item is not None:
+                requests.append(item)
+        return requests
+
+    def _encode(self, requests: List[_Request]) -> MemoryState:
+        """Encode new rows, batching requests with equal input length."""
+        states = []
+        for _, group in itertools.groupby(requests, key=lambda r: r.inputs.numel()):
+            states.append(self.model.encode_input(torch.stack([r.inputs for r in group])))
+        return states[0] if len(states) == 1 else MemoryState.cat(states)
+
+    @torch.no_grad()
+    def _run(self) -> None:
+        model = self.model
+        rows: List[_Request] = []
+        state: Optional[MemoryState] = None
+        history = lengths = None
+
+        while True:
+            # Admit new rows: block only when the batch is empty
+            free = self.max_batch_size - len(rows)
+            if free > 0:
+                new = sorted(self._collect(free, block=not rows), key=lambda r: r.inputs.numel())
+                if new:
+                    try:
+                        new_state = self._encode(new)
+                    except Exception as error:  # bad input: fail these requests only
+                        for r in new:
+                            r.loop.call_soon_threadsafe(_resolve, r.future, None, error)
+                        new = []
+                if new:
+                    device = new_state.registers.device
+                    new_history = torch.zeros(len(new), self.max_steps, dtype=torch.long, device=device)
+                    new_lengths = torch.zeros(len(new), dtype=torch.long, device=device)
+                    if rows:
+                        state = MemoryState.cat([state, new_state])
+                        history = torch.cat([history, new_history])
+                        lengths = torch.cat([lengths, new_lengths])
+                    else:
+                        state, history, lengths = new_state, new_history, new_lengths
+                    rows.extend(new)
+                    self.stats["requests"] += len(new)
+            if not rows:
+                if self._stopping.is_set() and self._queue.empty():
+                    return
+                continue
+
+            try:
+                state, history, lengths, *_ = model.step_batch(
+                    state, history, lengths, self.execution_mode,
+                    temperature=self.temperature, greedy=self.greedy,
+                )
+            except Exception as error:
+                for r in rows:
+                    r.loop.call_soon_threadsafe(_resolve, r.future, None, error)
+                rows, state = [], None
+                continue
+            self.stats["steps"] += 1
+            self.stats["batched_rows"] += len(rows)
+
+            # Retire finished rows
+            done = state.halt_flag | (lengths >= self.max_steps)
+            if bool(done.any()):
+                finished = done.nonzero().flatten()
+                outputs = model.decode_output(state.index_select(finished))
+                now = time.perf_counter()
+                for out, i in zip(outputs, finished.tolist()):
+                    r = rows[i]
+                    info = {
+                        'actions': history[i, :lengths[i]].tolist(),
+                        'latency': now - r.submitted,
+                    }
+                    r.loop.call_soon_threadsafe(_resolve, r.future, (out, info))
+                keep = (~done).nonzero().flatten()
+                rows = [rows[i] for i in keep.tolist()]
+                state = state.index_select(keep)
+                history, lengths = history.index_select(0, keep), lengths.index_select(0, keep)
@@ -1,6 +1,8 @@
 from .supervised_trainer import SupervisedTrainer
 from .curriculum import CurriculumTrainer, CurriculumPhase
 from .rl_trainer import RLTrainer
+from .checkpoint import CheckpointManager
+from .telemetry import JSONLSink, TelemetrySink, TensorBoardSink, ThroughputMeter
 from .losses import ActionCrossEntropyLoss, SupervisedOutputLoss, RLPolicyLoss
 
 __all__ = [
@@ -8,6 +10,11 @@ __all__ = [
     "CurriculumTrainer",
     "CurriculumPhase",
     "RLTrainer",
+    "CheckpointManager",
+    "TelemetrySink",
+    "JSONLSink",
+    "TensorBoardSink",
+    "ThroughputMeter",
     "ActionCrossEntropyLoss",
     "SupervisedOutputLoss",
     "RLPolicyLoss",
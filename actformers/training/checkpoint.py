@@ -0,0 +1,244 @@
+"""
+Checkpointing — atomic, asynchronous save/resume of training runs.
+
+A checkpoint is one ``torch.save`` file holding the ``state_dict()`` of
+every registered component (trainers, curriculum, macro library,
+discovery, ...) plus the Python, NumPy and torch RNG states, so a resumed
+run continues bit-exactly where the saved one stopped.
+
+Writes are atomic: the file is written under a temporary name in the
+same directory, fsynced, then moved into place with ``os.replace``; a
+crash mid-write never leaves a truncated ``ckpt_*.pt`` behind.  With
+``async_save`` the tensors are copied on the caller's thread (cheap) and
+serialization happens on a background thread, so training does not wait
+for the disk.
+
+Usage::
+
+    manager = CheckpointManager("runs/exp1", every=1000, keep_last=3)
+    components = {'trainer': trainer, 'curriculum': curriculum,
+                  'macro_library': library, 'discovery': discovery}
+    start = manager.restore(components) or 0       # resume if possible
+    for step in range(start, total):
+        ...
+        manager.maybe_save(step + 1, components)
+    manager.wait()
+
+``SupervisedTrainer.train_epoch(loader, checkpoint_manager=manager)``
+also records its position in the epoch; pass
+``resume=manager.restored_extra`` after a restore to continue from the
+next unseen batch.
+"""
+
+from __future__ import annotations
+
+import glob
+import os
+import random
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import torch
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional for checkpointing
+    np = None
+
+__all__ = ["CheckpointManager", "get_rng_state", "set_rng_state"]
+
+_CKPT_RE = re.compile(r"ckpt_(\d+)\.pt$")
+
+
+def get_rng_state() -> Dict[str, Any]:
+    """Snapshot of every RNG that training draws from."""
+    state = {
+        'python': random.getstate(),
+        'torch': torch.get_rng_state(),
+    }
+    if np is not None:
+        state['numpy'] = np.random.get_state()
+    if torch.cuda.is_available():
+        state['cuda'] = torch.cuda.get_rng_state_all()
+    return state
+
+
+def set_rng_state(state: Dict[str, Any]) -> None:
+    random.setstate(state['python'])
+    torch.set_rng_state(state['torch'])
+    if np is not None and 'numpy' in state:
+        np.random.set_state(state['numpy'])
+    if 'cuda' in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state['cuda'])
+
+
+def _snapshot(obj: Any) -> Any:
+    """Deep copy of the tensors in *obj*, moved to CPU, so training can keep
+    mutating parameters and optimizer state while the copy is written."""
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to("cpu", copy=True)
+    if isinstance(obj, dict):
+        out = type(obj)((k, _snapshot(v)) for k, v in obj.items())
+        # state_dict() versions each module in ``_metadata``
+        metadata = getattr(obj, '_metadata', None)
+        if metadata is not None:
+            out._metadata = metadata
+        return out
+    if isinstance(obj, list):
+        return [_snapshot(v) for v in obj]
+    if isinstance(obj, tuple):
+        return tuple(_snapshot(v) for v in obj)
+    return obj
+
+
+class CheckpointManager:
+    """
+    Periodic, atomic checkpoints in *directory* named ``ckpt_<step>.pt``.
+
+    Args:
+        directory: Checkpoint directory (created if missing).
+        every: Step interval for :meth:`maybe_save`; None disables it.
+        keep_last: Number of most recent checkpoints kept; None keeps all.
+        async_save: Write on a background thread.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        every: Optional[int] = None,
+        keep_last: Optional[int] = 3,
+        async_save: bool = True,
+    ):
+        self.directory = directory
+        self.every = every
+        self.keep_last = keep_last
+        self.async_save = async_save
+        os.makedirs(directory, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=1) if async_save else None
+        self._pending: Optional[Future] = None
+        self._lock = threading.Lock()
+        # ``extra`` of the checkpoint last loaded by restore()
+        self.restored_extra: Dict[str, Any] = {}
+
+    # ------------------------------------------------------------------
+    # Saving
+    # ------------------------------------------------------------------
+
+    def path_for(self, step: int) -> str:
+        return os.path.join(self.directory, f"ckpt_{step:09d}.pt")
+
+    def maybe_save(
+        self,
+        step: int,
+        components: Dict[str, Any],
+        extra: Optional[Dict] = None,
+    ) -> Optional[str]:
+        """Save when *step* is a positive multiple of ``every``."""
+        if self.every and step > 0 and step % self.every == 0:
+            return self.save(step, components, extra)
+        return None
+
+    def save(self, step: int, components: Dict[str, Any], extra: Optional[Dict] = None) -> str:
+        """
+        Checkpoint ``{name: obj.state_dict()}`` for *components* (plus RNG
+        states and *extra*) as step *step*; returns the final path.
+
+        The state is captured before returning.  An error from a previous
+        asynchronous write is re-raised here.
+        """
+        payload = _snapshot({
+            'step': step,
+            'components': {name: obj.state_dict() for name, obj in components.items()},
+            'rng': get_rng_state(),
+            'extra': extra or {},
+        })
+        path = self.path_for(step)
+        if self._executor is None:
+            self._write(payload, path)
+        else:
+            self.wait()  # at most one write in flight; surfaces its error
+            self._pending = self._executor.submit(self._write, payload, path)
+        return path
+
+    def _write(self, payload: Dict[str, Any], path: str) -> None:
+        tmp = f"{path}.tmp.{os.getpid()}"
+        try:
+            with open(tmp, "wb") as f:
+                torch.save(payload, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        with self._lock:
+            self._prune()
+
+    def _prune(self) -> None:
+        if self.keep_last is None:
+            return
+        for old in self.checkpoints()[:-self.keep_last]:
+            os.remove(old)
+
+    def wait(self) -> None:
+        """Block until the in-flight write (if any) is on disk."""
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            pending.result()
+
+    def close(self) -> None:
+        self.wait()
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def checkpoints(self) -> List[str]:
+        """Complete checkpoints in this directory, oldest first."""
+        paths = [p for p in glob.glob(os.path.join(self.directory, "ckpt_*.pt")) if _CKPT_RE.search(p)]
+        return sorted(paths, key=lambda p: int(_CKPT_RE.search(p).group(1)))
+
+    def latest(self) -> Optional[str]:
+        paths = self.checkpoints()
+        return paths[-1] if paths else None
+
+    def load(self, path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Raw checkpoint dict from *path* (default: latest), or None."""
+        self.wait()
+        path = path or self.latest()
+        if path is None:
+            return None
+        # Own files: RNG states need full unpickling
+        return torch.load(path, map_location="cpu", weights_only=False)
+
+    def restore(
+        self,
+        components: Dict[str, Any],
+        path: Optional[str] = None,
+        restore_rng: bool = True,
+    ) -> Optional[int]:
+        """
+        Load *path* (default: latest) into *components* via
+        ``load_state_dict`` and restore RNG states.  The checkpoint's
+        ``extra`` is kept in :attr:`restored_extra`.
+
+        Returns:
+            The checkpoint's step, or None when there is nothing to resume.
+        """
+        checkpoint = self.load(path)
+        if checkpoint is None:
+            return None
+        saved = checkpoint['components']
+        missing = set(components) - set(saved)
+        if missing:
+            raise KeyError(f"Checkpoint has no state for {sorted(missing)}")
+        for name, obj in components.items():
+            obj.load_state_dict(saved[name])
+        if restore_rng:
+            set_rng_state(checkpoint['rng'])
+        self.restored_extra = checkpoint.get('extra', {})
+        return checkpoint['step']
@@ -132,6 +132,18 @@ class CurriculumTrainer:
                 return self.current_phase
         return None
 
+    def state_dict(self) -> Dict:
+        return {
+            'current_phase': self.current_phase.name,
+            'total_steps': self.total_steps,
+            'phase_history': [dict(h) for h in self.phase_history],
+        }
+
+    def load_state_dict(self, state: Dict) -> None:
+        self.current_phase = CurriculumPhase[state['current_phase']]
+        self.total_steps = state['total_steps']
+        self.phase_history = [dict(h) for h in state['phase_history']]
+
     def get_phase_summary(self) -> Dict:
         return {
             'current_phase': self.current_phase.name,
@@ -69,6 +69,20 @@ class RLTrainer:
 
         self.rl_loss_fn = RLPolicyLoss(entropy_coeff=0.01)
 
+    def state_dict(self) -> Dict:
+        return {
+            'model': self.model.state_dict(),
+            'value_net': self.value_net.state_dict(),
+            'policy_optimizer': self.policy_optimizer.state_dict(),
+            'value_optimizer': self.value_optimizer.state_dict(),
+        }
+
+    def load_state_dict(self, state: Dict) -> None:
+        self.model.load_state_dict(state['model'])
+        self.value_net.load_state_dict(state['value_net'])
+        self.policy_optimizer.load_state_dict(state['policy_optimizer'])
+        self.value_optimizer.load_state_dict(state['value_optimizer'])
+
     def collect_rollout(
         self,
         inputs: torch.Tensor,
@@ -139,15 +153,7 @@ class RLTrainer:
             # Detach state to create independent graph for value_net
             state = rollout.get('initial_state', None)
             if state is not None:
-                from actformers.core.working_memory import MemoryState
-                detached_state = MemoryState(
-                    registers=state.registers.detach(),
-                    scratchpad=state.scratchpad.detach(),
-                    pointers=state.pointers.detach(),
-                    step=state.step,
-                    halt_flag=state.halt_flag.detach() if state.halt_flag is not None else None,
-                )
-                value = self.value_net(detached_state).reshape(-1)  # ensure 1D
+                value = self.value_net(state.detach()).reshape(-1)  # ensure 1D
             else:
                 value = torch.zeros(reward.shape[0])
             # Ensure value and reward shapes match
@@ -4,22 +4,37 @@ Supervised Trainer — standard teacher-forcing training on ground-truth action
 
 from __future__ import annotations
 
-from typing import Dict, Optional
+import time
+from typing import Dict, List, Optional, Sequence, Union
 
 import torch
 import torch.nn as nn
 from torch.utils.data import DataLoader
 
+from actformers.composition.tokenizer import MacroTokenizer
 from actformers.core.model import Actformer
+from actformers.data.prefetch import PrefetchDataLoader
+from actformers.training.checkpoint import CheckpointManager
 from actformers.training.losses import ActionCrossEntropyLoss, SupervisedOutputLoss
+from actformers.training.telemetry import TelemetrySink, ThroughputMeter
 
 __all__ = ["SupervisedTrainer"]
 
 
+def _shuffle_generator(dataloader) -> torch.Generator:
+    """The generator *dataloader* draws its shuffle order from: its own
+    ``generator`` if it has one, else the global torch RNG."""
+    return getattr(dataloader, 'generator', None) or torch.default_generator
+
+
 class SupervisedTrainer:
     """
     Trains Actformer with teacher forcing on ground-truth action traces.
 
+    If a ``macro_tokenizer`` is given, ground-truth traces are compressed
+    with the macro library before teacher forcing, so each macro call is a
+    single predicted and executed step.
+
     At each step:
       1. Encode input → initial state.
       2. For each action in the ground-trace:
@@ -28,6 +43,22 @@ class SupervisedTrainer:
          c. Execute ground-truth action (teacher forcing).
       3. Decode output from final state.
       4. Compute MSE loss on output vs target.
+
+    ``checkpoint_every`` enables activation checkpointing in the action
+    loop (see ``Actformer.forward``), trading recomputation for memory on
+    long traces.
+
+    ``tbptt_window`` switches to truncated backprop: the trace runs in
+    windows of that many steps, each window's loss is backpropagated on
+    its own and the MemoryState is detached between windows, so memory
+    and backward cost per step stay bounded however long the trace is.
+    Gradients accumulate into one optimizer step per trace unless
+    ``step_per_window`` is set.  ``checkpoint_every`` is not used in this
+    mode.
+
+    ``telemetry`` sinks receive a throughput/step-time record (see
+    ``actformers.training.telemetry``) every ``log_every`` steps of
+    ``train_epoch``.
     """
 
     def __init__(
@@ -40,6 +71,11 @@ class SupervisedTrainer:
         output_loss_weight: float = 0.1,
         max_grad_norm: float = 1.0,
         execution_mode: str = "train",
+        macro_tokenizer: Optional[MacroTokenizer] = None,
+        checkpoint_every: Optional[int] = None,
+        tbptt_window: Optional[int] = None,
+        step_per_window: bool = False,
+        telemetry: Optional[Union[TelemetrySink, Sequence[TelemetrySink]]] = None,
     ):
         self.model = model
         self.action_loss = action_loss
@@ -47,6 +83,13 @@ class SupervisedTrainer:
         self.output_loss_weight = output_loss_weight
         self.max_grad_norm = max_grad_norm
         self.execution_mode = execution_mode
+        self.macro_tokenizer = macro_tokenizer
+        self.checkpoint_every = checkpoint_every
+        self.tbptt_window = tbptt_window
+        self.step_per_window = step_per_window
+        if isinstance(telemetry, TelemetrySink):
+            telemetry = [telemetry]
+        self.telemetry: List[TelemetrySink] = list(telemetry or [])
 
         self.optimizer = torch.optim.AdamW(
             model.parameters(), lr=lr, weight_decay=weight_decay
@@ -62,8 +105,10 @@ class SupervisedTrainer:
             batch: Dict with 'input', 'output', 'trace', 'flat_trace', 'trace_length'.
 
         Returns:
-            Dict of loss values for logging.
+            Dict of loss values for logging, plus 'forward_time',
+            'backward_time' and 'optimizer_time' in seconds.
         """
+        start = time.perf_counter()
         self.model.train()
         self.optimizer.zero_grad()
 
@@ -71,12 +116,18 @@ class SupervisedTrainer:
         targets = batch['output'].unsqueeze(0)  # (1, 1)
         flat_trace = batch['flat_trace'].unsqueeze(0)  # (1, max_trace_len)
         trace_length = batch['trace_length']
+        target_trace = flat_trace[0, :trace_length].tolist()
+        if self.macro_tokenizer is not None:
+            target_trace = self.macro_tokenizer.encode(target_trace)
+        if self.tbptt_window:
+            return self._train_step_tbptt(inputs, targets, target_trace, start)
 
         # Forward pass with teacher forcing
         output, info = self.model(
             inputs,
-            target_trace=flat_trace[0, :trace_length].tolist(),
+            target_trace=target_trace,
             execution_mode=self.execution_mode,
+            checkpoint_every=self.checkpoint_every,
         )
 
         # Action prediction loss
@@ -97,8 +148,11 @@ class SupervisedTrainer:
         # Combined loss
         loss = total_action_loss + self.output_loss_weight * out_loss
 
+        forward_done = time.perf_counter()
+
         # Gradient clipping
         loss.backward()
+        backward_done = time.perf_counter()
         grad_norm = torch.nn.utils.clip_grad_norm_(
             self.model.parameters(), self.max_grad_norm
         )
@@ -112,23 +166,182 @@ class SupervisedTrainer:
             'output_loss': out_loss.item(),
             'grad_norm': grad_norm.item(),
             'actions_taken': info.get('actions_taken', 0),
+            'forward_time': forward_done - start,
+            'backward_time': backward_done - forward_done,
+            'optimizer_time': time.perf_counter() - backward_done,
+        }
+
+    def state_dict(self) -> Dict:
+        return {
+            'model': self.model.state_dict(),
+            'optimizer': self.optimizer.state_dict(),
+            'step_count': self.step_count,
+        }
+
+    def load_state_dict(self, state: Dict) -> None:
+        self.model.load_state_dict(state['model'])
+        self.optimizer.load_state_dict(state['optimizer'])
+        self.step_count = state['step_count']
+
+    def _train_step_tbptt(
+        self,
+        inputs: torch.Tensor,
+        targets: torch.Tensor,
+        target_trace: List[int],
+        start: float,
+    ) -> Dict[str, float]:
+        """Truncated-backprop train step over ``tbptt_window``-step windows."""
+        model = self.model
+        loop_length = min(len(target_trace), model.max_steps)
+        # Without per-window steps, scale so the accumulated gradient is that
+        # of the full-trace mean loss (up to the truncation itself)
+        denominator = max(loop_length, 1)
+
+        state = model.encode_input(inputs)
+        history: List[int] = []
+        total_action_loss = 0.0
+        n_action_steps = 0
+        grad_norms = []
+        windows = 0
+        out_loss = None
+        backward_time = optimizer_time = 0.0
+
+        while True:
+            steps = min(self.tbptt_window, loop_length - len(history))
+            state, _, step_losses, halted = model.run_steps(
+                state, history, steps, target_trace, self.execution_mode,
+            )
+            last = halted or len(history) >= loop_length
+            window_loss = torch.zeros((), device=inputs.device)
+            if step_losses:
+                window_sum = torch.stack(step_losses).sum()
+                total_action_loss += window_sum.item()
+                n_action_steps += len(step_losses)
+                window_loss = window_sum / (len(step_losses) if self.step_per_window else denominator)
+            if last:
+                out_loss = self.output_loss(model.decode_output(state), targets)
+                window_loss = window_loss + self.output_loss_weight * out_loss
+            tick = time.perf_counter()
+            if window_loss.requires_grad:
+                window_loss.backward()
+            windows += 1
+            tock = time.perf_counter()
+            backward_time += tock - tick
+
+            if self.step_per_window or last:
+                grad_norms.append(torch.nn.utils.clip_grad_norm_(
+                    model.parameters(), self.max_grad_norm
+                ).item())
+                self.optimizer.step()
+                self.optimizer.zero_grad()
+                self.step_count += 1
+                optimizer_time += time.perf_counter() - tock
+            if last:
+                break
+            state = state.detach()
+
+        action_loss = total_action_loss / n_action_steps if n_action_steps else 0.0
+        return {
+            'total_loss': action_loss + self.output_loss_weight * out_loss.item(),
+            'action_loss': action_loss,
+            'output_loss': out_loss.item(),
+            'grad_norm': max(grad_norms),
+            'actions_taken': len(history),
+            'tbptt_windows': windows,
+            'forward_time': time.perf_counter() - start - backward_time - optimizer_time,
+            'backward_time': backward_time,
+            'optimizer_time': optimizer_time,
         }
 
     def train_epoch(
         self,
-        dataloader: DataLoader,
+        dataloader: Union[DataLoader, PrefetchDataLoader],
         log_every: int = 100,
+        checkpoint_manager: Optional[CheckpointManager] = None,
+        resume: Optional[Dict] = None,
     ) -> Dict[str, float]:
-        """Train for one epoch."""
+        """
+        Train for one epoch.
+
+        With a ``checkpoint_manager``, its ``maybe_save`` is called after
+        every step with this trainer as the ``'trainer'`` component; the
+        checkpoint's ``extra`` records the index of the next batch and the
+        state of the generator the loader shuffles with.  Passing that
+        ``extra`` back as *resume* (``manager.restored_extra`` after
+        ``manager.restore``) replays the same shuffle order and continues
+        the epoch from that batch; the returned metrics then cover only
+        the resumed part.  Skipped batches are still loaded.  A plain
+        ``DataLoader`` with persistent workers cannot resume: torch draws
+        its shuffle order differently once the workers exist, while a
+        ``PrefetchDataLoader`` draws it itself.
+
+        ``train_step`` consumes single samples, so a ``PrefetchDataLoader``
+        must be built with ``batch_size=None``.
+
+        Besides the mean losses, the returned metrics split the epoch's
+        wall time into 'data_time' (seconds blocked on the loader) and
+        'compute_time' (seconds in training steps); a large
+        'data_wait_fraction' means training is input-bound and a
+        ``PrefetchDataLoader`` with more workers will help.  The epoch's
+        'samples_per_sec' and 'actions_per_sec' are included too, and
+        every ``log_every`` steps a full ``ThroughputMeter`` record goes
+        to the ``telemetry`` sinks.
+        """
+        if isinstance(dataloader, PrefetchDataLoader) and dataloader.loader.batch_size is not None:
+            raise ValueError(
+                "train_epoch trains on single samples; build the PrefetchDataLoader "
+                f"with batch_size=None (got batch_size={dataloader.loader.batch_size})"
+            )
         epoch_metrics = {
             'total_loss': 0.0,
             'action_loss': 0.0,
             'output_loss': 0.0,
             'num_batches': 0,
         }
+        epoch_meter, window_meter = ThroughputMeter(), ThroughputMeter()
+
+        if resume and isinstance(dataloader, DataLoader) and dataloader.persistent_workers:
+            raise ValueError(
+                "cannot resume on a DataLoader with persistent workers; "
+                "use a PrefetchDataLoader"
+            )
+        generator = _shuffle_generator(dataloader)
+        batch_idx = resume.get('batch_idx', 0) if resume else 0
+        if batch_idx:
+            sampler_state = resume['sampler_state']
+            rng_state = torch.get_rng_state()
+            generator.set_state(sampler_state)
+            batches = iter(dataloader)
+            for _ in range(batch_idx):  # draws the shuffle order, as the saved run did
+                next(batches, None)
+            torch.set_rng_state(rng_state)
+        else:
+            sampler_state = generator.get_state()
+            batches = iter(dataloader)
+        while True:
+            start = time.perf_counter()
+            batch = next(batches, None)
+            if batch is None:
+                break
+            loaded = time.perf_counter()
 
-        for batch_idx, batch in enumerate(dataloader):
             metrics = self.train_step(batch)
+            if checkpoint_manager is not None:
+                checkpoint_manager.maybe_save(
+                    self.step_count, {'trainer': self},
+                    extra={'batch_idx': batch_idx + 1, 'sampler_state': sampler_state},
+                )
+            step_stats = dict(
+                actions=metrics.get('actions_taken', 0),
+                trace_length=int(batch['trace_length']),
+                data=loaded - start,
+                forward=metrics['forward_time'],
+                backward=metrics['backward_time'],
+                optimizer=metrics['optimizer_time'],
+            )
+            wall = time.perf_counter() - start
+            epoch_meter.update(wall, **step_stats)
+            window_meter.update(wall, **step_stats)
 
             for k in epoch_metrics:
                 if k in metrics:
@@ -145,9 +358,29 @@ class SupervisedTrainer:
                     f"action_loss={avg.get('action_loss', 0):.4f} | "
                     f"output_loss={avg.get('output_loss', 0):.4f}"
                 )
+            batch_idx += 1
+            if batch_idx % log_every == 0:
+                self._emit_telemetry(window_meter)
+        self._emit_telemetry(window_meter)
 
         for k in epoch_metrics:
             if k != 'num_batches':
                 epoch_metrics[k] /= max(epoch_metrics['num_batches'], 1)
 
-        return epoch_metrics
\ No newline at end of file
+        throughput = epoch_meter.summary()
+        epoch_metrics['data_time'] = throughput['data_time']
+        epoch_metrics['compute_time'] = epoch_meter.wall_time - throughput['data_time']
+        epoch_metrics['data_wait_fraction'] = throughput['data_fraction']
+        epoch_metrics['samples_per_sec'] = throughput['samples_per_sec']
+        epoch_metrics['actions_per_sec'] = throughput['actions_per_sec']
+        return epoch_metrics
+
+    def _emit_telemetry(self, meter: ThroughputMeter) -> None:
+        """Send *meter*'s record to the sinks (if it saw any steps) and reset it."""
+        if meter.steps and self.telemetry:
+            record = meter.summary()
+            for sink in self.telemetry:
+                sink.write(self.step_count, record)
+                sink.flush()
+        meter.reset()
+
@@ -0,0 +1,163 @@
+"""
+Training telemetry — throughput and step-time records with pluggable sinks.
+
+:class:`ThroughputMeter` accumulates per-step counters (samples, executed
+actions, trace lengths, and seconds spent in data loading, forward,
+backward and optimizer) and summarizes them as one flat record:
+
+    samples_per_sec, actions_per_sec, avg_trace_length, peak_rss_mb,
+    data_time / forward_time / backward_time / optimizer_time /
+    other_time (seconds) and the matching *_fraction of wall time.
+
+Records go to any number of :class:`TelemetrySink` objects:
+
+  - :class:`JSONLSink`: one JSON object per line, easy to diff across runs.
+  - :class:`TensorBoardSink`: scalars under ``telemetry/<name>``
+    (tensorboard is imported on first use).
+
+Usage::
+
+    trainer = SupervisedTrainer(model, loss, telemetry=[
+        JSONLSink("runs/exp1/telemetry.jsonl"),
+        TensorBoardSink("runs/exp1/tb"),
+    ])
+    trainer.train_epoch(loader, log_every=100)  # one record per 100 steps
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+__all__ = [
+    "TelemetrySink",
+    "JSONLSink",
+    "TensorBoardSink",
+    "ThroughputMeter",
+    "peak_rss_mb",
+]
+
+PHASES = ("data", "forward", "backward", "optimizer")
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MiB (None if unavailable)."""
+    try:
+        import resource
+    except ImportError:  # not on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class TelemetrySink(ABC):
+    """Base class: receives one flat ``{name: number}`` record per call."""
+
+    @abstractmethod
+    def write(self, step: int, record: Dict[str, float]) -> None:
+        ...
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+
+class JSONLSink(TelemetrySink):
+    """Appends ``{"step": ..., "time": ..., **record}`` lines to *path*."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, step: int, record: Dict[str, float]) -> None:
+        self._file.write(json.dumps({'step': step, 'time': time.time(), **record}) + "\n")
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+class TensorBoardSink(TelemetrySink):
+    """Writes each record as scalars ``<prefix>/<name>`` via SummaryWriter."""
+
+    def __init__(self, log_dir: str, prefix: str = "telemetry"):
+        try:
+            from torch.utils.tensorboard import SummaryWriter
+        except ImportError as e:
+            raise ImportError("TensorBoardSink requires the 'tensorboard' package") from e
+        self.writer = SummaryWriter(log_dir=log_dir)
+        self.prefix = prefix
+
+    def write(self, step: int, record: Dict[str, float]) -> None:
+        for name, value in record.items():
+            if value is not None:
+                self.writer.add_scalar(f"{self.prefix}/{name}", value, step)
+
+    def flush(self) -> None:
+        self.writer.flush()
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class ThroughputMeter:
+    """Accumulates training-step counters and timings since the last reset."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.steps = 0
+        self.samples = 0
+        self.actions = 0
+        self.trace_length = 0
+        self.wall_time = 0.0
+        self.phase_time = {phase: 0.0 for phase in PHASES}
+
+    def update(
+        self,
+        wall_time: float,
+        samples: int = 1,
+        actions: int = 0,
+        trace_length: int = 0,
+        **phase_times: float,
+    ) -> None:
+        """
+        Record one step that took *wall_time* seconds in total, including
+        ``data=`` / ``forward=`` / ``backward=`` / ``optimizer=`` seconds.
+        """
+        self.steps += 1
+        self.samples += samples
+        self.actions += actions
+        self.trace_length += trace_length
+        self.wall_time += wall_time
+        for phase, seconds in phase_times.items():
+            self.phase_time[phase] += seconds
+
+    def summary(self) -> Dict[str, Any]:
+        wall = self.wall_time
+        record: Dict[str, Any] = {
+            'steps': self.steps,
+            'samples_per_sec': self.samples / wall if wall > 0 else 0.0,
+            'actions_per_sec': self.actions / wall if wall > 0 else 0.0,
+            'avg_trace_length': self.trace_length / self.samples if self.samples else 0.0,
+            'peak_rss_mb': peak_rss_mb(),
+        }
+        other = wall - sum(self.phase_time.values())
+        for phase, seconds in (*self.phase_time.items(), ('other', max(other, 0.0))):
+            record[f'{phase}_time'] = seconds
+            record[f'{phase}_fraction'] = seconds / wall if wall > 0 else 0.0
+        return record
@@ -0,0 +1,95 @@
+"""
+Compare a pytest-benchmark run against the committed baseline.
+
+Usage:
+    python -m pytest benchmarks --benchmark-json=bench.json
+    python benchmarks/compare.py bench.json                 # fail on regressions
+    python benchmarks/compare.py bench.json --update        # refresh baseline.json
+
+The baseline stores the fastest round (minimum, seconds) of every
+benchmark, keyed by its full name.  The minimum is the statistic least
+affected by other load on the machine; medians of untouched benchmarks
+moved by 40-80% between back-to-back runs on a shared box.  A benchmark
+regresses when its minimum exceeds the baseline by more than
+``--threshold`` (relative, default 1.0, i.e. twice as slow); lower it
+only on a quiet, dedicated machine.  Benchmarks missing from either side
+are reported but never fail the run.
+
+Timings only compare on the same hardware: regenerate the baseline on
+the machine that runs the comparison, while it is otherwise idle, with
+the two commands above (run the suite, then ``--update``), and commit
+the new ``baseline.json`` together with the change that moved it.
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def load_minimums(path: str) -> Dict[str, float]:
+    """Extract {fullname: fastest round in seconds} from a pytest-benchmark JSON file."""
+    with open(path) as f:
+        data = json.load(f)
+    return {b["fullname"]: b["stats"]["min"] for b in data["benchmarks"]}
+
+
+def compare(
+    current: Dict[str, float],
+    baseline: Dict[str, float],
+    threshold: float,
+) -> int:
+    """Print a comparison table and return the number of regressions."""
+    regressions = 0
+    width = max((len(n) for n in current), default=20)
+    print(f"{'benchmark':<{width}}  {'baseline':>11}  {'current':>11}  {'change':>8}")
+    for name in sorted(current):
+        now = current[name]
+        ref = baseline.get(name)
+        if ref is None:
+            print(f"{name:<{width}}  {'-':>11}  {now * 1e6:>9.1f}us  {'new':>8}")
+            continue
+        change = now / ref - 1.0
+        flag = ""
+        if change > threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{name:<{width}}  {ref * 1e6:>9.1f}us  {now * 1e6:>9.1f}us  {change:>+7.1%}{flag}")
+    for name in sorted(set(baseline) - set(current)):
+        print(f"{name:<{width}}  (not run)")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("results", help="JSON written by --benchmark-json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=1.0,
+                        help="Allowed relative slowdown of the minimum (default: 1.0)")
+    parser.add_argument("--update", action="store_true",
+                        help="Overwrite the baseline with these results")
+    args = parser.parse_args()
+
+    current = load_minimums(args.results)
+    if args.update:
+        with open(args.baseline, "w") as f:
+            json.dump(dict(sorted(current.items())), f, indent=2)
+            f.write("\n")
+        print(f"Wrote {len(current)} baselines to {args.baseline}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(current, baseline, args.threshold)
+    if regressions:
+        print(f"\n{regressions} benchmark(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
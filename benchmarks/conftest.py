@@ -0,0 +1,41 @@
+"""Shared fixtures for the performance benchmark suite."""
+
+import random
+
+import pytest
+import torch
+
+from actformers.core.action_space import ActionSpace
+from actformers.core.execution_engine import ActionExecutionEngine
+from actformers.core.model import Actformer
+from actformers.core.working_memory import WorkingMemory
+
+
+@pytest.fixture(autouse=True)
+def _deterministic():
+    random.seed(0)
+    torch.manual_seed(0)
+    torch.set_num_threads(1)
+
+
+@pytest.fixture
+def engine():
+    wm = WorkingMemory(num_registers=16, register_dim=64, scratchpad_size=256, scratchpad_dim=64)
+    aspace = ActionSpace(num_registers=16)
+    return ActionExecutionEngine(action_space=aspace, working_memory=wm, primitive_dim=64)
+
+
+@pytest.fixture
+def state(engine):
+    state = engine.wm.init_state(batch_size=1, device=torch.device("cpu"))
+    return engine.wm.update_register(state, 0, torch.rand(1, 64))
+
+
+@pytest.fixture
+def model():
+    """Medium config (configs/model/medium.yaml) with max_history for long traces."""
+    model = Actformer(
+        num_registers=16, register_dim=64, scratchpad_size=256, scratchpad_dim=64,
+        hidden_dim=256, num_heads=8, num_layers=4, max_steps=100,
+    )
+    return model.eval()
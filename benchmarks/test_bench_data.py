@@ -0,0 +1,59 @@
+"""Trace generation, dataset access and macro mining."""
+
+import random
+
+import pytest
+
+from actformers.composition.discovery import CompositionDiscovery
+from actformers.composition.macro_library import MacroLibrary
+from actformers.core.action_space import ActionSpace, FactorizedActionEmbedding
+from actformers.data.datasets import (
+    AdditionDataset,
+    DigitReversalDataset,
+    MultiplicationDataset,
+    SubtractionDataset,
+)
+from actformers.data.trace_generator import ActionTraceGenerator
+
+TASKS = {
+    "addition": lambda g: g.generate_addition_trace(48213, 73905),
+    "subtraction": lambda g: g.generate_subtraction_trace(73905, 48213),
+    "multiplication": lambda g: g.generate_multiplication_trace(482, 739),
+    "digit_reversal": lambda g: g.generate_digit_reversal_trace(4821390),
+}
+
+
+@pytest.mark.benchmark(group="trace_generation")
+@pytest.mark.parametrize("task", list(TASKS))
+def test_trace_generation(benchmark, task):
+    gen = ActionTraceGenerator()
+    benchmark(TASKS[task], gen)
+
+
+DATASETS = {
+    "addition": AdditionDataset,
+    "subtraction": SubtractionDataset,
+    "multiplication": MultiplicationDataset,
+    "digit_reversal": DigitReversalDataset,
+}
+
+
+@pytest.mark.benchmark(group="dataset.getitem")
+@pytest.mark.parametrize("task", list(DATASETS))
+def test_dataset_getitem(benchmark, task):
+    dataset = DATASETS[task](num_samples=64, action_space=ActionSpace(num_registers=16))
+    benchmark(dataset.__getitem__, 17)
+
+
+@pytest.mark.benchmark(group="discovery")
+def test_mine_candidates(benchmark):
+    aspace = ActionSpace(num_registers=16)
+    embed = FactorizedActionEmbedding(embed_dim=16, arg_vocab=aspace.arg_vocab,
+                                      mod_vocab=aspace.mod_vocab)
+    discovery = CompositionDiscovery(MacroLibrary(aspace, embed), aspace)
+    gen = ActionTraceGenerator()
+    rng = random.Random(0)
+    for _ in range(2000):
+        trace = gen.generate_addition_trace(rng.randint(0, 99999), rng.randint(0, 99999))
+        discovery.add_rollout([aspace.encode_token_flat(t) for t in trace])
+    benchmark.pedantic(discovery.mine_candidates, rounds=3, iterations=1)
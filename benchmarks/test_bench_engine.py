@@ -0,0 +1,20 @@
+"""ActionExecutionEngine.execute — one benchmark per op."""
+
+import pytest
+import torch
+
+from actformers.core.action_space import ActionToken, ActionType
+
+# Representative (arg0, arg1, arg2, modifier) per op
+OP_ARGS = {op: (1, 2, 3, 0) for op in ActionType}
+OP_ARGS[ActionType.ADD] = (1, 2, 3, 1)  # with carry
+OP_ARGS[ActionType.DIGIT_EXTRACT] = (0, 2, 1, 0)
+
+
+@pytest.mark.benchmark(group="engine.execute")
+@pytest.mark.parametrize("op", list(ActionType), ids=lambda op: op.name)
+def test_execute(benchmark, engine, state, op):
+    a0, a1, a2, mod = OP_ARGS[op]
+    action = ActionToken(op_id=int(op), arg0=a0, arg1=a1, arg2=a2, modifier=mod)
+    with torch.no_grad():
+        benchmark(engine.execute, action, state, "infer")
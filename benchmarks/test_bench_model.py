@@ -0,0 +1,49 @@
+"""ActionPredictor.forward and Actformer.forward hot paths."""
+
+import pytest
+import torch
+
+from actformers.data.trace_generator import ActionTraceGenerator
+from actformers.prediction.action_predictor import ActionPredictor
+
+
+@pytest.mark.benchmark(group="predictor.forward")
+@pytest.mark.parametrize("history_len", [1, 32, 128])
+def test_predictor_forward(benchmark, model, history_len):
+    predictor = ActionPredictor(
+        model.action_space, register_dim=64, hidden_dim=256, num_heads=8, num_layers=4,
+        max_history=128,
+    ).eval()
+    state = model.encode_input(torch.tensor([[0.12, 0.34]]))
+    history = [(i * 7919) % model.action_space.flat_vocab_size for i in range(history_len)]
+    with torch.no_grad():
+        benchmark(predictor, state, history)
+
+
+@pytest.mark.benchmark(group="model.forward")
+def test_forward_teacher_forced(benchmark, model):
+    gen = ActionTraceGenerator()
+    trace = gen.generate_addition_trace(4821, 7390)
+    flat = [model.action_space.encode_token_flat(t) for t in trace]
+    inputs = torch.tensor([[0.4821, 0.7390]])
+    with torch.no_grad():
+        benchmark(model, inputs, target_trace=flat, execution_mode="infer")
+
+
+@pytest.mark.benchmark(group="model.forward")
+def test_forward_autoregressive(benchmark, model):
+    inputs = torch.tensor([[0.4821, 0.7390]])
+
+    def run():
+        torch.manual_seed(0)
+        return model(inputs, execution_mode="infer")
+
+    with torch.no_grad():
+        benchmark(run)
+
+
+@pytest.mark.benchmark(group="model.encode_input")
+def test_encode_input(benchmark, model):
+    inputs = torch.rand(32, 8)
+    with torch.no_grad():
+        benchmark(model.encode_input, inputs)
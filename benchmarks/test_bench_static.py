@@ -0,0 +1,29 @@
+"""Actformer.forward_static, eager vs torch.compile'd step."""
+
+import pytest
+import torch
+
+from actformers.core.model import Actformer
+
+
+@pytest.fixture
+def small_model():
+    """Small enough that per-op dispatch, not matmuls, dominates a step."""
+    model = Actformer(
+        num_registers=8, register_dim=32, scratchpad_size=16, scratchpad_dim=32,
+        hidden_dim=32, num_heads=2, num_layers=2, max_steps=16,
+    )
+    return model.eval()
+
+
+@pytest.mark.benchmark(group="model.forward_static")
+@pytest.mark.parametrize("size", ["small", "medium"])
+@pytest.mark.parametrize("compiled", [False, True], ids=["eager", "compiled"])
+def test_forward_static(benchmark, request, size, compiled):
+    model = request.getfixturevalue("small_model" if size == "small" else "model")
+    model.max_steps = 16
+    inputs = torch.rand(8, 2)
+    with torch.no_grad():
+        # Warm-up also pays the one-off compilation cost outside the timing
+        model.forward_static(inputs, greedy=True, early_exit=False, compile=compiled)
+        benchmark(model.forward_static, inputs, greedy=True, early_exit=False, compile=compiled)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Local load test for the dynamic-batching inference server."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--checkpoint", default=None,
+                        help="Model file written by Actformer.save_pretrained")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--max-steps", type=int, default=40)
+    args = parser.parse_args()
+
+    import torch
+    from actformers.core.model import Actformer
+    from actformers.serving import InferenceServer, run_load
+
+    torch.manual_seed(0)
+    if args.checkpoint:
+        model = Actformer.from_pretrained(args.checkpoint)
+    else:
+        model = Actformer(num_registers=16, register_dim=64, hidden_dim=128,
+                          num_heads=4, num_layers=2, max_steps=args.max_steps)
+
+    generator = torch.Generator().manual_seed(0)
+    samples = torch.randint(0, 100, (args.requests, 2), generator=generator).float() / 100
+
+    async def run() -> None:
+        print(f"{'concurrency':>11}  {'req/s':>8}  {'p50 ms':>8}  {'p99 ms':>8}  {'batch':>6}")
+        for concurrency in args.concurrency:
+            server = InferenceServer(model, max_batch_size=args.max_batch_size,
+                                     max_wait=args.max_wait_ms / 1e3)
+            async with server:
+                r = await run_load(server, lambda i: samples[i], args.requests, concurrency)
+            print(f"{concurrency:>11}  {r['throughput']:>8.1f}  {r['p50_ms']:>8.1f}  "
+                  f"{r['p99_ms']:>8.1f}  {r['mean_batch']:>6.1f}")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,7 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from actformers.core.action_space import ActionType
+from actformers.core.actions import ActionType
 from actformers.data.trace_generator import ActionTraceGenerator
 
 
@@ -1,5 +1,8 @@
 """Tests for action space: ActionToken encoding, factorized embedding, ActionSpace."""
 
+import subprocess
+import sys
+
 import pytest
 import torch
 
@@ -8,6 +11,7 @@ from actformers.core.action_space import (
     ActionToken,
     ActionSpace,
     FactorizedActionEmbedding,
+    MacroAction,
     make_add,
     make_load,
     make_halt,
@@ -50,8 +54,42 @@ class TestActionToken:
         with pytest.raises(AttributeError):
             t.op_id = 5
 
+    def test_interned(self):
+        assert make_add(0, 1, 2) is ActionToken(op_id=int(ActionType.ADD), arg0=0, arg1=1, arg2=2)
+        assert ActionToken(op_id=999, arg0=40) is ActionToken(len(ActionType) - 1, 31)
+
+    def test_packed_roundtrip(self):
+        t = ActionToken(op_id=15, arg0=31, arg1=7, arg2=0, modifier=15)
+        assert ActionToken.from_packed(t.packed) is t
+        assert len({make_add(0, 1, 2).packed, make_add(0, 2, 1).packed}) == 2
+
+    def test_pickle_and_copy(self):
+        import copy
+        import pickle
+
+        t = make_add(3, 4, 5, 1)
+        assert pickle.loads(pickle.dumps(t)) is t
+        assert copy.deepcopy([t])[0] is t
+
 
 class TestActionSpace:
+    def test_decode_flat_batch_matches_tokens(self):
+        aspace = ActionSpace(num_registers=16)
+        idx = torch.arange(aspace.flat_vocab_size)
+        table = aspace.decode_flat_batch(idx)
+        assert table.shape == (aspace.flat_vocab_size, 5)
+        for i in torch.randint(0, aspace.flat_vocab_size, (500,)).tolist():
+            assert tuple(table[i].tolist()) == aspace.decode_flat_token(i).components()
+
+    def test_decode_flat_batch_arithmetic_fallback(self):
+        aspace = ActionSpace(num_registers=16)
+        idx = torch.randint(0, aspace.flat_vocab_size, (4, 7))
+        expected = aspace.decode_flat_batch(idx)
+        aspace.decode_table_max_entries = 0
+        aspace._decode_tables.clear()
+        assert aspace.decode_table() is None
+        assert torch.equal(aspace.decode_flat_batch(idx), expected)
+
     def test_flat_vocab_size(self):
         aspace = ActionSpace(num_registers=16)
         assert aspace.flat_vocab_size > 0
@@ -85,4 +123,44 @@ class TestFactorizedEmbedding:
         t1 = emb.embed_token(make_add(0, 1, 2))
         t2 = emb.embed_token(make_add(3, 4, 5))
         diff = (t1 - t2).abs().sum().item()
-        assert diff > 0, "Same op with different args should differ"
\ No newline at end of file
+        assert diff > 0, "Same op with different args should differ"
+
+class TestMacroRegistry:
+    def test_macro_call_token_roundtrip(self):
+        aspace = ActionSpace(num_registers=16)
+        for macro_id in (0, 7, 100, aspace.max_macro_calls - 1):
+            token = aspace.make_macro_call(macro_id)
+            flat = aspace.encode_token_flat(token)
+            assert aspace.macro_id_from_token(aspace.decode_flat_token(flat)) == macro_id
+
+    def test_ids_are_reused_after_removal(self):
+        aspace = ActionSpace(num_registers=16)
+        aspace.register_macro(MacroAction(name="a", sub_actions=[make_halt()]))
+        aspace.register_macro(MacroAction(name="b", sub_actions=[make_halt()]))
+        aspace.remove_macro("a")
+        c = MacroAction(name="c", sub_actions=[make_halt()])
+        aspace.register_macro(c)
+        assert c.macro_id == 0
+        assert aspace.macro_for_token(aspace.make_macro_call(0)) is c
+
+
+class TestLazyImports:
+    def test_symbolic_path_does_not_import_torch(self):
+        code = (
+            "import sys\n"
+            "from actformers import ActionType, ActionTraceGenerator\n"
+            "trace = ActionTraceGenerator().generate_addition_trace(12, 34)\n"
+            "assert trace[-1].op_id == ActionType.HALT\n"
+            "assert 'torch' not in sys.modules, 'torch was imported'\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+    def test_lazy_attributes_resolve(self):
+        import actformers
+        from actformers.core import action_space
+
+        assert actformers.ActionSpace is action_space.ActionSpace
+        assert actformers.ActionToken is action_space.ActionToken
+        assert "WorkingMemory" in dir(actformers)
+        with pytest.raises(AttributeError):
+            actformers.DoesNotExist
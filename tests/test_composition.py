@@ -0,0 +1,189 @@
+"""Tests for composition: substring mining, macro discovery."""
+
+import random
+from collections import Counter
+
+import pytest
+
+from actformers.composition.discovery import CompositionDiscovery
+from actformers.composition.macro_library import MacroLibrary
+from actformers.composition.ngram_stats import StreamingNGramCounter
+from actformers.composition.parallel_probe import ParallelProbeEvaluator
+from actformers.composition.suffix_automaton import SuffixAutomaton, mine_maximal_repeats
+from actformers.composition.tokenizer import MacroTokenizer
+from actformers.core.action_space import (
+    ActionSpace, FactorizedActionEmbedding, make_add, make_load, make_output,
+)
+from actformers.core.model import Actformer
+from actformers.data.trace_generator import ActionTraceGenerator
+
+
+def brute_force_counts(sequences, min_len, max_len):
+    counts = Counter()
+    for seq in sequences:
+        for n in range(min_len, max_len + 1):
+            for i in range(len(seq) - n + 1):
+                counts[tuple(seq[i:i+n])] += 1
+    return counts
+
+
+@pytest.fixture
+def rollouts():
+    rng = random.Random(0)
+    motif = [5, 9, 2, 7]
+    seqs = []
+    for _ in range(40):
+        seq = [rng.randint(0, 3) for _ in range(rng.randint(0, 6))]
+        seq += motif + [rng.randint(0, 3) for _ in range(rng.randint(0, 6))]
+        seqs.append(seq)
+    return seqs
+
+
+class TestSuffixAutomaton:
+    def test_counts_match_brute_force(self, rollouts):
+        sam = SuffixAutomaton()
+        for seq in rollouts:
+            sam.add_sequence(seq)
+        expected = brute_force_counts(rollouts, 1, 4)
+        for ngram, count in list(expected.items())[:200]:
+            assert sam.count(ngram) == count
+
+    def test_no_cross_rollout_matches(self):
+        sam = SuffixAutomaton()
+        sam.add_sequence([1, 2])
+        sam.add_sequence([3, 4])
+        assert sam.count([2, 3]) == 0
+
+    def test_maximal_repeats_are_frequent_and_maximal(self, rollouts):
+        repeats = mine_maximal_repeats(rollouts, min_len=3, max_len=15, min_count=20)
+        counts = brute_force_counts(rollouts, 3, 16)
+        assert repeats, "motif should be mined"
+        assert repeats[0][0] == [5, 9, 2, 7]
+        for ngram, count in repeats:
+            assert counts[tuple(ngram)] == count
+            # Right extensions lose occurrences
+            for ext, c in counts.items():
+                if len(ext) == len(ngram) + 1 and list(ext[:-1]) == ngram:
+                    assert c < count
+
+    def test_top_k_sorted_by_count(self, rollouts):
+        repeats = mine_maximal_repeats(rollouts, min_len=1, max_len=3, min_count=2, top_k=5)
+        assert len(repeats) <= 5
+        freqs = [c for _, c in repeats]
+        assert freqs == sorted(freqs, reverse=True)
+
+
+class TestStreamingNGramCounter:
+    def test_incremental_matches_recount(self, rollouts):
+        stats = StreamingNGramCounter(min_len=2, max_len=4, min_frequency=5)
+        for seq in rollouts:
+            stats.add(seq)
+        for seq in rollouts[:10]:
+            stats.remove(seq)
+        expected = brute_force_counts(rollouts[10:], 2, 4)
+        assert dict(stats.exact) == dict(expected)
+        assert stats.heavy == {k: c for k, c in expected.items() if c >= 5}
+
+    def test_sketch_never_undercounts(self, rollouts):
+        stats = StreamingNGramCounter(min_len=3, max_len=5, min_frequency=10, sketch_width=64)
+        for seq in rollouts:
+            stats.add(seq)
+        for ngram, count in brute_force_counts(rollouts, 3, 5).items():
+            assert stats.count(ngram) >= count
+
+    def test_top_k_matches_maximal_repeats(self, rollouts):
+        stats = StreamingNGramCounter(min_len=3, max_len=6, min_frequency=20)
+        for seq in rollouts:
+            stats.add(seq)
+        assert stats.top_k(5) == mine_maximal_repeats(
+            rollouts, min_len=3, max_len=6, min_count=20, top_k=5)
+        assert stats.top_k(1) == [([5, 9, 2, 7], 40)]
+        assert [5, 9, 2] in [ngram for ngram, _ in stats.top_k(5, maximal=False)]
+
+
+class TestCompositionDiscovery:
+    @pytest.fixture
+    def discovery(self):
+        aspace = ActionSpace(num_registers=8)
+        embed = FactorizedActionEmbedding(embed_dim=16, arg_vocab=aspace.arg_vocab,
+                                          mod_vocab=aspace.mod_vocab)
+        library = MacroLibrary(aspace, embed)
+        return CompositionDiscovery(library, aspace, min_frequency=5, max_buffer_size=20,
+                                    streaming_stats=True)
+
+    def test_ring_buffer_evicts_counts(self, discovery):
+        for _ in range(20):
+            discovery.add_rollout([1, 2, 3, 4])
+        for _ in range(20):
+            discovery.add_rollout([7, 8, 9])
+        assert len(discovery.rollout_buffer) == 20
+        assert discovery.ngram_stats.count([1, 2, 3]) == 0
+        assert discovery.mine_candidates() == [[7, 8, 9]]
+
+
+class TestMacroTokenizer:
+    @pytest.fixture
+    def library(self):
+        aspace = ActionSpace(num_registers=8)
+        embed = FactorizedActionEmbedding(embed_dim=16, arg_vocab=aspace.arg_vocab,
+                                          mod_vocab=aspace.mod_vocab)
+        return MacroLibrary(aspace, embed)
+
+    def test_encode_decode_roundtrip(self, library):
+        aspace = library.action_space
+        gen = ActionTraceGenerator()
+        trace = [aspace.encode_token_flat(t) for t in gen.generate_addition_trace(456, 789)]
+        library.register("m0", [aspace.decode_flat_token(i) for i in trace[:3]])
+        library.register("m1", [aspace.decode_flat_token(i) for i in trace[3:5]])
+        tok = MacroTokenizer(aspace)
+        encoded = tok.encode(trace)
+        assert len(encoded) < len(trace)
+        assert tok.decode(encoded) == trace
+
+    def test_longest_match_wins(self, library):
+        aspace = library.action_space
+        body = [make_load(0, 1, 2), make_add(0, 1, 2), make_output(2)]
+        library.register("short", body[:2])
+        library.register("long", body)
+        flat = [aspace.encode_token_flat(t) for t in body]
+        encoded = MacroTokenizer(aspace).encode(flat)
+        assert len(encoded) == 1
+        assert aspace.macro_for_token(aspace.decode_flat_token(encoded[0])).name == "long"
+
+    def test_refreshes_after_removal(self, library):
+        aspace = library.action_space
+        body = [make_load(0, 1, 2), make_add(0, 1, 2)]
+        library.register("m", body)
+        tok = MacroTokenizer(aspace)
+        flat = [aspace.encode_token_flat(t) for t in body]
+        assert len(tok.encode(flat)) == 1
+        library.remove("m")
+        assert tok.encode(flat) == flat
+
+
+def length_probe(model, probe_set, macro):
+    """Adopt macros of length >= probe_set['min_len'] (module-level for pickling)."""
+    assert model.action_space.macro_for_token(
+        model.action_space.make_macro_call(macro.macro_id)) is macro
+    assert model.action_space.total_macro_count() == 1  # no other candidate visible
+    return 0.0, 1.0 if macro.trace_length() >= probe_set["min_len"] else 0.0
+
+
+class TestParallelProbe:
+    def test_parallel_discovery_step(self):
+        model = Actformer(num_registers=8, register_dim=16, scratchpad_size=8, scratchpad_dim=16,
+                          hidden_dim=16, num_heads=2, num_layers=1, max_steps=5)
+        aspace = model.action_space
+        library = MacroLibrary(aspace, model.action_predictor.action_embed)
+        discovery = CompositionDiscovery(library, aspace, min_frequency=5,
+                                         min_subsequence_length=2)
+        for _ in range(10):
+            discovery.add_rollout([1, 2, 3, 4])
+            discovery.add_rollout([7, 8])
+        with ParallelProbeEvaluator(model, {"min_len": 3}, length_probe, num_workers=2) as pool:
+            result = discovery.discovery_step(probe_evaluator=pool)
+        assert result['candidates_mined'] == 2
+        assert len(result['adopted']) == 1
+        assert [library.action_space.encode_token_flat(t)
+                for t in library.get(result['adopted'][0]).sub_actions] == [1, 2, 3, 4]
+        assert aspace.total_macro_count() == 1
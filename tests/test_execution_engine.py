@@ -6,9 +6,10 @@ import torch
 from actformers.core.action_space import (
     ActionSpace, ActionToken, ActionType,
     make_add, make_load, make_halt, make_output, make_nop,
-    make_subtract, make_multiply, make_compare,
+    make_subtract, make_multiply, make_compare, make_digit_extract,
+    make_pointer_move, make_read, make_store,
 )
-from actformers.core.working_memory import WorkingMemory
+from actformers.core.working_memory import MemoryState, WorkingMemory
 from actformers.core.execution_engine import ActionExecutionEngine
 
 
@@ -71,4 +72,102 @@ class TestMemoryActions:
         action = make_load(value_reg=0, target_reg=5)
         new_state = engine.execute(action, state, "infer")
         result = engine.wm.read_register(new_state, 5)
-        assert result[0, 0].item() == pytest.approx(42.0)
\ No newline at end of file
+        assert result[0, 0].item() == pytest.approx(42.0)
+
+    def test_pointer_addressed_store_and_read(self):
+        wm = WorkingMemory(num_registers=8, register_dim=32, scratchpad_size=16,
+                           scratchpad_dim=32, addressing="pointer")
+        engine = ActionExecutionEngine(ActionSpace(num_registers=8), wm, primitive_dim=32)
+        state = engine.wm.init_state(1, torch.device("cpu"))
+        state = engine.wm.update_register(state, 0, torch.randn(1, 32))
+        for _ in range(4):
+            state = engine.execute(make_pointer_move(2, 1, 7), state, "infer")
+        slot = round(state.pointers[0, 2].item() * 15)
+        assert slot > 0
+        state = engine.execute(make_store(0, 0, mod=2), state, "infer")
+        written = (state.scratchpad != wm.init_state(1, torch.device("cpu")).scratchpad).any(-1)
+        assert written[0].nonzero().flatten().tolist() == [slot]
+        state = engine.execute(make_read(1, 0, ptr=2), state, "infer")
+        assert torch.allclose(engine.wm.read_register(state, 1), state.scratchpad[:, slot])
+
+
+class TestCompiledMacros:
+    def _random_state(self, engine):
+        state = engine.wm.init_state(batch_size=2, device=torch.device("cpu"))
+        regs = torch.rand(2, 8, 32) * 9
+        return MemoryState(registers=regs, scratchpad=state.scratchpad,
+                           pointers=state.pointers, halt_flag=state.halt_flag)
+
+    def test_matches_sequential_execution(self, engine):
+        body = [
+            make_load(0, 3), make_add(0, 1, 2, carry_mod=1), make_multiply(2, 3, 4),
+            make_digit_extract(4, 5, 1), make_add(5, 5, 2), make_halt(),
+            make_subtract(2, 1, 6), make_compare(6, 0, 7),
+        ]
+        state = self._random_state(engine)
+        expected = state
+        for action in body:
+            expected = engine.execute(action, expected, "infer")
+        result = engine.get_compiled_macro(body)(state, "infer")
+        assert torch.allclose(result.registers, expected.registers)
+        assert torch.equal(result.halt_flag, expected.halt_flag)
+
+    def test_reduced_precision_registers_match_sequential(self):
+        wm = WorkingMemory(num_registers=8, register_dim=32, scratchpad_size=16, scratchpad_dim=32,
+                           state_dtype=torch.bfloat16, exact_registers=False)
+        engine = ActionExecutionEngine(ActionSpace(num_registers=8), wm, primitive_dim=32)
+        body = [make_multiply(0, 1, 2), make_multiply(2, 1, 3), make_add(3, 0, 4)]
+        state = self._random_state(engine)
+        state = MemoryState(registers=state.registers.to(torch.bfloat16) + 0.37,
+                            scratchpad=state.scratchpad, pointers=state.pointers,
+                            halt_flag=state.halt_flag)
+        expected = state
+        for action in body:
+            expected = engine.execute(action, expected, "infer")
+        result = engine.get_compiled_macro(body)(state, "infer")
+        assert result.registers.dtype == torch.bfloat16
+        assert torch.equal(result.registers, expected.registers)
+
+    def test_dead_writes_dropped(self, engine):
+        body = [make_add(0, 1, 2), make_multiply(0, 1, 2), make_load(2, 3)]
+        compiled = engine.get_compiled_macro(body)
+        assert compiled.num_fused_ops == 2
+
+    def test_cached_and_differentiable(self, engine):
+        body = [make_add(0, 1, 2), make_multiply(2, 1, 3)]
+        assert engine.get_compiled_macro(body) is engine.get_compiled_macro(list(body))
+        state = self._random_state(engine)
+        regs = state.registers.clone().requires_grad_(True)
+        state = MemoryState(registers=regs, scratchpad=state.scratchpad,
+                            pointers=state.pointers, halt_flag=state.halt_flag)
+        out = engine.execute_macro(body, state, "train")
+        out.registers[:, 3].sum().backward()
+        assert regs.grad[:, 0].abs().sum() > 0
+
+
+class TestBatchedDispatch:
+    @pytest.mark.parametrize("mode", ["train", "infer"])
+    @pytest.mark.parametrize("static", [False, True])
+    def test_matches_per_row_execute(self, engine, mode, static):
+        torch.manual_seed(0)
+        actions = [
+            make_load(0, 3), make_add(0, 1, 2, carry_mod=1), make_multiply(2, 3, 4),
+            make_digit_extract(4, 5, 1), make_halt(), make_subtract(2, 1, 6),
+            make_compare(6, 0, 7), make_pointer_move(1, 1, 3), make_store(0, 0, mod=1),
+            make_read(1, 0, ptr=2), make_nop(),
+        ]
+        batch = len(actions)
+        base = engine.wm.init_state(batch, torch.device("cpu"))
+        state = MemoryState(registers=torch.rand(batch, 8, 32) * 9, scratchpad=base.scratchpad,
+                            pointers=base.pointers, halt_flag=base.halt_flag)
+        fields = torch.tensor([[a.op_id, a.arg0, a.arg1, a.arg2, a.modifier] for a in actions])
+        result = engine.execute_batch(*fields.unbind(-1), state, mode, static=static)
+        for row, action in enumerate(actions):
+            single = MemoryState(
+                registers=state.registers[row:row + 1], scratchpad=state.scratchpad[row:row + 1],
+                pointers=state.pointers[row:row + 1], halt_flag=state.halt_flag[row:row + 1])
+            expected = engine.execute(action, single, mode)
+            assert torch.allclose(result.registers[row], expected.registers[0], atol=1e-5)
+            assert torch.allclose(result.scratchpad[row], expected.scratchpad[0], atol=1e-5)
+            assert torch.allclose(result.pointers[row], expected.pointers[0])
+            assert result.halt_flag[row] == expected.halt_flag[0]
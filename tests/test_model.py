@@ -0,0 +1,261 @@
+"""Tests for the top-level Actformer model and its action loop."""
+
+import json
+
+import pytest
+import torch
+
+from actformers.core.action_space import MacroAction, make_add, make_halt, make_load, make_output
+from actformers.core.model import Actformer
+
+
+@pytest.fixture
+def model():
+    torch.manual_seed(0)
+    return Actformer(
+        num_registers=8, register_dim=32, scratchpad_size=16, scratchpad_dim=32,
+        hidden_dim=32, num_heads=2, num_layers=1, max_steps=12,
+    )
+
+
+@pytest.fixture
+def trace(model):
+    tokens = [make_load(0, 2, 3), make_add(0, 1, 2), make_output(2), make_halt()]
+    return [model.action_space.encode_token_flat(t) for t in tokens]
+
+
+class TestProfiling:
+    def test_disabled_by_default(self, model):
+        assert model.profiler is None
+        assert model.execution_engine.profiler is None
+
+    def test_counts_ops_and_phases(self, model, trace, tmp_path):
+        profiler = model.enable_profiling()
+        profiler.record_events = True
+        model(torch.tensor([[0.1, 0.2]]), target_trace=trace, execution_mode="infer")
+        summary = profiler.summary()
+        assert summary["ops"]["ADD"]["calls"] == 1
+        assert summary["ops"]["ADD"]["bytes_allocated"] > 0
+        assert summary["ops"]["OUTPUT"]["bytes_allocated"] == 0
+        assert profiler.phase_stats["predictor"].calls == len(trace)
+        assert 0.0 < summary["predictor_frac"] < 1.0
+        assert "ADD" in profiler.summary_table()
+
+        path = tmp_path / "trace.json"
+        profiler.export_chrome_trace(str(path))
+        events = json.loads(path.read_text())["traceEvents"]
+        assert any(e["name"] == "predictor" for e in events)
+
+        assert model.disable_profiling() is profiler
+        model(torch.tensor([[0.1, 0.2]]), target_trace=trace, execution_mode="infer")
+        assert profiler.phase_stats["predictor"].calls == len(trace)
+
+
+class TestReducedPrecision:
+    def test_bf16_scratchpad_keeps_registers_exact(self, model, trace):
+        model.set_precision(state_dtype=torch.bfloat16, autocast_dtype=torch.bfloat16)
+        inputs = torch.tensor([[1234.0, 4321.0]])
+        state = model.encode_input(inputs)
+        assert state.scratchpad.dtype == torch.bfloat16
+        assert state.registers.dtype == torch.float32
+        with torch.no_grad():
+            output, info = model(inputs, target_trace=trace, execution_mode="infer")
+        assert output.dtype == torch.float32
+        assert info["final_state"].scratchpad.dtype == torch.bfloat16
+
+    def test_quantized_predictor_leaves_original_untouched(self, model, trace):
+        from actformers.core.precision import quantize_predictor
+
+        quantized = quantize_predictor(model)
+        assert isinstance(model.action_predictor.output_head, torch.nn.Linear)
+        assert not isinstance(quantized.action_predictor.output_head, torch.nn.Linear)
+        inputs = torch.tensor([[0.1, 0.2]])
+        with torch.no_grad():
+            ref, _ = model(inputs, target_trace=trace, execution_mode="infer")
+            out, _ = quantized(inputs, target_trace=trace, execution_mode="infer")
+        assert torch.allclose(ref, out)  # teacher-forced output does not use logits
+
+    def test_evaluator_reports_deltas(self, model):
+        from actformers.core.precision import reduced_precision
+        from actformers.data.datasets import AdditionDataset
+        from actformers.eval.evaluator import GeneralizationEvaluator
+
+        dataset = AdditionDataset(num_samples=3, max_digits=2, action_space=model.action_space)
+        results = GeneralizationEvaluator(model).compare_precision(
+            {"bf16": reduced_precision(model)}, dataset)
+        assert set(results) == {"reference", "bf16"}
+        assert "exact_match_delta" in results["bf16"]
+        assert results["reference"]["num_samples"] == results["bf16"]["num_samples"] == 3
+
+
+class TestStaticLoop:
+    def test_forward_batch_matches_forward(self, model, trace):
+        predictor = model.action_predictor.eval()
+        state = model.encode_input(torch.rand(3, 2))
+        history = torch.tensor([trace, trace, trace])
+        lengths = torch.tensor([0, 2, 4])
+        with torch.no_grad():
+            batched = predictor.forward_batch(state, history, lengths)
+            for row in range(3):
+                single = type(state)(
+                    registers=state.registers[row:row + 1], scratchpad=state.scratchpad[row:row + 1],
+                    pointers=state.pointers[row:row + 1], halt_flag=state.halt_flag[row:row + 1])
+                expected = predictor(single, trace[:lengths[row]])
+                assert torch.allclose(batched[row], expected[0], atol=1e-5)
+
+    def test_teacher_forced_matches_forward(self, model, trace):
+        model.eval()
+        inputs = torch.tensor([[0.1, 0.2]])
+        with torch.no_grad():
+            ref, ref_info = model(inputs, target_trace=trace, execution_mode="infer")
+            out, info = model.forward_static(inputs, target_trace=torch.tensor([trace]),
+                                             execution_mode="infer")
+        assert torch.allclose(ref, out, atol=1e-5)
+        assert info["lengths"].tolist() == [ref_info["actions_taken"]]
+        assert info["actions"][0].tolist() == ref_info["action_history"]
+        assert info["loss"] == pytest.approx(torch.stack(ref_info["step_losses"]).mean().item(), rel=1e-4)
+
+    def test_rows_halt_independently(self, model, trace):
+        short = trace[-1:]  # HALT straight away
+        padded = torch.tensor([trace, short + [-1] * (len(trace) - 1)])
+        output, info = model.forward_static(torch.rand(2, 2), target_trace=padded)
+        assert info["lengths"].tolist() == [len(trace), 1]
+        assert info["actions"][1].tolist() == short + [-1] * (len(trace) - 1)
+        assert info["final_state"].halt_flag.all()
+        info["loss"].backward()
+        assert model.action_predictor.output_head.weight.grad is not None
+
+    def test_macro_rows_expand_like_forward(self, model):
+        space = model.action_space
+        macro = MacroAction(name="m", sub_actions=[make_add(0, 1, 2), make_add(2, 2, 0)])
+        space.register_macro(macro)
+        actions = [space.encode_token_flat(t) for t in
+                   (space.make_macro_call(macro.macro_id), make_add(0, 1, 3), make_halt())]
+        state = model.encode_input(torch.rand(3, 2))
+        with torch.no_grad():
+            batched = model.execute_flat_batch(torch.tensor(actions), state)
+            for row, action in enumerate(actions):
+                single = model._execute_flat(action, state.index_select(torch.tensor([row])), "infer")
+                assert torch.allclose(batched.registers[row], single.registers[0], atol=1e-6)
+                assert batched.halt_flag[row] == single.halt_flag[0]
+        with pytest.raises(RuntimeError):
+            model.execute_flat_batch(torch.tensor(actions), state, static=True)
+
+    def test_autoregressive_shapes(self, model):
+        with torch.no_grad():
+            output, info = model.forward_static(torch.rand(4, 2), greedy=True, early_exit=False)
+        assert output.shape == (4, 1)
+        assert info["actions"].shape == info["log_probs"].shape == (4, model.max_steps)
+
+
+class TestSpeculativeDecoding:
+    def test_self_draft_matches_plain_decoding(self, model):
+        from actformers.prediction.draft import PredictorDraft
+
+        model.eval()
+        inputs = torch.tensor([[0.1, 0.2]])
+        draft = PredictorDraft(model.action_predictor, model.execution_engine)
+        with torch.no_grad():
+            _, plain = model(inputs, execution_mode="infer", temperature=1e-4)
+            _, spec = model(inputs, execution_mode="infer", temperature=1e-4,
+                            draft_source=draft, speculative_k=4)
+        assert spec["action_history"] == plain["action_history"]
+        assert spec["draft_accepted"] == spec["actions_taken"]
+        assert spec["predictor_calls"] < plain["actions_taken"]
+        assert len(spec["log_probs"]) == spec["actions_taken"]
+
+    def test_trace_draft_stops_after_divergence(self, model, trace):
+        from actformers.prediction.draft import TraceDraft
+
+        draft = TraceDraft(model.action_space, [model.action_space.decode_flat_token(t) for t in trace])
+        assert draft.propose(None, trace[:1], 2) == trace[1:3]
+        assert draft.propose(None, [trace[1]], 2) == []
+
+    def test_macro_draft_completes_body(self, model, trace):
+        from actformers.core.action_space import MacroAction
+        from actformers.prediction.draft import MacroDraft
+
+        tokens = [model.action_space.decode_flat_token(t) for t in trace]
+        draft = MacroDraft(model.action_space, [MacroAction(name="m", sub_actions=tokens[1:], macro_id=0)])
+        assert draft.propose(None, trace[:2], 4) == trace[2:]
+        assert draft.propose(None, trace[:1], 4) == []
+
+    def test_draft_source_requires_propose(self):
+        from actformers.prediction.draft import DraftSource
+
+        class Incomplete(DraftSource):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+
+class TestEncodeInput:
+    def test_matches_per_register_updates(self, model):
+        inputs = torch.rand(3, 10)  # more inputs than registers: extras ignored
+        state = model.encode_input(inputs)
+        expected = model.working_memory.init_state(3, torch.device("cpu"))
+        for i in range(model.num_registers):
+            expected = model.working_memory.update_register(
+                expected, i, model.input_encoder(inputs[:, i:i + 1]))
+        assert torch.allclose(state.registers, expected.registers, atol=1e-6)
+
+    def test_differentiable(self, model):
+        model.encode_input(torch.rand(2, 2)).registers.sum().backward()
+        assert model.input_encoder[0].weight.grad is not None
+
+
+class TestGradientCheckpointing:
+    @pytest.mark.parametrize("segment", [1, 3])
+    def test_matches_plain_backward(self, model, trace, segment):
+        inputs = torch.tensor([[0.1, 0.2]])
+
+        def grads(checkpoint_every):
+            model.zero_grad()
+            torch.manual_seed(0)  # same dropout masks in both runs
+            output, info = model(inputs, target_trace=trace, checkpoint_every=checkpoint_every)
+            (torch.stack(info["step_losses"]).mean() + output.sum()).backward()
+            return info, [p.grad.clone() for p in model.parameters() if p.grad is not None]
+
+        ref_info, ref = grads(None)
+        info, got = grads(segment)
+        assert info["action_history"] == ref_info["action_history"]
+        assert len(info["step_losses"]) == len(ref_info["step_losses"])
+        assert len(got) == len(ref)
+        assert all(torch.allclose(a, b, atol=1e-6) for a, b in zip(got, ref))
+
+    def test_sampled_segments_replay(self, model):
+        model.zero_grad()
+        torch.manual_seed(3)
+        output, info = model(torch.tensor([[0.1, 0.2]]), checkpoint_every=4)
+        (torch.stack(info["log_probs"]).sum() + output.sum()).backward()
+        assert len(info["log_probs"]) == info["actions_taken"]
+        assert model.action_predictor.output_head.weight.grad is not None
+
+
+class TestPretrainedFiles:
+    def test_roundtrip_mmap(self, model, tmp_path):
+        path = str(tmp_path / "model.pt")
+        model.save_pretrained(path)
+        loaded = Actformer.from_pretrained(path)
+        assert loaded.config == model.config
+        for (name, p), q in zip(model.named_parameters(), loaded.parameters()):
+            assert q.device.type == "cpu" and torch.equal(p, q), name
+        model.eval(), loaded.eval()
+        inputs = torch.tensor([[0.12, 0.34]])
+        out, info = model.forward_static(inputs, greedy=True)
+        loaded_out, loaded_info = loaded.forward_static(inputs, greedy=True)
+        assert torch.equal(out, loaded_out)
+        assert torch.equal(info["actions"], loaded_info["actions"])
+
+    def test_config_dtypes_and_custom_modules(self, tmp_path):
+        path = str(tmp_path / "model.pt")
+        encoder = torch.nn.Linear(1, 16)
+        Actformer(num_registers=4, register_dim=16, scratchpad_size=8, scratchpad_dim=16,
+                  hidden_dim=16, num_heads=2, num_layers=1, input_encoder=encoder,
+                  state_dtype=torch.bfloat16).save_pretrained(path)
+        with pytest.raises(ValueError, match="input_encoder"):
+            Actformer.from_pretrained(path)
+        loaded = Actformer.from_pretrained(path, input_encoder=torch.nn.Linear(1, 16))
+        assert loaded.config["state_dtype"] == torch.bfloat16
+        assert torch.equal(loaded.input_encoder.weight, encoder.weight)
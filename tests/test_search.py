@@ -0,0 +1,101 @@
+"""Tests for inference-time search decoders."""
+
+import pytest
+import torch
+
+from actformers.core.action_space import MacroAction, make_add, make_halt, make_load, make_output
+from actformers.core.model import Actformer
+from actformers.prediction import BeamSearchDecoder, BestOfNDecoder
+from actformers.prediction.value_net import ValueNet
+
+
+@pytest.fixture
+def model():
+    torch.manual_seed(0)
+    return Actformer(
+        num_registers=8, register_dim=32, scratchpad_size=16, scratchpad_dim=32,
+        hidden_dim=32, num_heads=2, num_layers=1, max_steps=6,
+    ).eval()
+
+
+def _force_macro(model):
+    """Register a macro writing the output register and, through a nested
+    macro, answering 3; always predict it."""
+    space = model.action_space
+    answer = MacroAction(name="answer",
+                         sub_actions=[make_load(0, 1, 3), make_output(1, 0), make_halt()])
+    space.register_macro(answer)
+    macro = MacroAction(name="m", sub_actions=[
+        make_add(0, 1, 2), make_add(2, 2, 0), space.make_macro_call(answer.macro_id),
+    ])
+    space.register_macro(macro)
+    head = model.action_predictor.output_head
+    with torch.no_grad():
+        head.weight.zero_()
+        head.bias.fill_(-1e4)
+        head.bias[space.encode_token_flat(space.make_macro_call(macro.macro_id))] = 0.0
+
+
+def test_decoders_expand_macros_like_forward(model):
+    _force_macro(model)
+    inputs = torch.rand(2, 2)
+    with torch.no_grad():
+        expected = torch.cat([model(x.unsqueeze(0), execution_mode="infer")[0] for x in inputs])
+    beam_out, _ = BeamSearchDecoder(model, beam_width=1)(inputs)
+    sampled_out, sampled = BestOfNDecoder(model, num_samples=2)(inputs)
+    assert torch.allclose(beam_out, expected, atol=1e-4)
+    assert torch.allclose(sampled_out, expected, atol=1e-4)
+    assert sampled["answers"] == [3, 3]
+
+
+class TestBeamSearch:
+    def test_width_one_is_greedy(self, model):
+        inputs = torch.rand(3, 2)
+        with torch.no_grad():
+            greedy_out, greedy = model.forward_static(inputs, greedy=True)
+        out, info = BeamSearchDecoder(model, beam_width=1)(inputs)
+        assert torch.equal(info["actions"], greedy["actions"])
+        assert torch.allclose(out, greedy_out)
+
+    def test_beams_ranked_and_shaped(self, model):
+        out, info = BeamSearchDecoder(model, beam_width=4)(torch.rand(2, 2))
+        assert out.shape == (2, 1)
+        assert info["beam_scores"].shape == (2, 4)
+        assert (info["beam_scores"][:, :-1] >= info["beam_scores"][:, 1:]).all()
+        assert info["beam_actions"].shape[:2] == (2, 4)
+
+    def test_value_net_rescoring(self, model):
+        value_net = ValueNet(num_registers=8, register_dim=32, hidden_dim=16)
+        decoder = BeamSearchDecoder(model, beam_width=3, value_net=value_net, expansion=2)
+        out, info = decoder(torch.rand(2, 2))
+        assert out.shape == (2, 1)
+        assert torch.isfinite(info["beam_scores"]).all()
+
+
+class TestBestOfN:
+    def test_majority_vote(self, model):
+        decoder = BestOfNDecoder(model, num_samples=5)
+        pick, verified = decoder._choose(torch.zeros(2), [3, 7, 7, 3, 7], [0.0, -1.0, -3.0, -0.5, -2.0])
+        assert pick == 1 and not verified
+
+    def test_verifier_overrides_vote(self, model):
+        decoder = BestOfNDecoder(model, num_samples=3, verify_fn=lambda x, answer: answer == 3)
+        pick, verified = decoder._choose(torch.zeros(2), [7, 3, 7], [0.0, -1.0, -0.5])
+        assert pick == 1 and verified
+
+    def test_batched_decode(self, model):
+        out, info = BestOfNDecoder(model, num_samples=4)(torch.rand(3, 2))
+        assert out.shape == (3, 1)
+        assert len(info["answers"]) == 3
+        assert all(len(c) == 4 for c in info["candidate_answers"])
+        assert all(0 < v <= 1 for v in info["votes"])
+
+
+def test_evaluator_uses_search(model):
+    from actformers.data.datasets import AdditionDataset
+    from actformers.eval.evaluator import GeneralizationEvaluator
+
+    dataset = AdditionDataset(num_samples=2, max_digits=2, action_space=model.action_space)
+    search = BeamSearchDecoder(model, beam_width=2)
+    results = GeneralizationEvaluator(model, search=search).eval_addition(dataset)
+    assert results["num_samples"] == 2
@@ -0,0 +1,155 @@
+"""Tests for the dynamic-batching inference server."""
+
+import asyncio
+
+import pytest
+import torch
+
+from actformers.core.action_space import MacroAction, make_add, make_output
+from actformers.core.model import Actformer
+from actformers.serving import InferenceServer, LRUCache, ResultCache, run_load
+
+
+@pytest.fixture
+def model():
+    torch.manual_seed(0)
+    return Actformer(
+        num_registers=8, register_dim=32, scratchpad_size=16, scratchpad_dim=32,
+        hidden_dim=32, num_heads=2, num_layers=1, max_steps=8,
+    ).eval()
+
+
+def test_batched_results_match_static_loop(model):
+    inputs = torch.rand(6, 2)
+    with torch.no_grad():
+        expected, info = model.forward_static(inputs, greedy=True)
+
+    async def run():
+        async with InferenceServer(model, max_batch_size=4, max_wait=0.01) as server:
+            return await asyncio.gather(*(server.submit(x) for x in inputs))
+
+    results = asyncio.run(run())
+    for row, (output, row_info) in enumerate(results):
+        assert torch.allclose(output, expected[row], atol=1e-5)
+        assert row_info["actions"] == info["actions"][row, :info["lengths"][row]].tolist()
+        assert row_info["latency"] > 0
+
+
+def test_macro_calls_match_forward(model):
+    space = model.action_space
+    macro = MacroAction(name="m", sub_actions=[make_add(0, 1, 2), make_add(2, 2, 0), make_output(0)])
+    space.register_macro(macro)
+    call = space.encode_token_flat(space.make_macro_call(macro.macro_id))
+    head = model.action_predictor.output_head
+    with torch.no_grad():  # always predict the macro call
+        head.weight.zero_()
+        head.bias.fill_(-1e4)
+        head.bias[call] = 0.0
+    inputs = torch.rand(3, 2)
+    with torch.no_grad():
+        expected = [model(x.unsqueeze(0), execution_mode="infer") for x in inputs]
+
+    async def run():
+        async with InferenceServer(model, max_batch_size=4, max_wait=0.01) as server:
+            return await asyncio.gather(*(server.submit(x) for x in inputs))
+
+    for x, (output, info), (ref, ref_info) in zip(inputs, asyncio.run(run()), expected):
+        assert info["actions"] == ref_info["action_history"]
+        assert torch.allclose(output, ref[0], atol=1e-4)
+        # Running CALL_TOOL as a no-op would leave the initial output
+        with torch.no_grad():
+            assert not torch.allclose(output, model.decode_output(model.encode_input(x[None]))[0])
+
+
+def test_submit_requires_running_server(model):
+    with pytest.raises(RuntimeError):
+        asyncio.run(InferenceServer(model).submit(torch.rand(2)))
+
+
+def test_load_generator_reports_percentiles(model):
+    async def run():
+        async with InferenceServer(model, max_batch_size=8) as server:
+            return await run_load(server, lambda i: torch.rand(2), num_requests=20, concurrency=4)
+
+    report = asyncio.run(run())
+    assert report["requests"] == 20
+    assert report["p99_ms"] >= report["p50_ms"] > 0
+    assert report["mean_batch"] >= 1
+
+
+class TestCaches:
+    def test_lru_eviction_and_counters(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1       # "b" is now least recent
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 1)
+
+    def test_ttl_expiry(self):
+        now = [0.0]
+        cache = LRUCache(ttl=10.0, clock=lambda: now[0])
+        cache.put("a", 1)
+        now[0] = 5.0
+        assert cache.get("a") == 1
+        now[0] = 16.0
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_byte_bound(self):
+        cache = LRUCache(max_bytes=3 * 4 * 10)
+        for i in range(5):
+            cache.put(i, torch.zeros(10))  # 40 bytes each
+        assert len(cache) == 3 and cache.nbytes == 120
+        cache.put("huge", torch.zeros(1000))
+        assert "huge" not in cache._entries
+
+    def test_result_key_normalization(self):
+        cache = ResultCache()
+        assert cache.key("addition", (5, 3)) == cache.key("addition", (3.0, torch.tensor(5)))
+        assert cache.key("subtraction", (5, 3)) != cache.key("subtraction", (3, 5))
+
+    def test_state_cache_matches_uncached(self, model):
+        inputs = torch.rand(3, 2)
+        with torch.no_grad():
+            expected = model.encode_input(inputs)
+            cache = model.enable_state_cache()
+            model.encode_input(inputs[:2])
+            state = model.encode_input(inputs)
+        assert torch.allclose(state.registers, expected.registers, atol=1e-6)
+        assert (cache.hits, cache.misses) == (2, 3)
+        model.encode_input(inputs)  # grad enabled: bypassed
+        assert cache.hits + cache.misses == 5
+        model.disable_state_cache()
+
+    def test_server_result_cache(self, model):
+        cache = ResultCache()
+
+        async def run():
+            async with InferenceServer(model, result_cache=cache) as server:
+                first = await server.submit(torch.tensor([0.3, 0.5]), "addition", (30, 50))
+                second = await server.submit(torch.tensor([0.5, 0.3]), "addition", (50, 30))
+            return first, second
+
+        (out1, info1), (out2, info2) = asyncio.run(run())
+        assert not info1["cached"] and info2["cached"]
+        assert torch.equal(out1, out2)
+        assert cache.stats()["hits"] == 1
+
+    def test_result_cache_isolated_and_greedy_only(self, model):
+        cache = ResultCache()
+        x = torch.tensor([0.3, 0.5])
+
+        async def run(greedy):
+            async with InferenceServer(model, result_cache=cache, greedy=greedy) as server:
+                first = await server.submit(x, "addition", (30, 50))
+                first[0].add_(1000.0)  # caller mutates its result
+                return first, await server.submit(x, "addition", (30, 50))
+
+        (out1, _), (out2, info2) = asyncio.run(run(greedy=True))
+        assert info2["cached"] and not torch.equal(out1, out2)
+        cache.clear()
+        _, (_, info) = asyncio.run(run(greedy=False))
+        assert not info["cached"] and len(cache) == 0
@@ -0,0 +1,229 @@
+"""Tests for the supervised trainer's training-step variants, checkpointing and telemetry."""
+
+import json
+import os
+
+import pytest
+import torch
+from torch.utils.data import DataLoader
+
+from actformers.composition.discovery import CompositionDiscovery
+from actformers.composition.macro_library import MacroLibrary
+from actformers.core.action_space import (
+    ActionSpace, FactorizedActionEmbedding, make_add, make_load, make_output,
+)
+from actformers.core.model import Actformer
+from actformers.data.datasets import AdditionDataset
+from actformers.data.prefetch import PrefetchDataLoader
+from actformers.training import (
+    ActionCrossEntropyLoss, CheckpointManager, CurriculumTrainer, JSONLSink, SupervisedTrainer,
+    TelemetrySink, TensorBoardSink, ThroughputMeter,
+)
+
+
+def _model():
+    torch.manual_seed(0)
+    return Actformer(
+        num_registers=8, register_dim=32, scratchpad_size=16, scratchpad_dim=32,
+        hidden_dim=32, num_heads=2, num_layers=1, max_steps=40,
+    )
+
+
+@pytest.fixture
+def sample():
+    dataset = AdditionDataset(num_samples=1, max_digits=3, action_space=_model().action_space,
+                              max_trace_length=40)
+    return dataset[0]
+
+
+def _params(model):
+    return torch.cat([p.detach().flatten() for p in model.parameters()])
+
+
+class TestTruncatedBPTT:
+    def _step(self, sample, **kwargs):
+        model = _model()
+        trainer = SupervisedTrainer(model, ActionCrossEntropyLoss(), execution_mode="infer", **kwargs)
+        torch.manual_seed(1)
+        return model, trainer, trainer.train_step(sample)
+
+    def test_single_window_matches_full_backprop(self, sample):
+        full_model, _, full = self._step(sample)
+        model, _, metrics = self._step(sample, tbptt_window=1000)
+        assert metrics["tbptt_windows"] == 1
+        assert metrics["total_loss"] == pytest.approx(full["total_loss"], rel=1e-5)
+        assert torch.allclose(_params(model), _params(full_model), atol=1e-6)
+
+    def test_windows_accumulate_into_one_step(self, sample):
+        _, trainer, metrics = self._step(sample, tbptt_window=4)
+        length = sample["trace_length"]
+        assert metrics["tbptt_windows"] == -(-length // 4)
+        assert metrics["actions_taken"] == length
+        assert trainer.step_count == 1
+
+    def test_step_per_window(self, sample):
+        _, trainer, metrics = self._step(sample, tbptt_window=4, step_per_window=True)
+        assert trainer.step_count == metrics["tbptt_windows"] > 1
+
+
+class TestCheckpointing:
+    @pytest.fixture
+    def samples(self):
+        dataset = AdditionDataset(num_samples=6, max_digits=2, action_space=_model().action_space,
+                                  max_trace_length=40)
+        return [dataset[i] for i in range(len(dataset))]
+
+    def _trainer(self):
+        model = _model()
+        return SupervisedTrainer(model, ActionCrossEntropyLoss(), execution_mode="infer")
+
+    def test_resume_is_bit_exact(self, samples, tmp_path):
+        torch.manual_seed(1)
+        trainer = self._trainer()
+        curriculum = CurriculumTrainer(trainer.model)
+        manager = CheckpointManager(str(tmp_path), every=3)
+        for sample in samples:
+            trainer.train_step(sample)
+            curriculum.total_steps += 1
+            manager.maybe_save(trainer.step_count, {'trainer': trainer, 'curriculum': curriculum})
+        manager.wait()
+
+        resumed = self._trainer()
+        resumed_curriculum = CurriculumTrainer(resumed.model)
+        components = {'trainer': resumed, 'curriculum': resumed_curriculum}
+        step = manager.restore(components, path=manager.path_for(3))
+        assert step == resumed.step_count == resumed_curriculum.total_steps == 3
+        for sample in samples[step:]:
+            resumed.train_step(sample)
+        assert torch.equal(_params(resumed.model), _params(trainer.model))
+
+    def test_train_epoch_resumes_mid_epoch(self, samples, tmp_path):
+        torch.manual_seed(1)
+        trainer = self._trainer()
+        manager = CheckpointManager(str(tmp_path), every=2)
+        trainer.train_epoch(DataLoader(samples, batch_size=None, shuffle=True),
+                            checkpoint_manager=manager)
+        manager.wait()
+
+        resumed = self._trainer()
+        torch.manual_seed(2)  # the shuffle order must come from the checkpoint
+        assert manager.restore({'trainer': resumed}, path=manager.path_for(2)) == 2
+        assert manager.restored_extra['batch_idx'] == 2
+        metrics = resumed.train_epoch(DataLoader(samples, batch_size=None, shuffle=True),
+                                      resume=manager.restored_extra)
+        assert metrics['num_batches'] == len(samples) - 2
+        assert torch.equal(_params(resumed.model), _params(trainer.model))
+
+    def test_train_epoch_resumes_with_persistent_workers(self, samples, tmp_path):
+        def loader():
+            return PrefetchDataLoader(samples, shuffle=True, num_workers=1, seed=0)
+
+        torch.manual_seed(1)
+        trainer = self._trainer()
+        manager = CheckpointManager(str(tmp_path), every=2, keep_last=None)
+        data = loader()
+        for _ in range(2):  # epoch 2 reuses the persistent workers
+            trainer.train_epoch(data, checkpoint_manager=manager)
+        manager.wait()
+
+        resumed = self._trainer()
+        step = len(samples) + 2
+        manager.restore({'trainer': resumed}, path=manager.path_for(step))
+        resumed.train_epoch(loader(), resume=manager.restored_extra)
+        assert torch.equal(_params(resumed.model), _params(trainer.model))
+        with pytest.raises(ValueError, match="persistent workers"):
+            resumed.train_epoch(DataLoader(samples, batch_size=None, num_workers=1,
+                                           persistent_workers=True),
+                                resume=manager.restored_extra)
+
+    def test_macro_library_roundtrip(self, tmp_path):
+        aspace = ActionSpace(num_registers=8)
+        embed = FactorizedActionEmbedding(embed_dim=16, arg_vocab=aspace.arg_vocab,
+                                          mod_vocab=aspace.mod_vocab)
+        library = MacroLibrary(aspace, embed)
+        body = [make_load(0, 1, 2), make_add(0, 1, 2), make_output(2)]
+        library.register("a", body[:2])
+        library.register("b", body)
+        library.remove("a")  # leaves id 0 free; "b" keeps id 1
+        library.update_score("b", success=True)
+        discovery = CompositionDiscovery(library, aspace, min_frequency=2)
+        discovery.add_rollout([1, 2, 3, 4])
+
+        manager = CheckpointManager(str(tmp_path), async_save=False)
+        manager.save(1, {'macro_library': library, 'discovery': discovery})
+
+        aspace2 = ActionSpace(num_registers=8)
+        embed2 = FactorizedActionEmbedding(embed_dim=16, arg_vocab=aspace2.arg_vocab,
+                                           mod_vocab=aspace2.mod_vocab)
+        library2 = MacroLibrary(aspace2, embed2)
+        discovery2 = CompositionDiscovery(library2, aspace2, min_frequency=2)
+        manager.restore({'macro_library': library2, 'discovery': discovery2})
+
+        restored = library2.get("b")
+        assert restored.macro_id == 1 and aspace2.get_macro_by_id(1) is restored
+        assert restored.sub_actions == library.get("b").sub_actions
+        assert torch.equal(restored.embedding, library.get("b").embedding)
+        assert restored.usage_count == 1
+        assert list(discovery2.rollout_buffer) == [[1, 2, 3, 4]]
+
+    def test_state_dict_metadata_survives(self, tmp_path):
+        norm = torch.nn.BatchNorm1d(3)
+        manager = CheckpointManager(str(tmp_path), async_save=False)
+        manager.save(1, {'norm': norm})
+        saved = manager.load()['components']['norm']
+        assert saved._metadata == norm.state_dict()._metadata
+
+    def test_keeps_last_complete_checkpoints(self, tmp_path):
+        trainer = self._trainer()
+        manager = CheckpointManager(str(tmp_path), keep_last=2)
+        for step in range(1, 5):
+            manager.save(step, {'trainer': trainer})
+        manager.close()
+        assert [os.path.basename(p) for p in manager.checkpoints()] == [
+            os.path.basename(manager.path_for(3)), os.path.basename(manager.path_for(4)),
+        ]
+        assert not [f for f in os.listdir(tmp_path) if ".tmp" in f]
+        assert manager.latest() == manager.path_for(4)
+
+
+class TestTelemetry:
+    def test_meter_fractions_cover_wall_time(self):
+        meter = ThroughputMeter()
+        meter.update(1.0, actions=10, trace_length=10, data=0.1, forward=0.5, backward=0.3, optimizer=0.05)
+        meter.update(1.0, actions=30, trace_length=30, data=0.1, forward=0.5, backward=0.3, optimizer=0.05)
+        record = meter.summary()
+        assert record["samples_per_sec"] == pytest.approx(1.0)
+        assert record["actions_per_sec"] == pytest.approx(20.0)
+        assert record["avg_trace_length"] == pytest.approx(20.0)
+        assert record["other_time"] == pytest.approx(0.1)
+        assert sum(record[f"{p}_fraction"] for p in
+                   ("data", "forward", "backward", "optimizer", "other")) == pytest.approx(1.0)
+
+    def test_train_epoch_writes_jsonl(self, tmp_path):
+        dataset = AdditionDataset(num_samples=5, max_digits=2, action_space=_model().action_space,
+                                  max_trace_length=40)
+        path = tmp_path / "telemetry.jsonl"
+        sink = JSONLSink(str(path))
+        trainer = SupervisedTrainer(_model(), ActionCrossEntropyLoss(), execution_mode="infer",
+                                    telemetry=sink)
+        metrics = trainer.train_epoch([dataset[i] for i in range(5)], log_every=2)
+        sink.close()
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [r["step"] for r in records] == [2, 4, 5]
+        assert [r["steps"] for r in records] == [2, 2, 1]
+        assert all(r["forward_time"] > 0 and r["actions_per_sec"] > 0 for r in records)
+        assert metrics["samples_per_sec"] > 0
+
+    def test_sink_requires_write(self):
+        class Incomplete(TelemetrySink):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_tensorboard_sink(self, tmp_path):
+        pytest.importorskip("tensorboard")
+        sink = TensorBoardSink(str(tmp_path))
+        sink.write(1, {"samples_per_sec": 3.0, "peak_rss_mb": None})
+        sink.close()
+        assert os.listdir(tmp_path)
@@ -54,4 +54,105 @@ class TestCloning:
         # Gradients on new_state should not affect original
         loss = new_state.registers.sum()
         loss.backward()
-        assert value.grad is not None
\ No newline at end of file
+        assert value.grad is not None
+
+
+class TestTopKAddressing:
+    @pytest.fixture
+    def sparse_wm(self, wm):
+        sparse = WorkingMemory(num_registers=8, register_dim=32, scratchpad_size=16,
+                               scratchpad_dim=32, addressing="topk", topk=4)
+        sparse.load_state_dict(wm.state_dict())
+        return sparse
+
+    def _random_state(self, wm):
+        state = wm.init_state(2, torch.device("cpu"))
+        return MemoryState(registers=torch.randn_like(state.registers),
+                           scratchpad=torch.randn_like(state.scratchpad),
+                           pointers=state.pointers, halt_flag=state.halt_flag)
+
+    def test_read_with_all_slots_matches_dense(self, wm, sparse_wm):
+        sparse_wm.topk = 16
+        state = self._random_state(wm)
+        query = torch.randn(2, 1, 32)
+        dense_val, dense_w = wm.read_from_scratchpad(state, query)
+        sparse_val, sparse_w = sparse_wm.read_from_scratchpad(state, query)
+        assert torch.allclose(dense_val, sparse_val, atol=1e-5)
+        assert torch.allclose(dense_w, sparse_w, atol=1e-5)
+
+    def test_read_touches_k_slots(self, sparse_wm):
+        state = self._random_state(sparse_wm)
+        value, weights = sparse_wm.read_from_scratchpad(state, torch.randn(2, 1, 32))
+        assert value.shape == (2, 1, 32)
+        assert weights.shape == (2, 1, 16)
+        assert ((weights > 0).sum(-1) <= 4).all()
+        assert torch.allclose(weights.sum(-1), torch.ones(2, 1))
+
+    def test_write_touches_k_slots_and_is_differentiable(self, sparse_wm):
+        state = self._random_state(sparse_wm)
+        value = torch.randn(2, 1, 32, requires_grad=True)
+        new_state = sparse_wm.write_to_scratchpad(state, value)
+        changed = (new_state.scratchpad != state.scratchpad).any(-1).sum(-1)
+        assert (changed <= 4).all() and (changed > 0).all()
+        new_state.scratchpad.sum().backward()
+        assert value.grad is not None
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            WorkingMemory(addressing="bogus")
+
+
+class TestPointerAddressing:
+    @pytest.fixture
+    def ptr_wm(self):
+        return WorkingMemory(num_registers=8, register_dim=32, scratchpad_size=16,
+                             scratchpad_dim=32, addressing="pointer")
+
+    def _state(self, wm, positions):
+        state = wm.init_state(len(positions), torch.device("cpu"))
+        pointers = state.pointers.clone()
+        pointers[:, 1] = torch.tensor(positions)
+        return MemoryState(registers=state.registers, pointers=pointers,
+                           scratchpad=torch.randn_like(state.scratchpad),
+                           halt_flag=state.halt_flag)
+
+    def test_infer_read_returns_slot_under_pointer(self, ptr_wm):
+        state = self._state(ptr_wm, [0.0, 5 / 15, 1.0])
+        value, weights = ptr_wm.read_from_scratchpad(
+            state, torch.zeros(3, 1, 32), ptr_idx=1, execution_mode="infer")
+        for row, slot in enumerate([0, 5, 15]):
+            assert torch.equal(value[row, 0], state.scratchpad[row, slot])
+            assert weights[row, 0, slot] == 1.0
+
+    def test_write_touches_one_slot(self, ptr_wm):
+        state = self._state(ptr_wm, [7 / 15])
+        new_state = ptr_wm.write_to_scratchpad(
+            state, torch.randn(1, 1, 32), ptr_idx=1, execution_mode="infer")
+        changed = (new_state.scratchpad != state.scratchpad).any(-1)[0]
+        assert changed.nonzero().flatten().tolist() == [7]
+
+    def test_per_row_pointer_tensor(self, ptr_wm):
+        state = self._state(ptr_wm, [0.0, 1.0])
+        value, _ = ptr_wm.read_from_scratchpad(
+            state, torch.zeros(2, 1, 32), ptr_idx=torch.tensor([0, 1]), execution_mode="infer")
+        assert torch.equal(value[1, 0], state.scratchpad[1, 15])
+        assert torch.equal(value[0, 0], state.scratchpad[0, 0])  # pointer 0 is at 0
+
+    def test_train_read_straight_through(self, ptr_wm):
+        state = self._state(ptr_wm, [5.2 / 15])
+        pointers = state.pointers.clone().requires_grad_(True)
+        state = MemoryState(registers=state.registers, scratchpad=state.scratchpad,
+                            pointers=pointers, halt_flag=state.halt_flag)
+        value, _ = ptr_wm.read_from_scratchpad(
+            state, torch.zeros(1, 1, 32), ptr_idx=1, execution_mode="train")
+        assert torch.allclose(value[0, 0], state.scratchpad[0, 5])  # hard forward
+        value.sum().backward()
+        assert pointers.grad[0, 1] != 0  # soft backward
+
+
+def test_detach_cuts_graph(wm):
+    state = wm.init_state(1, torch.device("cpu"))
+    state = wm.update_register(state, 0, torch.randn(1, 32, requires_grad=True))
+    detached = state.detach()
+    assert state.registers.requires_grad and not detached.registers.requires_grad
+    assert torch.equal(detached.registers, state.registers)